@@ -10,13 +10,18 @@ import threading
 import queue
 import time
 import logging
-import json
 import hashlib
 import gzip
 import base64
+import os
+import uuid
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
+from .content_processor import CHARS_PER_TOKEN, estimate_tokens, sentence_index
+from .task_results import FINISHED_STATES, SharedResultBackend, create_result_backend
+from .task_queue import MemoryTaskQueue, QueuedTask, create_task_queue
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,24 +31,74 @@ class AsyncProcessor:
     Asynchronous processor for handling batch requests and long-running operations
     """
     
-    def __init__(self, max_workers=4, queue_size=100):
+    def __init__(self, max_workers=4, queue_size=100, result_store=None, durable_queue=None):
         """
         Initialize the async processor
         
         Args:
             max_workers (int): Maximum number of worker threads
             queue_size (int): Maximum size of the processing queue
+            result_store (TaskResultStore, optional): Store for task results; defaults to
+                the backend selected by TASK_RESULT_BACKEND
+            durable_queue (optional): Persistent queue for tasks that can be serialized;
+                defaults to the backend selected by TASK_QUEUE_BACKEND
         """
+        self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # In-process queue for tasks that cannot be persisted (closures, non-JSON arguments)
         self.task_queue = queue.Queue(maxsize=queue_size)
-        self.results = {}
+        # Best-effort background work, run only when no other task is waiting
+        self.low_priority_queue = queue.Queue(maxsize=queue_size)
+        if result_store is None:
+            result_store = create_result_backend(
+                max_entries=int(os.getenv('TASK_RESULT_MAX_ENTRIES', 1000)),
+                max_bytes=int(os.getenv('TASK_RESULT_MAX_BYTES', 50 * 1024 * 1024)),
+                ttls={
+                    'completed': int(os.getenv('TASK_RESULT_TTL', 3600)),
+                    'error': int(os.getenv('TASK_ERROR_TTL', 600)),
+                    'timeout': int(os.getenv('TASK_ERROR_TTL', 600)),
+                }
+            )
+        self.results = result_store
+        if durable_queue is None:
+            max_pending = int(os.getenv('TASK_QUEUE_MAX_PENDING', queue_size))
+            durable_queue = create_task_queue(max_pending=max_pending)
+            if durable_queue.name != 'memory' and not isinstance(result_store, SharedResultBackend):
+                # Another process could run the task and keep its result in
+                # its own memory, leaving the submitter polling forever
+                logger.error(f"The {durable_queue.name} task queue is shared between processes but "
+                             f"task results are not; set TASK_RESULT_BACKEND. Using a memory queue")
+                durable_queue = MemoryTaskQueue(max_pending=max_pending)
+        self.durable_queue = durable_queue
         self.running = False
         self.worker_thread = None
         self.timeout = 60  # Default timeout in seconds
+        self.poll_interval = 0.5  # Seconds between checks for tasks queued by other processes
+        self.lease_grace = 30  # Extra lease time on top of the task timeout before redelivery
+        self.max_attempts = 3  # Deliveries before a durable task is given up
+        # Worker slots low-priority tasks may hold at once, so user requests always find one free
+        self.low_priority_limit = max(1, max_workers // 4)
+        self._low_priority_running = 0
+        self._wakeup = threading.Event()
+        
+        # One slot per executor worker; the dispatcher only takes a task off
+        # the queue when a slot is free, so every worker can be kept busy
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._timers = {}
         
     def start(self):
         """Start the async processor worker thread"""
         if not self.running:
+            # Make tasks leased by dead workers on this host visible again
+            try:
+                resumed = self.durable_queue.recover()
+                pending = self.durable_queue.pending_count()
+                if pending:
+                    logger.info(f"Resuming {pending} queued tasks ({resumed} recovered from dead workers)")
+            except Exception as e:
+                logger.error(f"Failed to recover durable task queue: {str(e)}")
+            
             self.running = True
             self.worker_thread = threading.Thread(target=self._process_queue)
             self.worker_thread.daemon = True
@@ -56,64 +111,228 @@ class AsyncProcessor:
             self.running = False
             if self.worker_thread:
                 self.worker_thread.join(timeout=5)
+            with self._lock:
+                for timer in self._timers.values():
+                    timer.cancel()
+                self._timers.clear()
             self.executor.shutdown(wait=False)
             logger.info("Async processor stopped")
     
     def _process_queue(self):
-        """Process tasks from the queue"""
+        """Dispatch tasks from the queues to the executor while worker slots are free"""
         while self.running:
+            # Wait for a free worker slot before taking the next task
+            if not self._slots.acquire(timeout=1):
+                continue
+            
             try:
-                # Get a task from the queue with a timeout
-                task_id, func, args, kwargs, timeout = self.task_queue.get(timeout=1)
-                
-                # Submit the task to the executor
-                future = self.executor.submit(func, *args, **kwargs)
-                
-                # Set a timeout for the task
-                start_time = time.time()
-                while not future.done():
-                    if time.time() - start_time > timeout:
-                        logger.warning(f"Task {task_id} timed out after {timeout} seconds")
-                        self.results[task_id] = {
-                            'status': 'timeout',
-                            'error': f'Task timed out after {timeout} seconds'
-                        }
-                        break
-                    time.sleep(0.1)
-                
-                # Get the result if the task completed
-                if future.done():
-                    try:
-                        result = future.result()
-                        self.results[task_id] = {
-                            'status': 'completed',
-                            'result': result
-                        }
-                    except Exception as e:
-                        logger.error(f"Task {task_id} failed: {str(e)}")
-                        self.results[task_id] = {
-                            'status': 'error',
-                            'error': str(e)
-                        }
-                
-                # Mark the task as done
-                self.task_queue.task_done()
-                
+                task = self._next_task(timeout=1)
             except queue.Empty:
-                # No tasks in the queue, just continue
+                # No tasks in the queues, give the slot back and continue
+                self._slots.release()
                 continue
+            
+            try:
+                self._dispatch(task)
             except Exception as e:
                 logger.error(f"Error in async processor: {str(e)}")
+                self.results[task.task_id] = {
+                    'status': 'error',
+                    'error': str(e)
+                }
+                self._slots.release()
+                self._finish(task)
+    
+    def _next_task(self, timeout):
+        """
+        Get the next task from the in-process queue or the durable queue
+        
+        Args:
+            timeout (float): Seconds to wait for a task
+            
+        Returns:
+            QueuedTask: The task to run
+            
+        Raises:
+            queue.Empty: If no task became available in time
+        """
+        deadline = time.time() + timeout
+        while True:
+            self._wakeup.clear()
+            try:
+                return self.task_queue.get_nowait()
+            except queue.Empty:
+                pass
+            
+            task = self._claim_durable()
+            if task is not None:
+                return task
+            
+            task = self._claim_low_priority()
+            if task is not None:
+                return task
+            
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise queue.Empty()
+            # Local submissions wake us up; other processes are picked up by polling
+            self._wakeup.wait(min(remaining, self.poll_interval))
+    
+    def _claim_low_priority(self):
+        """Take the next low-priority task if it may use a worker slot, or return None"""
+        with self._lock:
+            if self._low_priority_running >= self.low_priority_limit:
+                return None
+            try:
+                task = self.low_priority_queue.get_nowait()
+            except queue.Empty:
+                return None
+            self._low_priority_running += 1
+            return task
+    
+    def _claim_durable(self):
+        """Claim and rebuild the next task from the durable queue, or return None"""
+        try:
+            claimed = self.durable_queue.claim()
+        except Exception as e:
+            logger.error(f"Failed to claim from durable task queue: {str(e)}")
+            return None
+        if claimed is None:
+            return None
+        
+        task_id, payload, attempts = claimed
+        
+        # A redelivered task may already have finished before its worker died
+        if self.results.get(task_id, {}).get('status') in FINISHED_STATES:
+            self.durable_queue.ack(task_id)
+            return None
+        
+        if attempts > self.max_attempts:
+            logger.error(f"Task {task_id} gave up after {attempts - 1} attempts")
+            self.results[task_id] = {
+                'status': 'error',
+                'error': f'Task failed after {attempts - 1} attempts'
+            }
+            self.durable_queue.ack(task_id)
+            return None
+        
+        try:
+            task = self.durable_queue.load(task_id, payload, attempts)
+        except Exception as e:
+            logger.error(f"Failed to load task {task_id}: {str(e)}")
+            self.results[task_id] = {
+                'status': 'error',
+                'error': f'Failed to load task: {str(e)}'
+            }
+            self.durable_queue.ack(task_id)
+            return None
+        
+        if attempts > 1:
+            logger.warning(f"Redelivering task {task_id} (attempt {attempts})")
+        return task
+    
+    def _dispatch(self, task):
+        """
+        Submit a task to the executor without waiting for it
+        
+        The timeout is enforced by a timer and the result is recorded by a
+        done-callback, so the dispatcher can go straight back to the queue.
+        
+        Args:
+            task (QueuedTask): Task to run
+        """
+        # Tasks resumed after a restart may not have a status in this process yet
+        if self.results.get(task.task_id, {}).get('status') != 'pending':
+            self.results[task.task_id] = {'status': 'pending'}
+        
+        timer = threading.Timer(task.timeout, self._on_timeout, args=(task,))
+        timer.daemon = True
+        with self._lock:
+            self._timers[task.task_id] = timer
+        
+        future = self.executor.submit(task.func, *task.args, **task.kwargs)
+        timer.start()
+        future.add_done_callback(partial(self._on_done, task))
+    
+    def _finish(self, task):
+        """Acknowledge a durable task or mark an in-process task as done"""
+        if task.durable:
+            try:
+                self.durable_queue.ack(task.task_id)
+            except Exception as e:
+                logger.error(f"Failed to acknowledge task {task.task_id}: {str(e)}")
+        elif task.low_priority:
+            with self._lock:
+                self._low_priority_running -= 1
+            self.low_priority_queue.task_done()
+        else:
+            self.task_queue.task_done()
+    
+    def _on_timeout(self, task):
+        """Mark a task as timed out if it has not finished yet"""
+        with self._lock:
+            self._timers.pop(task.task_id, None)
+            if self.results.get(task.task_id, {}).get('status') != 'pending':
+                return
+            logger.warning(f"Task {task.task_id} timed out after {task.timeout} seconds")
+            self.results[task.task_id] = {
+                'status': 'timeout',
+                'error': f'Task timed out after {task.timeout} seconds'
+            }
+        
+        # Timed out tasks are reported, not retried
+        if task.durable:
+            self._finish(task)
+    
+    def _on_done(self, task, future):
+        """
+        Record the result of a finished task and free its worker slot
+        
+        A thread cannot be interrupted, so a task that timed out keeps its slot
+        until the function actually returns; its late result is discarded.
+        """
+        task_id = task.task_id
+        with self._lock:
+            timer = self._timers.pop(task_id, None)
+            if timer:
+                timer.cancel()
+            
+            if self.results.get(task_id, {}).get('status') == 'pending':
+                try:
+                    result = future.result()
+                    self.results[task_id] = {
+                        'status': 'completed',
+                        'result': result
+                    }
+                except Exception as e:
+                    logger.error(f"Task {task_id} failed: {str(e)}")
+                    self.results[task_id] = {
+                        'status': 'error',
+                        'error': str(e)
+                    }
+        
+        self._slots.release()
+        self._finish(task)
     
-    def submit_task(self, func, *args, task_id=None, timeout=None, **kwargs):
+    def submit_task(self, func, *args, task_id=None, timeout=None, priority='normal', **kwargs):
         """
         Submit a task for asynchronous processing
         
+        Tasks go to the configured task queue. The SQLite and Redis queues
+        only take tasks whose function lives in this package and whose
+        arguments are JSON-serializable, which then survive a restart; any
+        other task runs from the in-process queue.
+        
+        Low-priority tasks are best-effort background work: they are kept in
+        memory only, start after every waiting task and never hold more than
+        low_priority_limit workers.
+        
         Args:
             func (callable): Function to execute
             *args: Arguments to pass to the function
             task_id (str, optional): Task ID for tracking
             timeout (int, optional): Timeout in seconds
+            priority (str): 'normal' or 'low'
             **kwargs: Keyword arguments to pass to the function
             
         Returns:
@@ -121,19 +340,52 @@ class AsyncProcessor:
         """
         # Generate a task ID if not provided
         if task_id is None:
-            task_id = hashlib.md5(f"{func.__name__}:{time.time()}".encode()).hexdigest()
+            task_id = hashlib.md5(f"{func.__name__}:{time.time()}:{uuid.uuid4()}".encode()).hexdigest()
         
         # Use default timeout if not specified
         if timeout is None:
             timeout = self.timeout
         
-        # Add the task to the queue
+        # Record the task as pending first so a fast worker cannot finish it
+        # before its status exists
+        self.results[task_id] = {'status': 'pending'}
+        
+        if priority == 'low':
+            try:
+                self.low_priority_queue.put(QueuedTask(task_id, func, args, kwargs, timeout, low_priority=True), block=False)
+                self._wakeup.set()
+                logger.info(f"Low-priority task {task_id} submitted")
+                return task_id
+            except queue.Full:
+                self.results.pop(task_id, None)
+                logger.error("Low-priority task queue is full")
+                raise RuntimeError("Task queue is full")
+        
+        task = QueuedTask(task_id, func, args, kwargs, timeout, durable=True)
         try:
-            self.task_queue.put((task_id, func, args, kwargs, timeout), block=False)
-            self.results[task_id] = {'status': 'pending'}
+            self.durable_queue.put_task(task, timeout + self.lease_grace)
+            self._wakeup.set()
+            logger.info(f"Task {task_id} submitted to {self.durable_queue.name} queue")
+            return task_id
+        except queue.Full:
+            self.results.pop(task_id, None)
+            logger.error("Task queue is full")
+            raise RuntimeError("Task queue is full")
+        except ValueError:
+            # Closures and non-JSON arguments cannot be persisted
+            pass
+        except Exception as e:
+            logger.error(f"Durable task queue unavailable, running task {task_id} in memory: {str(e)}")
+        
+        # Add the task to the in-process queue
+        task.durable = False
+        try:
+            self.task_queue.put(task, block=False)
+            self._wakeup.set()
             logger.info(f"Task {task_id} submitted")
             return task_id
         except queue.Full:
+            self.results.pop(task_id, None)
             logger.error("Task queue is full")
             raise RuntimeError("Task queue is full")
     
@@ -147,29 +399,26 @@ class AsyncProcessor:
         Returns:
             dict: Task status information
         """
-        if task_id in self.results:
-            return self.results[task_id]
-        return {'status': 'unknown'}
+        return self.results.get(task_id, {'status': 'unknown'})
     
     def clear_completed_tasks(self, max_age=3600):
         """
-        Clear completed tasks from the results dictionary
+        Clear completed tasks from the result store
         
         Args:
             max_age (int): Maximum age of completed tasks in seconds
         """
-        current_time = time.time()
-        to_remove = []
-        
-        for task_id, result in self.results.items():
-            if result.get('status') in ['completed', 'error', 'timeout']:
-                if 'timestamp' in result and current_time - result['timestamp'] > max_age:
-                    to_remove.append(task_id)
+        removed = self.results.purge_finished(max_age)
+        logger.info(f"Cleared {removed} completed tasks")
+    
+    def get_stats(self):
+        """
+        Get memory use and eviction statistics for task results
         
-        for task_id in to_remove:
-            del self.results[task_id]
-            
-        logger.info(f"Cleared {len(to_remove)} completed tasks")
+        Returns:
+            dict: Result store statistics
+        """
+        return self.results.stats()
 
 def compress_content(content):
     """
@@ -226,10 +475,128 @@ def decompress_content(compressed_content):
         logger.error(f"Decompression error: {str(e)}")
         return None
 
+class ChunkPlan:
+    """How a document will be split, known before any model call"""
+    
+    def __init__(self, chunks, chunk_tokens, token_budget):
+        """
+        Initialize the plan
+        
+        Args:
+            chunks (list): Chunk texts
+            chunk_tokens (list): Estimated tokens of each chunk
+            token_budget (int): Maximum estimated tokens per chunk
+        """
+        self.chunks = chunks
+        self.chunk_tokens = chunk_tokens
+        self.token_budget = token_budget
+    
+    @property
+    def chunk_count(self):
+        return len(self.chunks)
+    
+    @property
+    def estimated_tokens(self):
+        return sum(self.chunk_tokens)
+    
+    def to_dict(self):
+        """Summarize the plan for responses and logs"""
+        return {
+            'chunk_count': self.chunk_count,
+            'estimated_tokens': self.estimated_tokens,
+            'token_budget': self.token_budget
+        }
+
+def _split_long_sentence(sentence, max_tokens):
+    """Split a sentence over the token budget at whitespace, or hard if it has none"""
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    pieces = []
+    while estimate_tokens(sentence) > max_tokens:
+        cut = sentence.rfind(' ', 0, max_chars)
+        cut = cut + 1 if cut > 0 else max_chars
+        pieces.append(sentence[:cut])
+        sentence = sentence[cut:]
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+def plan_chunks(content, max_tokens=2000, overlap_tokens=0, min_fill=0.75, anchor_divisor=4):
+    """
+    Pack whole sentences into chunks of up to max_tokens estimated tokens
+    
+    Once a chunk reaches min_fill of the budget it also ends at the next
+    paragraph, or at a sentence that a hash of its text picks as an anchor.
+    Boundaries therefore only depend on nearby text: an edit changes the
+    chunks around it and cached chunk summaries elsewhere stay valid.
+    
+    Args:
+        content (str): Content to chunk
+        max_tokens (int): Token budget of a chunk
+        overlap_tokens (int): Tokens of trailing sentences repeated at the start of the next chunk
+        min_fill (float): Fraction of the budget a chunk must reach before an anchor can end it
+        anchor_divisor (int): On average every n-th sentence past min_fill is a boundary
+        
+    Returns:
+        ChunkPlan: The chunks and their estimated tokens
+    """
+    sentences = []
+    for start, end, paragraph_end in sentence_index(content):
+        sentence = content[start:end]
+        tokens = estimate_tokens(sentence)
+        if tokens > max_tokens:
+            for piece in _split_long_sentence(sentence, max_tokens):
+                sentences.append((piece, estimate_tokens(piece), False))
+        else:
+            sentences.append((sentence, tokens, paragraph_end))
+    
+    chunks, chunk_tokens = [], []
+    current, current_tokens = [], 0
+    # Whether the current chunk holds sentences beyond the carried overlap
+    has_new = False
+    
+    def close():
+        nonlocal current, current_tokens, has_new
+        has_new = False
+        chunks.append(''.join(text for text, _ in current))
+        chunk_tokens.append(current_tokens)
+        # Carry trailing sentences into the next chunk for context
+        carried, carried_tokens = [], 0
+        for text, tokens in reversed(current):
+            if carried_tokens + tokens > overlap_tokens:
+                break
+            carried.insert(0, (text, tokens))
+            carried_tokens += tokens
+        current, current_tokens = carried, carried_tokens
+    
+    for text, tokens, paragraph_end in sentences:
+        if current and current_tokens + tokens > max_tokens:
+            close()
+            # Drop carried context that would not leave room for the sentence
+            while current and current_tokens + tokens > max_tokens:
+                current_tokens -= current.pop(0)[1]
+        current.append((text, tokens))
+        current_tokens += tokens
+        has_new = True
+        
+        if current_tokens >= max_tokens * min_fill:
+            anchor_hash = int(hashlib.md5(text.strip().encode()).hexdigest()[:8], 16)
+            if paragraph_end or anchor_hash % anchor_divisor == 0:
+                close()
+    
+    if has_new:
+        chunks.append(''.join(text for text, _ in current))
+        chunk_tokens.append(current_tokens)
+    
+    plan = ChunkPlan(chunks or [content], chunk_tokens or [estimate_tokens(content)], max_tokens)
+    logger.info(f"Planned {plan.chunk_count} chunks, ~{plan.estimated_tokens} tokens")
+    return plan
+
 def chunk_content(content, max_chunk_size=5000, overlap=200):
     """
     Split content into chunks for processing
     
+    Character sizes are converted to a token budget for plan_chunks.
+    
     Args:
         content (str): Content to chunk
         max_chunk_size (int): Maximum chunk size in characters
@@ -240,31 +607,30 @@ def chunk_content(content, max_chunk_size=5000, overlap=200):
     """
     if len(content) <= max_chunk_size:
         return [content]
+    return plan_chunks(
+        content,
+        max_tokens=max(1, max_chunk_size // CHARS_PER_TOKEN),
+        overlap_tokens=overlap // CHARS_PER_TOKEN
+    ).chunks
+
+def map_concurrently(func, items, max_concurrency=4):
+    """
+    Apply a function to every item concurrently, keeping the input order
     
-    chunks = []
-    start = 0
-    
-    while start < len(content):
-        # Calculate end position
-        end = min(start + max_chunk_size, len(content))
-        
-        # Try to find a sentence boundary for cleaner chunks
-        if end < len(content):
-            # Look for sentence boundaries (., !, ?)
-            for boundary in ['. ', '! ', '? ']:
-                boundary_pos = content.rfind(boundary, start, end)
-                if boundary_pos > start + max_chunk_size * 0.5:  # Ensure chunk is at least half the max size
-                    end = boundary_pos + 2  # Include the boundary characters
-                    break
-        
-        # Add the chunk
-        chunks.append(content[start:end])
-        
-        # Move to next chunk with overlap
-        start = end - overlap
+    Args:
+        func (callable): Function to apply to each item
+        items (list): Items to process
+        max_concurrency (int): Maximum number of calls running at once
+        
+    Returns:
+        list: Results in the same order as the items
+    """
+    items = list(items)
+    if len(items) <= 1 or max_concurrency <= 1:
+        return [func(item) for item in items]
     
-    logger.info(f"Split content into {len(chunks)} chunks")
-    return chunks
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        return list(executor.map(func, items))
 
 # Create a global instance
 async_processor = AsyncProcessor()
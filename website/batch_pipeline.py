@@ -0,0 +1,225 @@
+"""
+Batch Summarization Pipeline Module for AI Summary Feature
+
+This module provides the stages of the batch summarization engine:
+deduplicating identical items, processing and filtering every item in one
+pass, and packing several short items into a single model prompt with a
+structured multi-result response.
+"""
+
+import hashlib
+import json
+import logging
+import re
+
+from .content_processor import process_content
+from .content_filter import filter_contents
+from .summary_parser import DEFAULT_CATEGORIES, parse_categories
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def item_key(item):
+    """
+    Build the deduplication key of a raw batch item
+
+    Args:
+        item (dict): Batch item with content, url and is_html
+
+    Returns:
+        str: Key shared by identical items
+    """
+    raw = json.dumps([
+        (item.get('content') or '').strip(),
+        (item.get('url') or '').strip(),
+        bool(item.get('is_html', False)),
+        bool(item.get('strict_filtering', False))
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def dedupe_items(items):
+    """
+    Collapse identical items
+
+    Args:
+        items (list): Raw batch items
+
+    Returns:
+        tuple: (unique items, index of the unique item for every input item)
+    """
+    unique = []
+    positions = {}
+    mapping = []
+
+    for item in items:
+        key = item_key(item)
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append(item)
+        mapping.append(positions[key])
+
+    return unique, mapping
+
+def prepare_items(items, map_func=None):
+    """
+    Process and filter every item in one pass
+
+    Args:
+        items (list): Unique raw batch items
+        map_func (callable, optional): Function used to map content processing
+            over the items, e.g. to fetch URLs concurrently
+
+    Returns:
+        list: One entry per item with 'content', 'metadata', 'warnings' and
+            'error' (None when the item can be summarized)
+    """
+    inputs = [{
+        'content': item.get('content') or '',
+        'url': item.get('url') or '',
+        'is_html': item.get('is_html', False)
+    } for item in items]
+
+    if map_func is None:
+        processed = [process_content(data) for data in inputs]
+    else:
+        processed = map_func(process_content, inputs)
+
+    entries = [{
+        'content': result.get('content', '') if result.get('success') else '',
+        'metadata': result.get('metadata', {}) if result.get('success') else {},
+        'warnings': [],
+        'error': None if result.get('success') else (result.get('error') or 'Failed to process content')
+    } for result in processed]
+
+    for entry in entries:
+        if entry['error'] is None and len(entry['content']) < 50:
+            entry['error'] = 'Content must be at least 50 characters.'
+
+    # Filter all valid items with one filter instance per filtering mode
+    for strict_mode in (False, True):
+        indices = [
+            i for i, entry in enumerate(entries)
+            if entry['error'] is None and bool(items[i].get('strict_filtering', False)) == strict_mode
+        ]
+        results = filter_contents([entries[i]['content'] for i in indices], strict_mode=strict_mode)
+
+        for i, filtering_result in zip(indices, results):
+            entries[i]['metadata']['categories'] = filtering_result['categories']
+            entries[i]['warnings'] = filtering_result.get('warnings', [])
+            if not filtering_result['allowed']:
+                entries[i]['error'] = 'Content contains inappropriate material and cannot be processed.'
+
+    return entries
+
+def pack_items(sizes, max_item_chars=4000, max_prompt_chars=12000, max_items=8):
+    """
+    Group short items into packs that share a single prompt
+
+    Args:
+        sizes (list): (index, content length) pairs of the items to summarize
+        max_item_chars (int): Items longer than this are summarized on their own
+        max_prompt_chars (int): Maximum combined content length of a pack
+        max_items (int): Maximum number of items in a pack
+
+    Returns:
+        tuple: (list of packs of indices, list of indices summarized on their own)
+    """
+    packs = []
+    singles = []
+    current = []
+    current_size = 0
+
+    for index, size in sizes:
+        if size > max_item_chars:
+            singles.append(index)
+            continue
+        if current and (current_size + size > max_prompt_chars or len(current) >= max_items):
+            packs.append(current)
+            current = []
+            current_size = 0
+        current.append(index)
+        current_size += size
+
+    if current:
+        packs.append(current)
+
+    # A pack of one is just a single item
+    singles.extend(pack[0] for pack in packs if len(pack) == 1)
+    packs = [pack for pack in packs if len(pack) > 1]
+
+    return packs, singles
+
+def build_packed_prompt(contents, length, tone):
+    """
+    Build a prompt that summarizes several texts with one structured response
+
+    Args:
+        contents (list): Texts to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+
+    Returns:
+        str: Prompt for the model
+    """
+    texts = "\n\n".join(f"TEXT {i + 1}:\n{content}" for i, content in enumerate(contents))
+
+    return f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
+Summarize each of the {len(contents)} numbered texts below independently.
+Each summary should be approximately {length}% of the length of its text.
+Create a compelling headline in the {tone} tone for each text.
+Identify the primary and secondary categories of each text.
+Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
+
+Respond with only a JSON array containing one object per text, in the same order, like this:
+[{{"id": 1, "headline": "...", "categories": ["Primary Category", "Secondary Category"], "summary": "..."}}]
+
+{texts}"""
+
+def parse_packed_response(response_text, count):
+    """
+    Parse the structured response to a packed prompt
+
+    Args:
+        response_text (str): Model response text
+        count (int): Number of texts in the pack
+
+    Returns:
+        list: (headline, summary, categories) per text, or None for texts
+            missing from the response
+    """
+    results = [None] * count
+
+    # Strip markdown code fences around the JSON
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', response_text.strip())
+    try:
+        data = json.loads(text)
+    except ValueError:
+        logger.warning("Packed batch response is not valid JSON")
+        return results
+
+    if isinstance(data, dict):
+        data = data.get('results') or data.get('items') or []
+    if not isinstance(data, list):
+        return results
+
+    for position, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get('id', position + 1)) - 1
+        except (TypeError, ValueError):
+            index = position
+        if not 0 <= index < count or not entry.get('summary'):
+            continue
+
+        raw_categories = entry.get('categories') or []
+        if isinstance(raw_categories, str):
+            raw_categories = raw_categories.split(',')
+        categories = parse_categories(", ".join(str(c) for c in raw_categories))
+        if not categories:
+            categories = dict(DEFAULT_CATEGORIES)
+
+        results[index] = (str(entry.get('headline', '')).strip(), str(entry['summary']).strip(), categories)
+
+    return results
@@ -1,89 +1,493 @@
-import redis
-import json
 import hashlib
 from dotenv import load_dotenv
 import os
-from urllib.parse import urlparse
-import ssl
+import threading
+import time
 from pathlib import Path
+try:
+    from .fingerprint import simhash, similarity
+    from .local_cache import LocalCache
+    from .circuit_breaker import CircuitBreaker
+    from .cache_codec import compact_summary, decode_value, encode_value, expand_summary
+    from .cache_backends import MemoryCacheBackend, create_cache_backend
+except ImportError:
+    # cache.py is also imported as a top-level module by standalone scripts
+    from fingerprint import simhash, similarity
+    from local_cache import LocalCache
+    from circuit_breaker import CircuitBreaker
+    from cache_codec import compact_summary, decode_value, encode_value, expand_summary
+    from cache_backends import MemoryCacheBackend, create_cache_backend
 
 # Load environment variables from parent directory's .env.local
 env_path = Path(__file__).resolve().parent.parent / '.env.local'
 load_dotenv(env_path)
 
-class RedisCache:
-    def __init__(self):
-        redis_url = os.getenv('REDIS_URL')
-        if not redis_url:
-            raise ValueError(f"REDIS_URL environment variable is not set. Looking in: {env_path}")
-            
-        try:
-            # Configure connection using URL
-            self.redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True
-            )
-            
-            # Test the connection
-            self.redis_client.ping()
-            print("Successfully connected to Redis Cloud!")
-        except Exception as e:
-            print(f"Failed to connect to Redis: {str(e)}")
-            # Initialize a dummy client that will fail gracefully
-            self.redis_client = None
+class SummaryCache:
+    def __init__(self, backend=None):
+        """
+        Initialize the cache; the backend connects lazily on first use
+
+        Args:
+            backend (optional): Cache backend; defaults to the one selected by
+                the CACHE_BACKEND environment variable
+        """
+        self.backend = backend or create_cache_backend()
+        # Tracks backend health so calls skip the network while it is down
+        self.breaker = CircuitBreaker(
+            lambda: self.backend.ping(),
+            failure_threshold=int(os.getenv('REDIS_FAILURE_THRESHOLD', 3)),
+            max_delay=float(os.getenv('REDIS_PROBE_MAX_DELAY', 60)),
+            name=f"Cache backend ({self.backend.name})"
+        )
             
+        # Summaries are fresh for cache_expiry seconds; after that they are still
+        # served (and refreshed in the background) until hard_expiry
         self.cache_expiry = int(os.getenv('REDIS_CACHE_EXPIRY', 3600))  # Default 1 hour
+        self.hard_expiry = max(self.cache_expiry, int(os.getenv('REDIS_CACHE_HARD_EXPIRY', 86400)))  # Default 1 day
+        # Seconds a claimed background refresh blocks other refreshes of the same key
+        self.refresh_claim_ttl = int(os.getenv('CACHE_REFRESH_CLAIM_TTL', 120))
+        self._refresh_claims = {}
+        self._refresh_lock = threading.Lock()
+        self.chunk_cache_expiry = int(os.getenv('REDIS_CHUNK_CACHE_EXPIRY', 86400))  # Default 1 day
+        # Encoded summaries of at least this many bytes are compressed
+        self.compress_threshold = int(os.getenv('CACHE_COMPRESS_THRESHOLD', 1024))
+        # Near-duplicate content within this many differing fingerprint bits (of 64)
+        # reuses an existing summary; 0 disables near-duplicate reuse
+        self.similarity_max_distance = int(os.getenv('SIMILARITY_MAX_DISTANCE', 3))
+        # Hot entries are also kept in process memory in front of a remote backend
+        self.local_cache = LocalCache(
+            max_entries=0 if isinstance(self.backend, MemoryCacheBackend) else int(os.getenv('LOCAL_CACHE_SIZE', 1024)),
+            ttl=int(os.getenv('LOCAL_CACHE_TTL', 300))
+        )
+        self.backend_stats = {'hits': 0, 'misses': 0, 'errors': 0}
+        # Keys carry a namespace made of what shapes a summary (prompt, model,
+        # parser versions) and a generation counter stored in the backend, so
+        # bumping either invalidates every entry at once
+        self.namespace_parts = {}
+        self.generation_key = 'cache:generation'
+        self.generation_check_interval = float(os.getenv('CACHE_GENERATION_CHECK_INTERVAL', 30))
+        self._generation = 0
+        self._generation_checked_at = None
+        self._invalidation_thread = None
+        if os.getenv('REDIS_KEYSPACE_INVALIDATION', 'false').lower() == 'true':
+            self.start_invalidation_listener()
+
+    @property
+    def redis_client(self):
+        """The Redis client when the backend is Redis, otherwise None"""
+        return self.backend.client if self.backend.name == 'redis' else None
+
+    @property
+    def fingerprint_index(self):
+        """Near-duplicate index stored alongside the backend"""
+        return self.backend.fingerprint_index(self.get_client, self.similarity_max_distance, self.hard_expiry)
 
     def is_connected(self):
-        """Check if Redis is connected and working"""
-        if not self.redis_client:
-            return False
+        """Check if the backend is usable, without a network round trip"""
+        return self.breaker.allow()
+
+    def get_client(self):
+        """Return the Redis client, or None for other backends or while the circuit is open"""
+        return self.redis_client if self.is_connected() else None
+
+    def _call(self, func, *args):
+        """Run a backend operation and record the outcome for the circuit breaker"""
         try:
-            self.redis_client.ping()
-            return True
-        except:
-            return False
+            result = func(*args)
+        except self.backend.connection_errors:
+            self.backend_stats['errors'] += 1
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.backend_stats['errors'] += 1
+            raise
+        self.breaker.record_success()
+        return result
+
+    def set_namespace(self, **parts):
+        """
+        Set the versions that summaries depend on; changing any of them moves
+        the cache to a new namespace
+
+        Args:
+            **parts: Version values, e.g. prompt, model and parser
+        """
+        self.namespace_parts = {key: str(value) for key, value in parts.items()}
+
+    def get_generation(self):
+        """
+        Return the namespace generation, re-read from the backend at most every
+        generation_check_interval seconds
+
+        Returns:
+            int: Current generation
+        """
+        now = time.monotonic()
+        if self._generation_checked_at is not None and now - self._generation_checked_at < self.generation_check_interval:
+            return self._generation
+        self._generation_checked_at = now
+
+        if not self.is_connected():
+            return self._generation
+        try:
+            # Read past the local tier so every process sees a bump
+            value = self._call(self.backend.get, self.generation_key)
+            self._generation = int(value or 0)
+        except Exception as e:
+            print(f"Redis generation read error: {str(e)}")
+        return self._generation
+
+    def bump_generation(self):
+        """
+        Invalidate every cached summary by moving to a new generation; entries
+        of older generations are never read again and expire through their TTL
+
+        Returns:
+            int: New generation, or None if the backend is unavailable
+        """
+        if not self.is_connected():
+            return None
+        try:
+            self._generation = int(self._call(self.backend.incr, self.generation_key))
+            self._generation_checked_at = time.monotonic()
+            self.local_cache.clear()
+            return self._generation
+        except Exception as e:
+            print(f"Redis generation bump error: {str(e)}")
+            return None
+
+    def namespace(self):
+        """Return the key namespace of the current versions and generation"""
+        versions = ','.join(f"{key}={value}" for key, value in sorted(self.namespace_parts.items()))
+        return f"g{self.get_generation()}-{hashlib.md5(versions.encode()).hexdigest()[:8]}"
 
     def generate_cache_key(self, content, length, tone):
         """Generate a unique cache key based on content and parameters"""
         # Create a string combining all parameters
         params = f"{content}:{length}:{tone}"
         # Generate MD5 hash of the parameters
-        return f"summary:{hashlib.md5(params.encode()).hexdigest()}"
+        return f"summary:{self.namespace()}:{hashlib.md5(params.encode()).hexdigest()}"
+
+    def _get(self, key):
+        """Read a value from the local tier, falling back to the backend"""
+        return self.get_many([key])[0]
+
+    def _set(self, key, value, expiry):
+        """Write a value to both tiers; returns whether the backend was updated"""
+        return self.set_many({key: value}, expiry)
+
+    def get_many(self, keys):
+        """
+        Read several values with one round trip, serving what it can from the
+        local tier and fetching the rest with MGET
+
+        Args:
+            keys (list): Cache keys
+
+        Returns:
+            list: Value for each key, or None for misses
+        """
+        values = [self.local_cache.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing or not self.is_connected():
+            return values
+
+        fetched = self._call(self.backend.mget, [keys[i] for i in missing])
+        for i, value in zip(missing, fetched):
+            if value is None:
+                self.backend_stats['misses'] += 1
+                continue
+            self.backend_stats['hits'] += 1
+            self.local_cache.set(keys[i], value)
+            values[i] = value
+        return values
+
+    def set_many(self, values, expiry):
+        """
+        Write several values with one round trip (pipelined SETEX on Redis)
+
+        Args:
+            values (dict): Values by cache key
+            expiry (int): Seconds before the values expire
+
+        Returns:
+            bool: Whether the backend was updated
+        """
+        for key, value in values.items():
+            self.local_cache.set(key, value, ttl=min(expiry, self.local_cache.ttl))
+
+        if not values or not self.is_connected():
+            return False
+
+        self._call(self.backend.set_many, values, expiry)
+        return True
 
     def get_cached_summary(self, content, length, tone):
         """Get cached summary if it exists"""
-        if not self.is_connected():
-            return None
-            
         try:
             cache_key = self.generate_cache_key(content, length, tone)
-            cached_data = self.redis_client.get(cache_key)
+            cached_data = self._get(cache_key)
             if cached_data:
-                cached_result = json.loads(cached_data)
-                cached_result['cached'] = True
-                return cached_result
-            return None
+                cached_result = self._decode_summary(cached_data, content, length, tone)
+                if cached_result:
+                    return cached_result
+            if not self.is_connected():
+                return None
+            return self.get_similar_summary(content, length, tone)
         except Exception as e:
             print(f"Redis get error: {str(e)}")
             return None
 
+    def _decode_summary(self, cached_data, content, length, tone):
+        """Rebuild a summary response from a stored value, including legacy JSON entries"""
+        record, legacy = decode_value(cached_data)
+        if record is None:
+            return None
+        cached_result = record if legacy else expand_summary(record, content, length, tone)
+        cached_result['cached'] = True
+        # Entries past their fresh period are marked stale for the caller to refresh
+        fresh_until = cached_result.pop('fresh_until', None)
+        if fresh_until is not None and time.time() > fresh_until:
+            cached_result['stale'] = True
+        return cached_result
+
+    def get_cached_summaries(self, contents, length, tone):
+        """Get cached summaries for several contents with one MGET, or None for misses"""
+        try:
+            keys = [self.generate_cache_key(content, length, tone) for content in contents]
+            results = [
+                self._decode_summary(value, content, length, tone) if value else None
+                for content, value in zip(contents, self.get_many(keys))
+            ]
+            missing = [i for i, result in enumerate(results) if result is None]
+            if missing and self.is_connected():
+                similar = self.get_similar_summaries([contents[i] for i in missing], length, tone)
+                for i, result in zip(missing, similar):
+                    results[i] = result
+            return results
+        except Exception as e:
+            print(f"Redis get error: {str(e)}")
+            return [None] * len(contents)
+
+    def get_similar_summary(self, content, length, tone):
+        """Get the cached summary of near-duplicate content if one exists"""
+        return self.get_similar_summaries([content], length, tone)[0]
+
+    def get_similar_summaries(self, contents, length, tone):
+        """Get cached summaries of near-duplicate content for several contents"""
+        results = [None] * len(contents)
+        if self.similarity_max_distance <= 0:
+            return results
+
+        fingerprints = [simhash(content) for content in contents]
+        positions = [i for i, fingerprint in enumerate(fingerprints) if fingerprint is not None]
+        if not positions:
+            return results
+
+        scope = f"{self.namespace()}:{length}:{tone}"
+        all_matches = self.fingerprint_index.query_many([fingerprints[i] for i in positions], scope)
+        candidate_keys = sorted({key for matches in all_matches for key, _, _ in matches})
+        values = dict(zip(candidate_keys, self.get_many(candidate_keys)))
+
+        stale = set()
+        for i, matches in zip(positions, all_matches):
+            for cache_key, distance, indexed in matches:
+                cached_data = values.get(cache_key)
+                if not cached_data:
+                    # The summary has expired; drop its stale fingerprint
+                    stale.add((indexed, cache_key))
+                    continue
+                cached_result = self._decode_summary(cached_data, contents[i], length, tone)
+                if not cached_result:
+                    continue
+                cached_result['original_content'] = contents[i]
+                cached_result['near_duplicate'] = {
+                    'similarity': similarity(distance),
+                    'distance': distance
+                }
+                results[i] = cached_result
+                break
+
+        for indexed, cache_key in stale:
+            self.fingerprint_index.discard(indexed, cache_key, scope)
+        return results
+
     def cache_summary(self, content, length, tone, summary_data):
         """Cache the summary data"""
-        if not self.is_connected():
+        return self.cache_summaries([(content, summary_data)], length, tone)
+
+    def cache_summaries(self, items, length, tone):
+        """Cache several (content, summary data) pairs with one pipelined write"""
+        try:
+            keys = [self.generate_cache_key(content, length, tone) for content, _ in items]
+            fresh_until = time.time() + self.cache_expiry
+            values = {
+                key: encode_value(
+                    dict(compact_summary(summary_data), fresh_until=fresh_until),
+                    compress_threshold=self.compress_threshold
+                )
+                for key, (_, summary_data) in zip(keys, items)
+            }
+            if not self.set_many(values, self.hard_expiry):
+                return False
+            if self.similarity_max_distance > 0:
+                fingerprints = [simhash(content) for content, _ in items]
+                self.fingerprint_index.add_many(
+                    [(fingerprint, key) for fingerprint, key in zip(fingerprints, keys) if fingerprint is not None],
+                    f"{self.namespace()}:{length}:{tone}"
+                )
+            return True
+        except Exception as e:
+            print(f"Redis set error: {str(e)}")
             return False
-            
+
+    def get_value(self, key):
+        """
+        Get a cached value stored with set_value
+
+        Returns:
+            tuple: (value, stale flag), or (None, False) on a miss
+        """
         try:
-            cache_key = self.generate_cache_key(content, length, tone)
-            self.redis_client.setex(
-                cache_key,
-                self.cache_expiry,
-                json.dumps(summary_data)
-            )
+            cached_data = self._get(key)
+            if not cached_data:
+                return None, False
+            record, _ = decode_value(cached_data)
+            if record is None:
+                return None, False
+            return record.get('value'), time.time() > record.get('fresh_until', 0)
+        except Exception as e:
+            print(f"Redis get error: {str(e)}")
+            return None, False
+
+    def set_value(self, key, value, expiry, hard_expiry=None):
+        """
+        Cache a JSON-serializable value that is fresh for expiry seconds and
+        served stale until hard_expiry
+        """
+        try:
+            record = {'value': value, 'fresh_until': time.time() + expiry}
+            encoded = encode_value(record, compress_threshold=self.compress_threshold)
+            return self._set(key, encoded, max(expiry, hard_expiry or expiry))
+        except Exception as e:
+            print(f"Redis set error: {str(e)}")
+            return False
+
+    def claim_refresh(self, key):
+        """
+        Claim the background refresh of a stale entry so only one caller,
+        across processes when Redis is available, triggers it
+
+        Returns:
+            bool: Whether the caller should refresh the entry
+        """
+        client = self.get_client()
+        if client is not None:
+            try:
+                return bool(self._call(client.set, f"refresh:{key}", 1, self.refresh_claim_ttl, None, True))
+            except Exception as e:
+                print(f"Redis refresh claim error: {str(e)}")
+                return False
+
+        now = time.time()
+        with self._refresh_lock:
+            if self._refresh_claims.get(key, 0) > now:
+                return False
+            self._refresh_claims = {k: t for k, t in self._refresh_claims.items() if t > now}
+            self._refresh_claims[key] = now + self.refresh_claim_ttl
             return True
+
+    def generate_chunk_key(self, chunk, tone):
+        """Generate a cache key from the content hash of a single chunk"""
+        return f"chunk_summary:{self.namespace()}:{hashlib.sha256(chunk.encode()).hexdigest()}:{tone}"
+
+    def get_chunk_summary(self, chunk, tone):
+        """Get the cached summary of a chunk if it exists"""
+        try:
+            return self._get(self.generate_chunk_key(chunk, tone))
+        except Exception as e:
+            print(f"Redis get error: {str(e)}")
+            return None
+
+    def cache_chunk_summary(self, chunk, tone, summary):
+        """Cache the summary of a single chunk"""
+        try:
+            return self._set(self.generate_chunk_key(chunk, tone), summary, self.chunk_cache_expiry)
+        except Exception as e:
+            print(f"Redis set error: {str(e)}")
+            return False
+
+    def get_chunk_summaries(self, chunks, tone):
+        """Get the cached summaries of several chunks with one MGET"""
+        try:
+            return self.get_many([self.generate_chunk_key(chunk, tone) for chunk in chunks])
+        except Exception as e:
+            print(f"Redis get error: {str(e)}")
+            return [None] * len(chunks)
+
+    def cache_chunk_summaries(self, summaries, tone):
+        """Cache several (chunk, summary) pairs with one pipelined write"""
+        try:
+            return self.set_many(
+                {self.generate_chunk_key(chunk, tone): summary for chunk, summary in summaries},
+                self.chunk_cache_expiry
+            )
         except Exception as e:
             print(f"Redis set error: {str(e)}")
             return False
 
-# Create a global instance
-redis_cache = RedisCache()
+    def get_stats(self):
+        """Report hit, miss and eviction counters for each cache tier"""
+        return {
+            'local': self.local_cache.stats(),
+            'backend': dict(self.backend_stats, name=self.backend.name, circuit=self.breaker.stats())
+        }
+
+    def start_invalidation_listener(self):
+        """
+        Drop local entries when their Redis keys are overwritten, deleted,
+        expire or are evicted, using Redis keyspace notifications
+        """
+        if self.redis_client is None or self._invalidation_thread is not None:
+            return False
+
+        try:
+            # Managed Redis may not allow CONFIG; notifications must then be enabled there
+            self.redis_client.config_set('notify-keyspace-events', 'K$gxe')
+        except Exception as e:
+            print(f"Could not enable keyspace notifications: {str(e)}")
+
+        self._invalidation_thread = threading.Thread(target=self._listen_for_invalidations, daemon=True)
+        self._invalidation_thread.start()
+        return True
+
+    def _listen_for_invalidations(self):
+        while True:
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe('__keyspace@*__:summary:*', '__keyspace@*__:chunk_summary:*')
+                while True:
+                    # Wait for less than the client's socket timeout, so a
+                    # quiet channel is not mistaken for a broken connection
+                    message = pubsub.get_message(timeout=0.5)
+                    if message:
+                        self.handle_keyspace_event(message)
+            except Exception as e:
+                print(f"Keyspace notification listener error: {str(e)}")
+                time.sleep(5)
+
+    def handle_keyspace_event(self, message):
+        """Invalidate the local entry named by a keyspace notification"""
+        if message.get('type') != 'pmessage':
+            return
+        # Channel is __keyspace@<db>__:<key>, data is the command or event
+        key = message['channel'].split('__:', 1)[-1]
+        # A set means another process wrote a newer value
+        if message['data'] in ('set', 'del', 'unlink', 'expired', 'evicted'):
+            self.local_cache.delete(key)
+
+# The original name of the class, when Redis was the only backend
+RedisCache = SummaryCache
+
+# Create a global instance (named for the original Redis-only cache)
+redis_cache = SummaryCache()
@@ -0,0 +1,281 @@
+"""
+Cache Backend Module for AI Summary Feature
+
+This module provides the storage backends behind the summary cache:
+
+- RedisCacheBackend: shared by all processes, for multi-node deployments
+- MemoryCacheBackend: bounded in-process storage, for local development
+- SQLiteCacheBackend: a local file shared by the processes of a single node
+
+Every backend offers the same small interface (get, mget, set_many, delete,
+incr, ping, fingerprint_index) and connects lazily on first use, so importing the
+cache never touches the network.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import redis
+
+try:
+    from .fingerprint import RedisSimHashIndex, SimHashIndex, SQLiteSimHashIndex
+    from .local_cache import LocalCache
+except ImportError:
+    # Also imported as a top-level module by standalone scripts
+    from fingerprint import RedisSimHashIndex, SimHashIndex, SQLiteSimHashIndex
+    from local_cache import LocalCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RedisCacheBackend:
+    """Cache backend stored in Redis"""
+
+    name = 'redis'
+    # Errors that mean Redis is unreachable rather than a bad command
+    connection_errors = (redis.ConnectionError, redis.TimeoutError)
+
+    def __init__(self, url=None, client=None, max_connections=20, socket_timeout=1.0, connect_timeout=1.0):
+        """
+        Initialize the backend; the connection is made on first use
+
+        Args:
+            url (str, optional): Redis URL
+            client (redis.Redis, optional): Existing client to use instead of the URL
+            max_connections (int): Size of the connection pool
+            socket_timeout (float): Seconds before a command times out
+            connect_timeout (float): Seconds before connecting times out
+        """
+        self.url = url
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.connect_timeout = connect_timeout
+        self._client = client
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The Redis client, created on first access"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # A bounded pool and short timeouts so cache calls fail fast
+                    self._client = redis.from_url(
+                        self.url,
+                        decode_responses=True,
+                        max_connections=self.max_connections,
+                        socket_timeout=self.socket_timeout,
+                        socket_connect_timeout=self.connect_timeout,
+                        health_check_interval=30
+                    )
+        return self._client
+
+    def ping(self):
+        self.client.ping()
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def mget(self, keys):
+        return self.client.mget(keys)
+
+    def set_many(self, values, expiry):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, expiry, value)
+        pipe.execute()
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+    def fingerprint_index(self, client_getter, max_distance, expiry):
+        """Return the near-duplicate index stored alongside the cache"""
+        if self._index is None:
+            self._index = RedisSimHashIndex(client_getter, max_distance=max_distance, expiry=expiry)
+        return self._index
+
+class MemoryCacheBackend:
+    """Cache backend held in process memory"""
+
+    name = 'memory'
+    connection_errors = ()
+
+    def __init__(self, max_entries=10000):
+        """
+        Initialize the backend
+
+        Args:
+            max_entries (int): Maximum number of entries before the least
+                recently used entry is evicted
+        """
+        self._store = LocalCache(max_entries=max_entries)
+        self._index = None
+        # Counters are kept apart so they are never evicted
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def ping(self):
+        pass
+
+    def get(self, key):
+        return self.mget([key])[0]
+
+    def mget(self, keys):
+        return [self._counters.get(key) or self._store.get(key) for key in keys]
+
+    def set_many(self, values, expiry):
+        for key, value in values.items():
+            self._store.set(key, value, ttl=expiry)
+
+    def delete(self, key):
+        self._store.delete(key)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._counters.get(key, 0)) + 1
+            self._counters[key] = str(value)
+        return value
+
+    def fingerprint_index(self, client_getter, max_distance, expiry):
+        """Return the near-duplicate index stored alongside the cache"""
+        if self._index is None:
+            self._index = SimHashIndex(max_distance=max_distance, max_entries=self._store.max_entries, expiry=expiry)
+        return self._index
+
+class SQLiteCacheBackend:
+    """Cache backend stored in a local SQLite file"""
+
+    name = 'sqlite'
+    connection_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path):
+        """
+        Initialize the backend; the database is opened on first use
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = str(path)
+        self._conn = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._last_sweep = 0
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def ping(self):
+        with self._lock:
+            self._connection().execute("SELECT 1")
+
+    def get(self, key):
+        return self.mget([key])[0]
+
+    def mget(self, keys):
+        values = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # Stay well below SQLite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                values.update(conn.execute(
+                    f"SELECT key, value FROM cache_entries WHERE key IN ({','.join('?' * len(batch))}) AND expires_at > ?",
+                    (*batch, now)
+                ).fetchall())
+        return [values.get(key) for key in keys]
+
+    def set_many(self, values, expiry):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, now + expiry) for key, value in values.items()]
+            )
+            # Periodically drop expired rows so the file does not grow forever
+            if now - self._last_sweep >= 60:
+                conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+                self._last_sweep = now
+            conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.commit()
+
+    def incr(self, key):
+        with self._lock:
+            conn = self._connection()
+            # Counters never expire
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, '1', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                (key, float('inf'))
+            )
+            value = conn.execute("SELECT value FROM cache_entries WHERE key = ?", (key,)).fetchone()[0]
+            conn.commit()
+        return int(value)
+
+    def fingerprint_index(self, client_getter, max_distance, expiry):
+        """Return the near-duplicate index stored alongside the cache"""
+        if self._index is None:
+            with self._lock:
+                conn = self._connection()
+            self._index = SQLiteSimHashIndex(conn, self._lock, max_distance=max_distance, expiry=expiry)
+        return self._index
+
+def create_cache_backend(backend=None):
+    """
+    Create the cache backend selected by configuration
+
+    Args:
+        backend (str, optional): 'redis', 'memory' or 'sqlite'; defaults to the
+            CACHE_BACKEND environment variable, or to 'redis' when REDIS_URL is
+            set and 'memory' otherwise
+
+    Returns:
+        The cache backend
+    """
+    redis_url = os.getenv('REDIS_URL')
+    backend = (backend or os.getenv('CACHE_BACKEND') or ('redis' if redis_url else 'memory')).lower()
+
+    if backend == 'redis':
+        if not redis_url:
+            logger.warning("CACHE_BACKEND is redis but REDIS_URL is not set; using the memory cache")
+            return MemoryCacheBackend(max_entries=int(os.getenv('CACHE_MEMORY_SIZE', 10000)))
+        return RedisCacheBackend(
+            redis_url,
+            max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 20)),
+            socket_timeout=float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0)),
+            connect_timeout=float(os.getenv('REDIS_CONNECT_TIMEOUT', 1.0))
+        )
+
+    if backend == 'sqlite':
+        default_path = Path(__file__).resolve().parent.parent / 'instance' / 'cache.db'
+        path = Path(os.getenv('CACHE_DB', default_path))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return SQLiteCacheBackend(path)
+
+    if backend != 'memory':
+        logger.warning(f"Unknown cache backend '{backend}', using the memory cache")
+    return MemoryCacheBackend(max_entries=int(os.getenv('CACHE_MEMORY_SIZE', 10000)))
@@ -0,0 +1,150 @@
+"""
+Cache Value Encoding Module for AI Summary Feature
+
+This module encodes cached summaries compactly. Only the fields that cannot be
+rebuilt from the request (headline, summary, categories) are stored, as
+msgpack when it is installed or compact JSON otherwise, and compressed with
+zstd or zlib above a size threshold.
+
+Encoded values are text so they work with a decode_responses Redis client:
+
+    ~<version><format><compression>:<payload>
+
+where format is 'j' (JSON) or 'm' (msgpack), compression is 'n' (none),
+'z' (zlib) or 's' (zstd), and binary payloads are base64-encoded. Values
+starting with '{' are legacy JSON entries written before this encoding and
+are still read.
+"""
+
+import base64
+import json
+import logging
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CODEC_VERSION = '1'
+
+# Response fields rebuilt from the request instead of being stored
+REBUILT_FIELDS = ('original_content', 'settings', 'cached', 'warnings', 'status')
+
+def compact_summary(summary_data):
+    """
+    Reduce a summary response to the fields that must be stored
+
+    Args:
+        summary_data (dict): Summary response data
+
+    Returns:
+        dict: Compact record
+    """
+    record = {key: value for key, value in summary_data.items() if key not in REBUILT_FIELDS}
+    # Callers replace the metadata with their own; only the AI categories are reused
+    categories = (summary_data.get('metadata') or {}).get('categories')
+    record['metadata'] = {'categories': categories} if categories else {}
+    return record
+
+def expand_summary(record, content, length, tone):
+    """
+    Rebuild a summary response from a stored record
+
+    Args:
+        record (dict): Stored record
+        content (str): Content of the request
+        length (int): Summary length percentage
+        tone (str): Summary tone
+
+    Returns:
+        dict: Summary response data
+    """
+    summary_data = dict(record)
+    summary_data.setdefault('metadata', {})
+    summary_data.setdefault('warnings', [])
+    summary_data['original_content'] = content
+    summary_data['settings'] = {
+        'length': length,
+        'tone': tone
+    }
+    return summary_data
+
+def encode_value(record, compress_threshold=1024, use_msgpack=True):
+    """
+    Encode a record as versioned text
+
+    Args:
+        record (dict): JSON-serializable record
+        compress_threshold (int): Payloads of at least this many bytes are compressed
+        use_msgpack (bool): Use msgpack when it is installed
+
+    Returns:
+        str: Encoded value
+    """
+    if use_msgpack and msgpack is not None:
+        data_format, payload = 'm', msgpack.packb(record, use_bin_type=True)
+    else:
+        data_format, payload = 'j', json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    compression = 'n'
+    if len(payload) >= compress_threshold:
+        if zstandard is not None:
+            compressed, method = zstandard.ZstdCompressor(level=3).compress(payload), 's'
+        else:
+            compressed, method = zlib.compress(payload, 6), 'z'
+        if len(compressed) < len(payload):
+            compression, payload = method, compressed
+
+    if data_format == 'j' and compression == 'n':
+        text = payload.decode('utf-8')
+    else:
+        text = base64.b64encode(payload).decode('ascii')
+    return f"~{CODEC_VERSION}{data_format}{compression}:{text}"
+
+def decode_value(value):
+    """
+    Decode a value written by encode_value or a legacy JSON entry
+
+    Args:
+        value (str): Stored value
+
+    Returns:
+        tuple: (record, legacy flag), or (None, False) if the value cannot be read
+    """
+    if value.startswith('{'):
+        return json.loads(value), True
+
+    header, _, text = value.partition(':')
+    if len(header) != 4 or header[0] != '~' or header[1] != CODEC_VERSION:
+        logger.warning(f"Unknown cache value encoding {header[:4]!r}")
+        return None, False
+
+    data_format, compression = header[2], header[3]
+    if data_format == 'j' and compression == 'n':
+        return json.loads(text), False
+
+    payload = base64.b64decode(text)
+    if compression == 'z':
+        payload = zlib.decompress(payload)
+    elif compression == 's':
+        if zstandard is None:
+            logger.warning("Cache value is zstd-compressed but zstandard is not installed")
+            return None, False
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+
+    if data_format == 'm':
+        if msgpack is None:
+            logger.warning("Cache value is msgpack-encoded but msgpack is not installed")
+            return None, False
+        return msgpack.unpackb(payload, raw=False), False
+    return json.loads(payload.decode('utf-8')), False
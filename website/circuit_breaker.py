@@ -0,0 +1,141 @@
+"""
+Circuit Breaker Module for AI Summary Feature
+
+This module tracks the health of an external service such as Redis. Calls go
+through while the service is healthy or degraded. After repeated connection
+failures the circuit opens: calls fail fast without touching the network and
+a background probe checks the service with exponential backoff until it
+recovers.
+"""
+
+import logging
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+OPEN = 'open'
+
+class CircuitBreaker:
+    """Connection-health state machine with background recovery probing"""
+
+    def __init__(self, probe, failure_threshold=3, base_delay=1.0, max_delay=60.0, name='service'):
+        """
+        Initialize the breaker
+
+        Args:
+            probe (callable): Checks the service and raises if it is unavailable
+            failure_threshold (int): Consecutive failures that open the circuit
+            base_delay (float): Seconds before the first recovery probe
+            max_delay (float): Maximum seconds between recovery probes
+            name (str): Service name used in log messages
+        """
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.name = name
+        self._state = HEALTHY
+        self._failures = 0
+        self._probe_attempts = 0
+        self._probe_timer = None
+        self._opened_at = None
+        self._lock = threading.Lock()
+        self._stats = {'failures': 0, 'opened': 0, 'rejected': 0, 'probes': 0}
+
+    @property
+    def state(self):
+        return self._state
+
+    def allow(self):
+        """
+        Check whether a call should be attempted
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        if self._state == OPEN:
+            self._stats['rejected'] += 1
+            return False
+        return True
+
+    def record_success(self):
+        """Record a successful call"""
+        if self._state == HEALTHY and not self._failures:
+            return
+        with self._lock:
+            if self._state != OPEN:
+                self._failures = 0
+                self._state = HEALTHY
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit after too many in a row"""
+        with self._lock:
+            self._stats['failures'] += 1
+            if self._state == OPEN:
+                return
+            self._failures += 1
+            if self._failures < self.failure_threshold:
+                self._state = DEGRADED
+                return
+        self.trip()
+
+    def trip(self):
+        """Open the circuit and start probing for recovery"""
+        with self._lock:
+            if self._state == OPEN:
+                return
+            self._state = OPEN
+            self._opened_at = time.time()
+            self._probe_attempts = 0
+            self._stats['opened'] += 1
+            self._schedule_probe()
+        logger.warning(f"{self.name} circuit opened; calls will fail fast until it recovers")
+
+    def _schedule_probe(self):
+        delay = min(self.max_delay, self.base_delay * (2 ** self._probe_attempts))
+        self._probe_timer = threading.Timer(delay, self._run_probe)
+        self._probe_timer.daemon = True
+        self._probe_timer.start()
+
+    def _run_probe(self):
+        self._stats['probes'] += 1
+        try:
+            self.probe()
+        except Exception as e:
+            with self._lock:
+                self._probe_attempts += 1
+                self._schedule_probe()
+            logger.debug(f"{self.name} probe failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._state = HEALTHY
+            self._failures = 0
+            self._probe_timer = None
+        logger.info(f"{self.name} recovered; circuit closed")
+
+    def stop(self):
+        """Cancel any scheduled probe"""
+        with self._lock:
+            if self._probe_timer is not None:
+                self._probe_timer.cancel()
+                self._probe_timer = None
+
+    def stats(self):
+        """
+        Report the breaker state and counters
+
+        Returns:
+            dict: Breaker statistics
+        """
+        stats = dict(self._stats)
+        stats['state'] = self._state
+        stats['consecutive_failures'] = self._failures
+        if self._state == OPEN and self._opened_at:
+            stats['open_for'] = round(time.time() - self._opened_at, 1)
+        return stats
@@ -10,6 +10,7 @@ import logging
 from collections import Counter
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 
 # Configure logging
@@ -77,6 +78,19 @@ def load_filter_lists():
 # Initialize filter lists
 FILTER_LISTS = load_filter_lists()
 
+@lru_cache(maxsize=4096)
+def keyword_pattern(keyword):
+    """
+    Get the compiled whole-word pattern for a keyword
+    
+    Args:
+        keyword (str): Keyword to match
+        
+    Returns:
+        re.Pattern: Compiled pattern, shared across filter instances
+    """
+    return re.compile(r'\b' + re.escape(keyword.lower()) + r'\b')
+
 class ContentFilter:
     """Content filtering class for detecting inappropriate content"""
     
@@ -117,8 +131,7 @@ class ContentFilter:
             
             for keyword in keywords:
                 # Use word boundary to match whole words only
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                if re.search(pattern, content):
+                if keyword_pattern(keyword).search(content):
                     matches.append(keyword)
             
             if matches:
@@ -299,4 +312,19 @@ def filter_content(content, user_role='user', strict_mode=False):
     content_filter = ContentFilter(strict_mode=strict_mode)
     
     # Filter the content - user_role parameter is kept for backward compatibility
-    return content_filter.filter_content(content, user_role) 
\ No newline at end of file
+    return content_filter.filter_content(content, user_role) 
+
+def filter_contents(contents, user_role='user', strict_mode=False):
+    """
+    Filter several pieces of content in one pass with a single filter instance
+    
+    Args:
+        contents (list): Contents to filter
+        user_role (str): User role for permission checks (no longer used)
+        strict_mode (bool): Whether to use strict filtering mode
+        
+    Returns:
+        list: Filtering results in the same order as the contents
+    """
+    content_filter = ContentFilter(strict_mode=strict_mode)
+    return [content_filter.filter_content(content, user_role) for content in contents]
@@ -6,19 +6,107 @@ from various sources before sending it to the Gemini API for summarization.
 """
 
 import re
+import os
 import html
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 import json
+import math
 import hashlib
+from collections import Counter
 from html.parser import HTMLParser
 import logging
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from .cache import redis_cache
+except ImportError:
+    # Also imported as a top-level module by standalone scripts
+    from cache import redis_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Extracted pages are reused without a request for URL_CACHE_FRESH seconds, then
+# revalidated with a conditional request until URL_CACHE_EXPIRY
+URL_CACHE_FRESH = int(os.getenv('URL_CACHE_FRESH', 300))
+URL_CACHE_EXPIRY = int(os.getenv('URL_CACHE_EXPIRY', 86400))
+# Failed extractions are remembered briefly so a broken URL is not refetched on every request
+URL_NEGATIVE_CACHE_TTL = int(os.getenv('URL_NEGATIVE_CACHE_TTL', 60))
+# Bump when extraction changes, so cached pages are extracted again
+URL_EXTRACTOR_VERSION = '1'
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref_src')
+
+# Direct content over this many estimated tokens is reduced to its most central
+# sentences instead of being truncated (0 keeps plain truncation)
+EXTRACTIVE_TOKEN_BUDGET = int(os.getenv('EXTRACTIVE_TOKEN_BUDGET', 0))
+
+# Texts with more sentences than this are ranked by similarity to the whole
+# document instead of TextRank, whose pairwise similarity matrix grows with
+# the square of the sentence count
+EXTRACTIVE_MAX_SENTENCES = int(os.getenv('EXTRACTIVE_MAX_SENTENCES', 500))
+
+# Rough size of a token in characters, used to convert character limits
+CHARS_PER_TOKEN = 4
+
+# A token per run of up to four word characters and per punctuation mark, a
+# close approximation of subword tokenizers for English text
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+# The end of a sentence (with trailing quotes or brackets) or of a paragraph
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n\s*\n")
+
+def estimate_tokens(text):
+    """
+    Estimate the number of model tokens in a text without a tokenizer
+    
+    Args:
+        text (str): Text to measure
+        
+    Returns:
+        int: Estimated token count
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+def sentence_index(content):
+    """
+    Index sentence boundaries in a single pass over the content
+    
+    Args:
+        content (str): Content to index
+        
+    Returns:
+        list: (start, end, paragraph_end) for each sentence, covering the whole content
+    """
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(content):
+        spans.append((start, match.end(), match.group().count('\n') >= 2))
+        start = match.end()
+    if start < len(content):
+        spans.append((start, len(content), True))
+    return spans
+
+
+# Words too common to tell sentences apart
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i if in into is it its "
+    "of on or our she so than that the their them there these they this to was we were which "
+    "who will with would you your not no can could also more most said says".split()
+)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
 class MLStripper(HTMLParser):
     """HTML Parser for stripping HTML tags while preserving structure"""
     
@@ -79,84 +167,174 @@ def strip_html(html_content):
     
     return text.strip()
 
+def canonicalize_url(url):
+    """
+    Normalize a URL so that equivalent spellings share one cache entry
+    
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, and sorts the query string.
+    
+    Args:
+        url (str): URL to normalize
+        
+    Returns:
+        str: Canonical URL
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, netloc.rpartition(':')[2]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rpartition(':')[0]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, urlencode(query), ''))
+
+def url_cache_key(url):
+    """Generate the extraction cache key of a canonical URL"""
+    return f"url_extract:v{URL_EXTRACTOR_VERSION}:{hashlib.sha256(url.encode()).hexdigest()}"
+
 def extract_content_from_url(url):
     """
     Extract main content from a URL
     
+    Extractions are cached by canonical URL. A fresh entry is returned without
+    any request; an older one is revalidated with its ETag and Last-Modified
+    so an unchanged page is neither downloaded nor parsed again. Failures are
+    cached for URL_NEGATIVE_CACHE_TTL seconds; if the page was extracted before,
+    that extraction is served instead for the same time.
+    
     Args:
         url (str): URL to extract content from
         
     Returns:
         dict: Dictionary containing extracted content and metadata
     """
-    try:
-        # Validate URL
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
-            return {
-                "success": False,
-                "error": "Invalid URL format"
-            }
+    # Validate URL
+    parsed_url = urlparse(url)
+    if not parsed_url.scheme or not parsed_url.netloc:
+        return {
+            "success": False,
+            "error": "Invalid URL format"
+        }
+    
+    key = url_cache_key(canonicalize_url(url))
+    entry, stale = redis_cache.get_value(key)
+    if entry is not None and not stale:
+        return _cached_extraction(entry, url)
+    
+    previous = entry if entry is not None and 'error' not in entry else None
+    entry = _fetch_extraction(url, previous)
+    if 'error' in entry and previous is not None:
+        # Keep serving the last good extraction while the page is unreachable,
+        # and back off for URL_NEGATIVE_CACHE_TTL before trying the page again
+        redis_cache.set_value(key, previous, URL_NEGATIVE_CACHE_TTL, URL_CACHE_EXPIRY)
+        return _cached_extraction(previous, url)
+    if 'error' in entry:
+        redis_cache.set_value(key, entry, URL_NEGATIVE_CACHE_TTL)
+    else:
+        redis_cache.set_value(key, entry, URL_CACHE_FRESH, URL_CACHE_EXPIRY)
+    return _cached_extraction(entry, url)
+
+def _cached_extraction(entry, url):
+    """Build the extraction result for a request from a cache entry"""
+    if 'error' in entry:
+        return {
+            "success": False,
+            "error": entry['error']
+        }
+    return {
+        "success": True,
+        "content": entry['content'],
+        "metadata": dict(entry['metadata'], url=url)
+    }
+
+def _fetch_extraction(url, previous=None):
+    """
+    Fetch and extract a page, revalidating a previous extraction if given
+    
+    Args:
+        url (str): URL to fetch
+        previous (dict, optional): Earlier cache entry of the URL
         
+    Returns:
+        dict: Cache entry with content, metadata and validators, or an error
+    """
+    try:
         # Add user agent to avoid being blocked
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        headers = dict(REQUEST_HEADERS)
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
         
         # Fetch the content
         response = requests.get(url, headers=headers, timeout=10)
+        if previous and response.status_code == 304:
+            logger.info(f"Extraction of {url} revalidated")
+            return previous
         response.raise_for_status()
         
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract metadata
-        metadata = {
-            "title": soup.title.string if soup.title else "",
-            "url": url,
-            "domain": parsed_url.netloc,
-        }
-        
-        # Try to find the main content
-        # First, look for article tag
-        main_content = soup.find('article')
-        
-        # If no article tag, try common content containers
-        if not main_content:
-            for container in ['main', 'div[role="main"]', '.content', '#content', '.post', '.article']:
-                main_content = soup.select_one(container)
-                if main_content:
-                    break
-        
-        # If still no content found, use the body
-        if not main_content:
-            main_content = soup.body
-        
-        # Remove unwanted elements
-        for element in main_content.select('script, style, nav, footer, header, aside, .ads, .comments, .sidebar'):
-            element.decompose()
-        
-        # Extract text content
-        content = strip_html(str(main_content))
-        
+        content, metadata = extract_page(response.text, url)
         return {
-            "success": True,
             "content": content,
-            "metadata": metadata
+            "metadata": metadata,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified')
         }
         
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching URL {url}: {str(e)}")
-        return {
-            "success": False,
-            "error": f"Failed to fetch URL: {str(e)}"
-        }
+        return {"error": f"Failed to fetch URL: {str(e)}"}
     except Exception as e:
         logger.error(f"Error processing URL {url}: {str(e)}")
-        return {
-            "success": False,
-            "error": f"Failed to process content: {str(e)}"
-        }
+        return {"error": f"Failed to process content: {str(e)}"}
+
+def extract_page(page_html, url):
+    """
+    Extract the main text and metadata from a page
+    
+    Args:
+        page_html (str): HTML of the page
+        url (str): URL of the page
+        
+    Returns:
+        tuple: (content, metadata)
+    """
+    # Parse HTML
+    soup = BeautifulSoup(page_html, 'html.parser')
+    
+    # Extract metadata
+    metadata = {
+        "title": soup.title.string if soup.title else "",
+        "url": url,
+        "domain": urlparse(url).netloc,
+    }
+    
+    # Try to find the main content
+    # First, look for article tag
+    main_content = soup.find('article')
+    
+    # If no article tag, try common content containers
+    if not main_content:
+        for container in ['main', 'div[role="main"]', '.content', '#content', '.post', '.article']:
+            main_content = soup.select_one(container)
+            if main_content:
+                break
+    
+    # If still no content found, use the body
+    if not main_content:
+        main_content = soup.body
+    
+    # Remove unwanted elements
+    for element in main_content.select('script, style, nav, footer, header, aside, .ads, .comments, .sidebar'):
+        element.decompose()
+    
+    # Extract text content
+    content = strip_html(str(main_content))
+    return content, metadata
 
 def sanitize_html(html_content):
     """
@@ -252,13 +430,15 @@ def extract_metadata(content):
     
     return metadata
 
-def preprocess_for_gemini(content, max_length=10000):
+def preprocess_for_gemini(content, max_length=10000, token_budget=None):
     """
     Preprocess content to make it compatible with Gemini API
     
     Args:
         content (str): Content to preprocess
         max_length (int): Maximum content length for Gemini API
+        token_budget (int, optional): Reduce content over this many estimated
+            tokens extractively rather than cutting off its end
         
     Returns:
         str: Preprocessed content
@@ -266,6 +446,9 @@ def preprocess_for_gemini(content, max_length=10000):
     # Normalize content
     content = normalize_content(content)
     
+    if token_budget:
+        content = reduce_content(content, token_budget)
+    
     # Truncate if too long
     if len(content) > max_length:
         # Try to truncate at a sentence boundary
@@ -278,6 +461,130 @@ def preprocess_for_gemini(content, max_length=10000):
     
     return content
 
+def _sentence_terms(sentence):
+    return [word for word in _WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS]
+
+def rank_sentences(sentences, damping=0.85, iterations=30):
+    """
+    Score how central each sentence is to the text
+    
+    Sentences are TF-IDF vectors. With NumPy the scores come from TextRank
+    over their cosine similarities; without it, or for texts of more than
+    EXTRACTIVE_MAX_SENTENCES sentences, from the cosine similarity of each
+    sentence to the whole document, which needs no pairwise comparison.
+    
+    Args:
+        sentences (list): Sentences of one text
+        damping (float): TextRank damping factor
+        iterations (int): Maximum TextRank power iterations
+        
+    Returns:
+        list: Score of each sentence, higher is more central
+    """
+    if len(sentences) <= 2:
+        return [1.0] * len(sentences)
+    
+    terms = [Counter(_sentence_terms(sentence)) for sentence in sentences]
+    document_frequency = Counter(term for counts in terms for term in counts)
+    idf = {term: math.log(len(sentences) / count) + 1 for term, count in document_frequency.items()}
+    
+    if np is not None and len(sentences) <= EXTRACTIVE_MAX_SENTENCES:
+        vocabulary = {term: i for i, term in enumerate(idf)}
+        vectors = np.zeros((len(sentences), len(vocabulary)))
+        for row, counts in enumerate(terms):
+            for term, count in counts.items():
+                vectors[row, vocabulary[term]] = count * idf[term]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0)
+        totals = similarity.sum(axis=1, keepdims=True)
+        # Sentences sharing no terms with any other link to every sentence evenly
+        transition = np.where(totals > 0, similarity / np.where(totals == 0, 1, totals), 1 / len(sentences))
+        
+        scores = np.full(len(sentences), 1 / len(sentences))
+        for _ in range(iterations):
+            updated = (1 - damping) / len(sentences) + damping * (transition.T @ scores)
+            converged = np.abs(updated - scores).sum() < 1e-6
+            scores = updated
+            if converged:
+                break
+        return scores.tolist()
+    
+    centroid = Counter()
+    for counts in terms:
+        centroid.update(counts)
+    centroid = {term: count * idf[term] for term, count in centroid.items()}
+    centroid_norm = math.sqrt(sum(weight * weight for weight in centroid.values()))
+    
+    scores = []
+    for counts in terms:
+        weights = {term: count * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if norm == 0 or centroid_norm == 0:
+            scores.append(0.0)
+            continue
+        dot = sum(weight * centroid[term] for term, weight in weights.items())
+        scores.append(dot / (norm * centroid_norm))
+    return scores
+
+def reduce_content(content, max_tokens):
+    """
+    Shrink content to a token budget by keeping its most central sentences
+    
+    Args:
+        content (str): Content to reduce
+        max_tokens (int): Target size in estimated tokens
+        
+    Returns:
+        str: Selected sentences in their original order, or the content
+            unchanged if it already fits
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    
+    sentences = [content[start:end] for start, end, _ in sentence_index(content)]
+    sentence_tokens = [estimate_tokens(sentence) for sentence in sentences]
+    scores = rank_sentences(sentences)
+    
+    selected = []
+    used = 0
+    for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        if used + sentence_tokens[i] <= max_tokens:
+            selected.append(i)
+            used += sentence_tokens[i]
+    
+    reduced = ''.join(sentences[i] for i in sorted(selected)).strip()
+    logger.info(f"Reduced content from ~{sum(sentence_tokens)} to ~{used} tokens ({len(selected)}/{len(sentences)} sentences)")
+    return reduced
+
+def extractive_summary(content, length):
+    """
+    Summarize content locally, without a model, from its most central sentences
+    
+    Args:
+        content (str): Content to summarize
+        length (int): Summary length as a percentage of the content
+        
+    Returns:
+        tuple: (headline, summary)
+    """
+    content = normalize_content(content)
+    sentences = [content[start:end].strip() for start, end, _ in sentence_index(content)]
+    sentences = [sentence for sentence in sentences if sentence]
+    if not sentences:
+        return '', ''
+    
+    budget = max(estimate_tokens(sentences[0]), estimate_tokens(content) * length // 100)
+    summary = reduce_content(content, budget)
+    
+    # The most central sentence, shortened, serves as the headline
+    scores = rank_sentences(sentences)
+    words = sentences[max(range(len(sentences)), key=lambda i: scores[i])].rstrip('.!?').split()
+    headline = ' '.join(words[:12]) + ('...' if len(words) > 12 else '')
+    return headline, summary
+
 def process_content(input_data):
     """
     Main function to process content from various sources
@@ -323,7 +630,7 @@ def process_content(input_data):
                 content = strip_html(content)
             
             # Normalize and preprocess content
-            content = preprocess_for_gemini(content)
+            content = preprocess_for_gemini(content, token_budget=EXTRACTIVE_TOKEN_BUDGET)
             
             # Extract metadata
             metadata = extract_metadata(content)
@@ -0,0 +1,152 @@
+"""
+Content Store Module for AI Summary Feature
+
+This module hands out immutable handles to request content. Within a process a
+handle is passed around instead of the text itself, so content is neither
+copied nor run through a codec between the request handler, the task queue
+and the model call. Content is only compressed when a handle crosses a process
+boundary, such as a durable task queue, and is looked up by digest on the way
+back so the same process does not decompress its own content.
+"""
+
+import base64
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ContentHandle:
+    """Immutable reference to a piece of content held in memory once"""
+
+    __slots__ = ('digest', '_content')
+
+    def __init__(self, content, digest=None):
+        """
+        Initialize the handle
+
+        Args:
+            content (str): Content to reference
+            digest (str, optional): SHA-256 hex digest of the content, if already known
+        """
+        self._content = content
+        self.digest = digest or hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def read(self):
+        """Return the content; the same string object every time, never a copy"""
+        return self._content
+
+    def to_wire(self):
+        """
+        Encode the content for a process or network boundary
+
+        Returns:
+            dict: Digest and gzip-compressed, base64-encoded content
+        """
+        data = base64.b64encode(gzip.compress(self._content.encode('utf-8'))).decode('ascii')
+        return {'digest': self.digest, 'data': data}
+
+    def __len__(self):
+        return len(self._content)
+
+    def __eq__(self, other):
+        return isinstance(other, ContentHandle) and other.digest == self.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"ContentHandle({self.digest[:12]}, {len(self._content)} chars)"
+
+class ContentStore:
+    """
+    Recently stored content, indexed by digest
+
+    Identical content shares one handle, and content coming back over a
+    boundary is resolved locally when this process still holds it.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Initialize the store
+
+        Args:
+            max_bytes (int): Approximate content size kept indexed before the
+                least recently used handles are dropped from the index
+        """
+        self.max_bytes = max_bytes
+        self._handles = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'decoded': 0}
+
+    def put(self, content):
+        """
+        Store content and return its handle
+
+        Args:
+            content (str): Content to store
+
+        Returns:
+            ContentHandle: Handle to the content
+        """
+        return self._add(ContentHandle(content))
+
+    def get(self, digest):
+        """Return the handle with the given digest, or None if it is not held"""
+        with self._lock:
+            handle = self._handles.get(digest)
+            if handle is not None:
+                self._handles.move_to_end(digest)
+            return handle
+
+    def from_wire(self, wire):
+        """
+        Rebuild a handle encoded by ContentHandle.to_wire
+
+        Args:
+            wire (dict): Encoded handle
+
+        Returns:
+            ContentHandle: Handle to the content
+        """
+        handle = self.get(wire['digest'])
+        if handle is not None:
+            self.stats['local_hits'] += 1
+            return handle
+        self.stats['decoded'] += 1
+        content = gzip.decompress(base64.b64decode(wire['data'])).decode('utf-8')
+        return self._add(ContentHandle(content, wire['digest']))
+
+    def _add(self, handle):
+        with self._lock:
+            existing = self._handles.get(handle.digest)
+            if existing is not None:
+                self._handles.move_to_end(handle.digest)
+                return existing
+            self._handles[handle.digest] = handle
+            self._size += len(handle)
+            # The index only forgets handles; holders keep their content
+            while self._size > self.max_bytes and len(self._handles) > 1:
+                _, dropped = self._handles.popitem(last=False)
+                self._size -= len(dropped)
+            return handle
+
+def resolve_content(content):
+    """
+    Return the text of a handle, or the content itself if it is already text
+
+    Args:
+        content (str or ContentHandle): Content or handle
+
+    Returns:
+        str: Content
+    """
+    return content.read() if isinstance(content, ContentHandle) else content
+
+# Global content store instance
+content_store = ContentStore()
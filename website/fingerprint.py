@@ -0,0 +1,336 @@
+"""
+Content Fingerprinting Module for AI Summary Feature
+
+This module computes SimHash fingerprints of normalized text shingles and
+indexes them so near-duplicate content (syndicated stories, whitespace or
+byline differences) can be found quickly.
+
+The index splits each fingerprint into max_distance + 1 bands. Two
+fingerprints within max_distance bits of each other must agree exactly on at
+least one band, so a lookup only has to verify the few entries sharing a band
+value instead of scanning the whole index.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+# Texts with fewer words than this are too short for a stable fingerprint
+MIN_FINGERPRINT_WORDS = 20
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def normalize_words(text):
+    """
+    Split text into lowercase words, dropping punctuation and whitespace
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        list: Normalized words
+    """
+    return _WORD_PATTERN.findall(text.lower())
+
+def shingles(words, size=3):
+    """
+    Build overlapping word shingles
+
+    Args:
+        words (list): Normalized words
+        size (int): Number of words per shingle
+
+    Returns:
+        list: Shingles as strings
+    """
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def simhash(text, shingle_size=3):
+    """
+    Compute the 64-bit SimHash fingerprint of a text
+
+    Args:
+        text (str): Text to fingerprint
+        shingle_size (int): Number of words per shingle
+
+    Returns:
+        int: Fingerprint, or None if the text is too short
+    """
+    words = normalize_words(text)
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles(words, shingle_size):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a, b):
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count("1")
+
+def similarity(distance):
+    """Similarity score between 0 and 1 for a Hamming distance"""
+    return round(1 - distance / FINGERPRINT_BITS, 4)
+
+class SimHashIndex:
+    """In-memory index of fingerprints for near-duplicate lookups"""
+
+    def __init__(self, max_distance=3, max_entries=10000, expiry=3600):
+        """
+        Initialize the index
+
+        Args:
+            max_distance (int): Maximum Hamming distance of a near duplicate
+            max_entries (int): Maximum number of indexed entries before the
+                least recently added entry is dropped
+            expiry (int): Seconds before an entry is dropped, normally the
+                lifetime of the cached data it points to
+        """
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_bits = -(-FINGERPRINT_BITS // self.band_count)
+        self.max_entries = max_entries
+        self.expiry = expiry
+        self._buckets = {}
+        # Bucket names and expiry time of each member, least recently added first
+        self._members = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bands(self, fingerprint):
+        """Split a fingerprint into its band values"""
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.band_count)]
+
+    def bucket_names(self, fingerprint, scope=''):
+        """Names of the buckets a fingerprint belongs to"""
+        return [f"{scope}:{band}:{value:x}" for band, value in enumerate(self.bands(fingerprint))]
+
+    def add(self, fingerprint, key, scope=''):
+        """
+        Add a fingerprint to the index
+
+        Args:
+            fingerprint (int): Fingerprint of the content
+            key (str): Key of the stored entry, e.g. a cache key
+            scope (str): Namespace, e.g. summary length and tone
+        """
+        self.add_many([(fingerprint, key)], scope)
+
+    def add_many(self, entries, scope=''):
+        """
+        Add several fingerprints to the index in one write
+
+        Args:
+            entries (list): (fingerprint, key) pairs
+            scope (str): Namespace, e.g. summary length and tone
+        """
+        pairs = []
+        for fingerprint, key in entries:
+            member = f"{fingerprint:x}|{key}"
+            pairs.extend((name, member) for name in self.bucket_names(fingerprint, scope))
+        if pairs:
+            self._add_members(pairs)
+
+    def query(self, fingerprint, scope=''):
+        """
+        Find indexed entries within max_distance of a fingerprint
+
+        Args:
+            fingerprint (int): Fingerprint to look up
+            scope (str): Namespace to search
+
+        Returns:
+            list: (key, distance, indexed fingerprint) tuples, closest first
+        """
+        return self.query_many([fingerprint], scope)[0]
+
+    def query_many(self, fingerprints, scope=''):
+        """
+        Look up several fingerprints with one read
+
+        Args:
+            fingerprints (list): Fingerprints to look up
+            scope (str): Namespace to search
+
+        Returns:
+            list: Matches for each fingerprint, as returned by query()
+        """
+        groups = self._members_many([self.bucket_names(fingerprint, scope) for fingerprint in fingerprints])
+        results = []
+        for fingerprint, members in zip(fingerprints, groups):
+            matches = []
+            for member in members:
+                fingerprint_hex, _, key = member.partition("|")
+                indexed = int(fingerprint_hex, 16)
+                distance = hamming_distance(fingerprint, indexed)
+                if distance <= self.max_distance:
+                    matches.append((key, distance, indexed))
+            results.append(sorted(matches, key=lambda match: (match[1], match[0])))
+        return results
+
+    def discard(self, fingerprint, key, scope=''):
+        """Remove an entry whose stored data no longer exists"""
+        member = f"{fingerprint:x}|{key}"
+        self._remove_members([(name, member) for name in self.bucket_names(fingerprint, scope)])
+
+    def _add_members(self, pairs):
+        now = time.monotonic()
+        with self._lock:
+            for name, member in pairs:
+                self._buckets.setdefault(name, set()).add(member)
+                names, _ = self._members.pop(member, (set(), None))
+                names.add(name)
+                self._members[member] = (names, now + self.expiry)
+            self._evict(now)
+
+    def _members_many(self, groups):
+        with self._lock:
+            self._evict(time.monotonic())
+            return [set().union(*(self._buckets.get(name, set()) for name in names)) for names in groups]
+
+    def _remove_members(self, pairs):
+        with self._lock:
+            for _, member in pairs:
+                entry = self._members.pop(member, None)
+                if entry is not None:
+                    self._drop(member, entry[0])
+
+    def _evict(self, now):
+        # Entries are ordered by the time they were added, so expired entries come first
+        while self._members:
+            member, (names, expires_at) = next(iter(self._members.items()))
+            if len(self._members) <= self.max_entries and expires_at > now:
+                break
+            del self._members[member]
+            self._drop(member, names)
+
+    def _drop(self, member, names):
+        for name in names:
+            bucket = self._buckets.get(name)
+            if bucket is not None:
+                bucket.discard(member)
+                if not bucket:
+                    del self._buckets[name]
+
+class RedisSimHashIndex(SimHashIndex):
+    """Fingerprint index stored as Redis sets, shared by all processes"""
+
+    def __init__(self, client_getter, max_distance=3, expiry=3600, key_prefix='simhash:'):
+        """
+        Initialize the index
+
+        Args:
+            client_getter (callable): Returns the Redis client, or None if unavailable
+            max_distance (int): Maximum Hamming distance of a near duplicate
+            expiry (int): Seconds before an unused bucket expires
+            key_prefix (str): Prefix for the bucket keys
+        """
+        super().__init__(max_distance=max_distance, expiry=expiry)
+        self.client_getter = client_getter
+        self.key_prefix = key_prefix
+
+    def _client(self):
+        client = self.client_getter()
+        if client is None:
+            raise ConnectionError("Redis is not connected")
+        return client
+
+    def _add_members(self, pairs):
+        pipe = self._client().pipeline()
+        for name, member in pairs:
+            pipe.sadd(f"{self.key_prefix}{name}", member)
+            pipe.expire(f"{self.key_prefix}{name}", self.expiry)
+        pipe.execute()
+
+    def _members_many(self, groups):
+        pipe = self._client().pipeline()
+        for names in groups:
+            for name in names:
+                pipe.smembers(f"{self.key_prefix}{name}")
+        replies = iter(pipe.execute())
+        return [set().union(*(next(replies) for _ in names)) for names in groups]
+
+    def _remove_members(self, pairs):
+        pipe = self._client().pipeline()
+        for name, member in pairs:
+            pipe.srem(f"{self.key_prefix}{name}", member)
+        pipe.execute()
+
+class SQLiteSimHashIndex(SimHashIndex):
+    """Fingerprint index stored in the SQLite cache database"""
+
+    def __init__(self, conn, lock, max_distance=3, expiry=3600):
+        """
+        Initialize the index
+
+        Args:
+            conn (sqlite3.Connection): Open connection to the cache database
+            lock (threading.Lock): Lock guarding the connection
+            max_distance (int): Maximum Hamming distance of a near duplicate
+            expiry (int): Seconds before an entry is ignored and swept
+        """
+        super().__init__(max_distance=max_distance, expiry=expiry)
+        self._conn = conn
+        self._lock = lock
+        self._last_sweep = 0
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS simhash_buckets ("
+                "bucket TEXT NOT NULL, member TEXT NOT NULL, expires_at REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (bucket, member))"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(simhash_buckets)")}
+            if 'expires_at' not in columns:
+                # Rows from before expiry was tracked are swept on the next write
+                self._conn.execute("ALTER TABLE simhash_buckets ADD COLUMN expires_at REAL NOT NULL DEFAULT 0")
+            self._conn.commit()
+
+    def _add_members(self, pairs):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO simhash_buckets (bucket, member, expires_at) VALUES (?, ?, ?)",
+                [(name, member, now + self.expiry) for name, member in pairs]
+            )
+            # Periodically drop expired rows, including those of namespaces
+            # left behind by a generation bump, so the file does not grow forever
+            if now - self._last_sweep >= 60:
+                self._conn.execute("DELETE FROM simhash_buckets WHERE expires_at <= ?", (now,))
+                self._last_sweep = now
+            self._conn.commit()
+
+    def _members_many(self, groups):
+        results = []
+        now = time.time()
+        with self._lock:
+            for names in groups:
+                rows = self._conn.execute(
+                    f"SELECT member FROM simhash_buckets WHERE bucket IN ({','.join('?' * len(names))}) AND expires_at > ?",
+                    (*names, now)
+                ).fetchall()
+                results.append({row[0] for row in rows})
+        return results
+
+    def _remove_members(self, pairs):
+        with self._lock:
+            self._conn.executemany("DELETE FROM simhash_buckets WHERE bucket = ? AND member = ?", pairs)
+            self._conn.commit()
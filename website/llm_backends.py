@@ -0,0 +1,259 @@
+"""
+LLM Backend Module for AI Summary Feature
+
+This module provides the model backends behind summarization:
+
+- GeminiBackend: the Gemini API
+- FakeLLMBackend: a deterministic local model with configurable latency,
+  error rate and output size, for load tests and capacity planning without
+  the real API
+
+Every backend offers the interface of the Gemini model that the views call:
+generate_content(contents, generation_config, stream) returns a response with
+a text attribute, or an iterable of such chunks when streaming.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+
+from .content_processor import estimate_tokens
+from .summary_parser import SOURCE_MARKER
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Latency distributions supported by the fake backend
+LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'exponential', 'lognormal')
+
+class LLMResponse:
+    """Response, or streamed response chunk, of a backend"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+class FakeLLMError(RuntimeError):
+    """Failure injected by the fake backend"""
+
+class GeminiBackend:
+    """Backend calling the Gemini API"""
+
+    name = 'gemini'
+
+    def __init__(self, model_name, api_key=None):
+        """
+        Initialize the backend
+
+        Args:
+            model_name (str): Gemini model to use
+            api_key (str, optional): API key; defaults to GEMINI_API_KEY
+        """
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or os.getenv('GEMINI_API_KEY'))
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        return self._model.generate_content(contents=contents, generation_config=generation_config, stream=stream)
+
+class FakeLLMBackend:
+    """
+    Local stand-in for the model that answers every prompt format the views use
+
+    Responses are built from the words of the text to summarize, which follows
+    SOURCE_MARKER in the prompts of the views, so the same prompt always gets
+    the same answer. Latencies and failures are drawn from a seeded random
+    generator, so a run with the same seed and call order is reproducible.
+    """
+
+    name = 'fake'
+    model_name = 'fake'
+
+    def __init__(self, latency_ms=0, latency_distribution='constant', latency_sigma=0.5,
+                 tokens_per_second=0, error_rate=0.0, output_tokens=None, output_ratio=0.3,
+                 seed=0, sleep=time.sleep):
+        """
+        Initialize the backend
+
+        Args:
+            latency_ms (float): Time to the first token; the mean for 'uniform'
+                and 'exponential', the median for 'lognormal'
+            latency_distribution (str): 'constant', 'uniform', 'exponential' or 'lognormal'
+            latency_sigma (float): Spread of the latency; the relative half-width
+                for 'uniform', the shape for 'lognormal'
+            tokens_per_second (float): Output generation speed; 0 for instant output
+            error_rate (float): Fraction of calls that fail with FakeLLMError
+            output_tokens (int, optional): Fixed output size of every summary
+            output_ratio (float): Output size relative to the input when the
+                prompt does not ask for a length percentage
+            seed (int): Seed of the latency and failure draws
+            sleep (callable): Function used to wait, replaceable by a virtual clock
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.output_tokens = output_tokens
+        self.output_ratio = output_ratio
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'errors': 0, 'input_tokens': 0, 'output_tokens': 0, 'latency': 0.0}
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        """
+        Answer a prompt after the simulated latency
+
+        Args:
+            contents (str): Prompt
+            generation_config (dict, optional): Generation settings; only
+                max_output_tokens is used
+            stream (bool): Whether to return the response in chunks
+
+        Returns:
+            LLMResponse, or a generator of LLMResponse chunks when streaming
+
+        Raises:
+            FakeLLMError: For the configured fraction of calls
+        """
+        max_tokens = (generation_config or {}).get('max_output_tokens', 8192)
+        text = self._respond(contents, max_tokens)
+
+        with self._lock:
+            first_token = self._draw_latency()
+            failed = self._random.random() < self.error_rate
+            output_tokens = estimate_tokens(text)
+            generation = output_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+            self.stats['calls'] += 1
+            self.stats['input_tokens'] += estimate_tokens(contents)
+            if failed:
+                self.stats['errors'] += 1
+                self.stats['latency'] += first_token
+            else:
+                self.stats['output_tokens'] += output_tokens
+                self.stats['latency'] += first_token + generation
+
+        if stream:
+            return self._stream(text, first_token, generation, failed)
+
+        self.sleep(first_token + (0 if failed else generation))
+        if failed:
+            raise FakeLLMError("Injected model failure")
+        return LLMResponse(text)
+
+    def _stream(self, text, first_token, generation, failed):
+        self.sleep(first_token)
+        if failed:
+            raise FakeLLMError("Injected model failure")
+        pieces = [text[i:i + 40] for i in range(0, len(text), 40)] or ['']
+        for piece in pieces:
+            if generation:
+                self.sleep(generation / len(pieces))
+            yield LLMResponse(piece)
+
+    def _draw_latency(self):
+        """Return the time to the first token in seconds"""
+        mean = self.latency_ms / 1000
+        if mean <= 0 or self.latency_distribution == 'constant':
+            return max(0.0, mean)
+        if self.latency_distribution == 'uniform':
+            return self._random.uniform(mean * max(0.0, 1 - self.latency_sigma), mean * (1 + self.latency_sigma))
+        if self.latency_distribution == 'exponential':
+            return self._random.expovariate(1 / mean)
+        return self._random.lognormvariate(math.log(mean), self.latency_sigma)
+
+    def _summary_words(self, source, max_tokens, percent=None):
+        words = source.split()
+        if self.output_tokens:
+            count = self.output_tokens
+        else:
+            ratio = percent / 100 if percent else self.output_ratio
+            count = max(1, int(len(words) * ratio))
+        return " ".join(words[:max(1, min(count, max_tokens))])
+
+    def _respond(self, prompt, max_tokens):
+        """Build a well-formed answer to one of the prompt formats of the views"""
+        percent = re.search(r'approximately (\d+)%', prompt)
+        percent = int(percent.group(1)) if percent else None
+
+        if 'JSON array' in prompt:
+            # Packed batch prompt with numbered texts
+            texts = re.split(r'^TEXT \d+:\n', prompt, flags=re.MULTILINE)[1:]
+            per_text = max(1, max_tokens // max(1, len(texts)))
+            return json.dumps([
+                {
+                    'id': i + 1,
+                    'headline': self._summary_words(text, 8, 100),
+                    'categories': ['general', 'informational'],
+                    'summary': self._summary_words(text, per_text, percent)
+                }
+                for i, text in enumerate(texts)
+            ])
+
+        # Everything after the marker the prompt builders end their instructions with
+        source = prompt.partition(SOURCE_MARKER)[2] if SOURCE_MARKER in prompt else prompt
+        headline = self._summary_words(source, 8, 100)
+
+        if '"summaries": {' in prompt:
+            # Prompt asking for several summary lengths
+            lengths = [int(length) for length in re.findall(r'"(\d+)": "\.\.\."', prompt)]
+            per_length = max(1, max_tokens // max(1, len(lengths)))
+            return json.dumps({
+                'headline': headline,
+                'categories': ['general', 'informational'],
+                'summaries': {str(length): self._summary_words(source, per_length, length) for length in lengths}
+            })
+
+        summary = self._summary_words(source, max_tokens, percent)
+        if 'HEADLINE:' in prompt:
+            return f"HEADLINE: {headline}\n\nCATEGORIES: general, informational\n\nSUMMARY:\n{summary}"
+        return summary
+
+def create_llm_backend(backend=None, model_name='gemini-1.5-flash'):
+    """
+    Create the summarization backend selected by configuration
+
+    Args:
+        backend (str, optional): 'gemini' or 'fake'; defaults to the
+            LLM_BACKEND environment variable, or 'gemini'
+        model_name (str): Gemini model to use
+
+    Returns:
+        The backend, or None if it could not be initialized
+    """
+    backend = (backend or os.getenv('LLM_BACKEND') or 'gemini').lower()
+
+    if backend == 'fake':
+        logger.info("Using the fake LLM backend")
+        return FakeLLMBackend(
+            latency_ms=float(os.getenv('FAKE_LLM_LATENCY_MS', 0)),
+            latency_distribution=os.getenv('FAKE_LLM_LATENCY_DISTRIBUTION', 'constant'),
+            latency_sigma=float(os.getenv('FAKE_LLM_LATENCY_SIGMA', 0.5)),
+            tokens_per_second=float(os.getenv('FAKE_LLM_TOKENS_PER_SECOND', 0)),
+            error_rate=float(os.getenv('FAKE_LLM_ERROR_RATE', 0)),
+            output_tokens=int(os.getenv('FAKE_LLM_OUTPUT_TOKENS', 0)) or None,
+            seed=int(os.getenv('FAKE_LLM_SEED', 0))
+        )
+
+    if backend != 'gemini':
+        logger.warning(f"Unknown LLM_BACKEND {backend}; using Gemini")
+
+    try:
+        gemini = GeminiBackend(model_name)
+        logger.info("Gemini API initialized successfully")
+        return gemini
+    except Exception as e:
+        logger.error(f"Error initializing Gemini API: {str(e)}")
+        return None
@@ -0,0 +1,112 @@
+"""
+In-Process Cache Module for AI Summary Feature
+
+This module provides a bounded LRU cache with per-entry expiry. It sits in
+front of Redis so hot summaries are served from process memory without a
+network round trip.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class LocalCache:
+    """Thread-safe LRU cache with a time-to-live for every entry"""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries (int): Maximum number of entries before the least
+                recently used entry is evicted; 0 disables the cache
+            ttl (int): Default seconds before an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """
+        Get a value if it is cached and has not expired
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Cache a value
+
+        Args:
+            key (str): Cache key
+            value: Value to cache; callers should not mutate it afterwards
+            ttl (int, optional): Seconds before the entry expires
+        """
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key):
+        """
+        Drop a cached value, e.g. when it changed in another process
+
+        Returns:
+            bool: Whether the key was cached
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self._stats['invalidations'] += 1
+            return True
+
+    def clear(self):
+        """Drop all cached values"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Report hit, miss and eviction counters
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
@@ -1,13 +1,14 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
+import os
 import pytz
 from sqlalchemy import and_
 import logging
 
 from .models import ScheduledPost
 from . import db
-from .views import publish_to_platform, decrypt_api_key
+from .views import publish_to_platform, decrypt_api_key, prewarm_news_cache
 
 
 # Set up logging
@@ -72,6 +73,17 @@ def process_scheduled_posts(app):
                 post.status = 'failed'
                 post.error_message = str(e)
                 db.session.commit()
+
+def refresh_news_cache():
+    """
+    Pre-warm the news cache for popular category sets
+    This function is called by the scheduler every NEWS_PREWARM_INTERVAL minutes
+    """
+    try:
+        refreshed = prewarm_news_cache()
+        logger.info(f"Refreshed cached news for {refreshed} category sets")
+    except Exception as e:
+        logger.exception(f"Error refreshing cached news: {str(e)}")
                 
 def init_scheduler(app):
     scheduler = BackgroundScheduler()
@@ -82,7 +94,17 @@ def init_scheduler(app):
         name='Process scheduled social media posts',
         replace_existing=True
     )
+    # Pre-warming calls TheNewsAPI and uses quota, so it is off in tests and
+    # its first run waits a full interval rather than following every app start
+    if os.getenv('NEWS_PREWARM_ENABLED', 'true').lower() == 'true' and not app.config.get('TESTING'):
+        scheduler.add_job(
+            func=refresh_news_cache,
+            trigger=IntervalTrigger(minutes=int(os.getenv('NEWS_PREWARM_INTERVAL', 5))),
+            id='refresh_news_cache',
+            name='Pre-warm cached news for popular categories',
+            replace_existing=True
+        )
     scheduler.start()
-    logger.info("Scheduler started for processing scheduled posts")
+    logger.info("Scheduler started for processing scheduled posts and refreshing news")
     return scheduler
 
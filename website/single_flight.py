@@ -0,0 +1,163 @@
+"""
+Single-Flight Request Coalescing Module for AI Summary Feature
+
+This module makes sure identical concurrent requests only do their work once.
+Within a process, callers for a key that is already in flight wait for the
+leader's result. Across processes, the leader holds a short Redis lock and
+followers poll the shared cache until the leader has stored its result.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Deletes the lock only if it is still held by the caller's token
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class _Call:
+    """A call in flight within this process"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key"""
+
+    def __init__(self, client_getter=None, lock_ttl=30, wait_timeout=30, poll_interval=0.1, key_prefix='inflight:'):
+        """
+        Initialize the coalescer
+
+        Args:
+            client_getter (callable, optional): Returns the Redis client used for
+                cross-process locks, or None if unavailable
+            lock_ttl (int): Seconds before a cross-process lock expires
+            wait_timeout (int): Maximum seconds a follower waits for the leader
+            poll_interval (float): Seconds between cache checks while another
+                process holds the lock
+            key_prefix (str): Prefix for the lock keys
+        """
+        self.client_getter = client_getter
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.key_prefix = key_prefix
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._release_script = None
+        self.stats = {'leaders': 0, 'followers': 0, 'remote_hits': 0}
+
+    def do(self, key, func, lookup=None):
+        """
+        Run func once for all concurrent callers with the same key
+
+        Args:
+            key (str): Key identifying identical work, e.g. a cache key
+            func (callable): Computes the result; it should store the result
+                where lookup can find it so other processes can share it
+            lookup (callable, optional): Returns the stored result, or None
+
+        Returns:
+            The result of func, or of the leader's call for followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['leaders'] += 1
+            else:
+                call.followers += 1
+                self.stats['followers'] += 1
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            logger.warning(f"Timed out waiting for in-flight call {key}, running it directly")
+            return func()
+
+        try:
+            call.result = self._run_leader(key, func, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _client(self):
+        if self.client_getter is None:
+            return None
+        try:
+            return self.client_getter()
+        except Exception:
+            return None
+
+    def _run_leader(self, key, func, lookup):
+        client = self._client()
+        if client is None:
+            return func()
+
+        lock_key = f"{self.key_prefix}{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.warning(f"Failed to acquire lock {lock_key}: {str(e)}")
+            return func()
+
+        if acquired:
+            try:
+                return func()
+            finally:
+                self._release(client, lock_key, token)
+
+        # Another process is computing the result; wait for it to be stored
+        result = self._wait_for_remote(client, lock_key, lookup)
+        if result is not None:
+            self.stats['remote_hits'] += 1
+            return result
+        return func()
+
+    def _wait_for_remote(self, client, lock_key, lookup):
+        if lookup is None:
+            return None
+
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            result = lookup()
+            if result is not None:
+                return result
+            try:
+                if not client.exists(lock_key):
+                    # The leader finished or gave up; check once more
+                    return lookup()
+            except Exception:
+                return None
+            time.sleep(self.poll_interval)
+        return None
+
+    def _release(self, client, lock_key, token):
+        try:
+            if self._release_script is None:
+                self._release_script = client.register_script(_RELEASE_SCRIPT)
+            self._release_script(keys=[lock_key], args=[token])
+        except Exception as e:
+            logger.warning(f"Failed to release lock {lock_key}: {str(e)}")
@@ -0,0 +1,239 @@
+"""
+Summary Response Parsing Module for AI Summary Feature
+
+This module parses the HEADLINE / CATEGORIES / SUMMARY format returned by the
+model, either from a complete response or incrementally from a stream.
+"""
+
+import copy
+import json
+import re
+
+# Bump when parsing changes what ends up in a summary, to move the summary
+# cache to a new namespace
+PARSER_VERSION = '2'
+
+# Categories used when the model does not return any
+DEFAULT_CATEGORIES = {
+    'primary_category': 'general',
+    'secondary_category': 'informational',
+    'confidence': 50
+}
+
+# Markers that start each section of the response
+SECTION_MARKERS = ('HEADLINE:', 'CATEGORIES:', 'SUMMARY:')
+
+# Line that ends the instructions of every summarization prompt; only the
+# text to summarize follows it, after a blank line
+SOURCE_MARKER = 'Please summarize the following text:'
+
+def parse_categories(categories_text):
+    """
+    Parse the text following the CATEGORIES: marker
+
+    Args:
+        categories_text (str): Comma-separated categories
+
+    Returns:
+        dict: Category information, or an empty dict if none were found
+    """
+    category_list = [cat.strip() for cat in categories_text.split(",") if cat.strip()]
+
+    if len(category_list) >= 2:
+        return {
+            'primary_category': category_list[0],
+            'secondary_category': category_list[1],
+            'confidence': 90  # High confidence since it's AI-generated
+        }
+    elif len(category_list) == 1:
+        return {
+            'primary_category': category_list[0],
+            'secondary_category': 'general',
+            'confidence': 90
+        }
+    return {}
+
+def parse_summary_response(response_text):
+    """
+    Parse a complete model response into headline, summary and categories
+
+    Args:
+        response_text (str): Model response text
+
+    Returns:
+        tuple: (headline, summary, categories)
+    """
+    # Same section logic as streaming, so a cached summary does not depend on
+    # which path generated it
+    parser = StreamingSummaryParser()
+    parser.feed(response_text)
+    _, result = parser.finish()[-1]
+    return result['headline'], result['summary'], result['categories']
+
+def parse_variants_response(response_text, lengths):
+    """
+    Parse the structured response to a prompt asking for several summary lengths
+
+    Args:
+        response_text (str): Model response text
+        lengths (list): Requested summary length percentages
+
+    Returns:
+        dict: (headline, summary, categories) per requested length found in
+            the response
+    """
+    # Strip markdown code fences around the JSON
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', response_text.strip())
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+
+    if not isinstance(data, dict) or not isinstance(data.get('summaries'), dict):
+        return {}
+
+    raw_categories = data.get('categories') or []
+    if isinstance(raw_categories, str):
+        raw_categories = raw_categories.split(',')
+    categories = parse_categories(", ".join(str(c) for c in raw_categories))
+    if not categories:
+        categories = copy.deepcopy(DEFAULT_CATEGORIES)
+    headline = str(data.get('headline', '')).strip()
+
+    results = {}
+    for key, summary in data['summaries'].items():
+        try:
+            length = int(str(key).strip().rstrip('%'))
+        except ValueError:
+            continue
+        if length in lengths and isinstance(summary, str) and summary.strip():
+            results[length] = (headline, summary.strip(), dict(categories))
+    return results
+
+def _marker(line):
+    """Return the section marker a line starts with, ignoring markdown emphasis"""
+    cleaned = line.strip().lstrip('*#').strip()
+    for marker in SECTION_MARKERS:
+        if cleaned.upper().startswith(marker):
+            return marker, cleaned[len(marker):].strip().strip('*').strip()
+    return None, None
+
+class StreamingSummaryParser:
+    """
+    Incremental parser for a streamed model response
+
+    Text fragments are fed as they arrive and the parser returns events:
+    ('headline', {...}) and ('categories', {...}) once their line is complete,
+    ('summary', {'delta': ...}) for each piece of summary text, and a final
+    ('done', {...}) event with the complete result from finish().
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.in_summary = False
+        self.headline = ""
+        self.categories = {}
+        self.summary_parts = []
+
+    def feed(self, text):
+        """
+        Feed a fragment of the response
+
+        Args:
+            text (str): Next fragment of the streamed response
+
+        Returns:
+            list: Events produced by this fragment
+        """
+        self.buffer += text
+        events = []
+
+        # Header lines are only parsed once they are complete
+        while not self.in_summary:
+            newline = self.buffer.find("\n")
+            if newline == -1:
+                break
+            line = self.buffer[:newline]
+            self.buffer = self.buffer[newline + 1:]
+            events.extend(self._parse_header_line(line))
+
+        if self.in_summary:
+            events.extend(self._flush_summary())
+
+        return events
+
+    def finish(self):
+        """
+        Flush any buffered text once the stream has ended
+
+        Returns:
+            list: Remaining events, ending with the 'done' event
+        """
+        events = []
+        if not self.in_summary and self.buffer:
+            line, self.buffer = self.buffer, ""
+            events.extend(self._parse_header_line(line))
+        if self.in_summary:
+            events.extend(self._flush_summary())
+
+        if not self.categories:
+            self.categories = copy.deepcopy(DEFAULT_CATEGORIES)
+
+        events.append(('done', {
+            'headline': self.headline,
+            'summary': self.summary,
+            'categories': self.categories
+        }))
+        return events
+
+    @property
+    def summary(self):
+        return "".join(self.summary_parts).strip()
+
+    def _parse_header_line(self, line):
+        marker, value = _marker(line)
+
+        if marker == 'HEADLINE:':
+            self.headline = value
+            return [('headline', {'headline': value})]
+
+        if marker == 'CATEGORIES:':
+            self.categories = parse_categories(value)
+            if self.categories:
+                return [('categories', dict(self.categories))]
+            return []
+
+        if marker == 'SUMMARY:':
+            self.in_summary = True
+            if value:
+                self.buffer = value + "\n" + self.buffer
+            return []
+
+        # Any other text before the summary means the model skipped the
+        # SUMMARY: marker, so treat it as the start of the summary
+        if line.strip():
+            self.in_summary = True
+            self.buffer = line + "\n" + self.buffer
+        return []
+
+    def _flush_summary(self):
+        delta, self.buffer = self.buffer, ""
+        if not self.summary_parts:
+            delta = delta.lstrip()
+        if not delta:
+            return []
+        self.summary_parts.append(delta)
+        return [('summary', {'delta': delta})]
+
+def format_sse(event, data):
+    """
+    Format an event for a Server-Sent Events stream
+
+    Args:
+        event (str): Event name
+        data (dict): JSON-serializable event data
+
+    Returns:
+        str: SSE message
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,459 @@
+"""
+Task Queue Module for AI Summary Feature
+
+This module provides persistent queue backends for asynchronous tasks, so that
+pending and in-flight summaries survive a deploy or a crash. Delivery is
+at-least-once: a claimed task is leased for a visibility timeout and becomes
+visible again if it is not acknowledged before the lease runs out.
+
+Only the SQLite and Redis queues serialize tasks, since their payloads cross a
+process boundary; the memory queue holds the task objects themselves.
+"""
+
+import importlib
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .content_store import ContentHandle, content_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Only functions from this package may be stored and resolved by name
+PACKAGE = __name__.rsplit('.', 1)[0]
+
+class QueuedTask:
+    """A task ready to be run by the async processor"""
+
+    def __init__(self, task_id, func, args, kwargs, timeout, durable=False, attempts=1, low_priority=False):
+        """
+        Initialize the task
+
+        Args:
+            task_id (str): Task ID for tracking
+            func (callable): Function to execute
+            args (tuple): Arguments to pass to the function
+            kwargs (dict): Keyword arguments to pass to the function
+            timeout (int): Timeout in seconds
+            durable (bool): Whether the task came from a durable queue and must be acknowledged
+            attempts (int): Number of times the task has been delivered
+            low_priority (bool): Whether the task only runs when workers are idle
+        """
+        self.task_id = task_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.durable = durable
+        self.attempts = attempts
+        self.low_priority = low_priority
+
+def _in_package(module_name):
+    return module_name == PACKAGE or module_name.startswith(PACKAGE + '.')
+
+def _encode_handle(value):
+    """Encode content handles, compressing their content for the queue"""
+    if isinstance(value, ContentHandle):
+        return {'__content__': value.to_wire()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode_handle(value):
+    """Rebuild content handles, reusing content this process still holds"""
+    if len(value) == 1 and '__content__' in value:
+        return content_store.from_wire(value['__content__'])
+    return value
+
+def serialize_task(func, args, kwargs, timeout):
+    """
+    Serialize a task so it can be stored in a durable queue
+
+    Args:
+        func (callable): Function to execute
+        args (tuple): Arguments to pass to the function
+        kwargs (dict): Keyword arguments to pass to the function
+        timeout (int): Timeout in seconds
+
+    Returns:
+        str: JSON payload, or None if the task can only run in this process
+    """
+    module_name = getattr(func, '__module__', None) or ''
+    qualname = getattr(func, '__qualname__', None) or ''
+
+    # Closures, lambdas and functions outside the package cannot be resolved later
+    if not _in_package(module_name) or '<' in qualname:
+        return None
+
+    try:
+        return json.dumps({
+            'func': f"{module_name}:{qualname}",
+            'args': list(args),
+            'kwargs': kwargs,
+            'timeout': timeout
+        }, default=_encode_handle)
+    except (TypeError, ValueError):
+        return None
+
+def deserialize_task(task_id, payload, attempts):
+    """
+    Rebuild a task from a durable queue payload
+
+    Args:
+        task_id (str): Task ID for tracking
+        payload (str): JSON payload created by serialize_task
+        attempts (int): Number of times the task has been delivered
+
+    Returns:
+        QueuedTask: The task to run
+    """
+    data = json.loads(payload, object_hook=_decode_handle)
+    module_name, qualname = data['func'].split(':', 1)
+    if not _in_package(module_name):
+        raise ValueError(f"Refusing to run task function from outside {PACKAGE}: {data['func']}")
+
+    func = importlib.import_module(module_name)
+    for part in qualname.split('.'):
+        func = getattr(func, part)
+
+    return QueuedTask(task_id, func, tuple(data['args']), data['kwargs'], data['timeout'],
+                      durable=True, attempts=attempts)
+
+def _owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _is_dead_local_owner(owner):
+    """Check whether a lease owner is a process on this host that no longer exists"""
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+class MemoryTaskQueue:
+    """In-process queue with the durable queue interface (not restart-safe)
+
+    Tasks are kept as the objects that were submitted, so their functions may
+    be closures and content handles are passed on without being encoded.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_pending=100):
+        """
+        Initialize the queue
+
+        Args:
+            max_pending (int): Maximum number of queued tasks
+        """
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def put_task(self, task, lease_seconds):
+        """Add a task as is; raises queue.Full when the queue is full"""
+        self._queue.put(task, block=False)
+
+    def claim(self):
+        """
+        Claim the next task
+
+        Returns:
+            tuple: (task_id, task, attempts), or None if no task is ready
+        """
+        try:
+            task = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        return task.task_id, task, 1
+
+    def load(self, task_id, task, attempts):
+        """Return a claimed task, which was never serialized"""
+        return task
+
+    def ack(self, task_id):
+        """Acknowledge a finished task"""
+
+    def recover(self):
+        """Nothing survives a restart in memory"""
+        return 0
+
+    def pending_count(self):
+        return self._queue.qsize()
+
+class DurableTaskQueue:
+    """Base class of the queues that store tasks as serialized payloads"""
+
+    def put_task(self, task, lease_seconds):
+        """
+        Serialize a task and add it to the queue
+
+        Args:
+            task (QueuedTask): Task to add
+            lease_seconds (float): Visibility timeout of a claimed task
+
+        Raises:
+            ValueError: If the task cannot be serialized
+            queue.Full: If the queue is full
+        """
+        payload = serialize_task(task.func, task.args, task.kwargs, task.timeout)
+        if payload is None:
+            raise ValueError(f"Task {task.task_id} cannot be serialized")
+        self.put(task.task_id, payload, lease_seconds)
+
+    def load(self, task_id, payload, attempts):
+        """Rebuild a claimed task from its payload"""
+        return deserialize_task(task_id, payload, attempts)
+
+class SQLiteTaskQueue(DurableTaskQueue):
+    """Durable task queue stored in a local SQLite file"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_pending=1000):
+        """
+        Initialize the queue
+
+        Args:
+            path (str): Path to the SQLite database file
+            max_pending (int): Maximum number of queued and in-flight tasks
+        """
+        self.path = str(path)
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        # Autocommit mode so claims can use an explicit IMMEDIATE transaction
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_queue ("
+                "task_id TEXT PRIMARY KEY, payload TEXT NOT NULL, lease_seconds REAL NOT NULL, "
+                "visible_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, "
+                "created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_task_queue_visible ON task_queue (visible_at, created_at)"
+            )
+
+    def put(self, task_id, payload, lease_seconds):
+        """Add a serialized task; raises queue.Full when the queue is full"""
+        now = time.time()
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM task_queue").fetchone()[0]
+            if count >= self.max_pending:
+                raise queue.Full()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_queue "
+                "(task_id, payload, lease_seconds, visible_at, attempts, owner, created_at) "
+                "VALUES (?, ?, ?, ?, 0, NULL, ?)",
+                (task_id, payload, lease_seconds, now, now)
+            )
+
+    def claim(self):
+        """
+        Claim the oldest visible task and lease it for its visibility timeout
+
+        Returns:
+            tuple: (task_id, payload, attempts), or None if no task is ready
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT task_id, payload, lease_seconds, attempts FROM task_queue "
+                    "WHERE visible_at <= ? ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                task_id, payload, lease_seconds, attempts = row
+                self._conn.execute(
+                    "UPDATE task_queue SET visible_at = ?, attempts = ?, owner = ? WHERE task_id = ?",
+                    (now + lease_seconds, attempts + 1, _owner_id(), task_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return task_id, payload, attempts + 1
+
+    def ack(self, task_id):
+        """Acknowledge a finished task so it is not delivered again"""
+        with self._lock:
+            self._conn.execute("DELETE FROM task_queue WHERE task_id = ?", (task_id,))
+
+    def recover(self):
+        """
+        Release leases held by processes on this host that have died
+
+        Returns:
+            int: Number of tasks made visible again
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, owner FROM task_queue WHERE visible_at > ? AND owner IS NOT NULL",
+                (now,)
+            ).fetchall()
+            released = [task_id for task_id, owner in rows if _is_dead_local_owner(owner)]
+            for task_id in released:
+                self._conn.execute("UPDATE task_queue SET visible_at = ? WHERE task_id = ?", (now, task_id))
+        return len(released)
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM task_queue").fetchone()[0]
+
+# Atomically lease the oldest visible task
+_REDIS_CLAIM_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+local task_id = ids[1]
+local lease = tonumber(redis.call('HGET', KEYS[3], task_id) or '60')
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + lease, task_id)
+local attempts = redis.call('HINCRBY', KEYS[4], task_id, 1)
+redis.call('HSET', KEYS[5], task_id, ARGV[2])
+return {task_id, redis.call('HGET', KEYS[2], task_id), attempts}
+"""
+
+class RedisTaskQueue(DurableTaskQueue):
+    """Durable task queue shared through Redis"""
+
+    name = 'redis'
+
+    def __init__(self, client_getter, max_pending=1000, key_prefix='task_queue:'):
+        """
+        Initialize the queue
+
+        Args:
+            client_getter (callable): Returns the Redis client, or None if unavailable
+            max_pending (int): Maximum number of queued and in-flight tasks
+            key_prefix (str): Prefix for the queue keys
+        """
+        self.client_getter = client_getter
+        self.max_pending = max_pending
+        self.visible_key = f"{key_prefix}visible"
+        self.payload_key = f"{key_prefix}payloads"
+        self.lease_key = f"{key_prefix}leases"
+        self.attempts_key = f"{key_prefix}attempts"
+        self.owner_key = f"{key_prefix}owners"
+        self._claim_script = None
+
+    def _client(self):
+        client = self.client_getter()
+        if client is None:
+            raise ConnectionError("Redis is not connected")
+        return client
+
+    def put(self, task_id, payload, lease_seconds):
+        """Add a serialized task; raises queue.Full when the queue is full"""
+        client = self._client()
+        if client.zcard(self.visible_key) >= self.max_pending:
+            raise queue.Full()
+        pipe = client.pipeline()
+        pipe.hset(self.payload_key, task_id, payload)
+        pipe.hset(self.lease_key, task_id, lease_seconds)
+        pipe.zadd(self.visible_key, {task_id: time.time()})
+        pipe.execute()
+
+    def claim(self):
+        """
+        Claim the oldest visible task and lease it for its visibility timeout
+
+        Returns:
+            tuple: (task_id, payload, attempts), or None if no task is ready
+        """
+        client = self._client()
+        if self._claim_script is None:
+            self._claim_script = client.register_script(_REDIS_CLAIM_SCRIPT)
+        result = self._claim_script(
+            keys=[self.visible_key, self.payload_key, self.lease_key, self.attempts_key, self.owner_key],
+            args=[time.time(), _owner_id()]
+        )
+        if not result:
+            return None
+        task_id, payload, attempts = result
+        return task_id, payload, int(attempts)
+
+    def ack(self, task_id):
+        """Acknowledge a finished task so it is not delivered again"""
+        pipe = self._client().pipeline()
+        pipe.zrem(self.visible_key, task_id)
+        for key in (self.payload_key, self.lease_key, self.attempts_key, self.owner_key):
+            pipe.hdel(key, task_id)
+        pipe.execute()
+
+    def recover(self):
+        """
+        Release leases held by processes on this host that have died
+
+        Returns:
+            int: Number of tasks made visible again
+        """
+        client = self._client()
+        now = time.time()
+        released = 0
+        for task_id, owner in client.hgetall(self.owner_key).items():
+            score = client.zscore(self.visible_key, task_id)
+            if score is not None and score > now and _is_dead_local_owner(owner):
+                client.zadd(self.visible_key, {task_id: now})
+                released += 1
+        return released
+
+    def pending_count(self):
+        return self._client().zcard(self.visible_key)
+
+def create_task_queue(backend=None, max_pending=1000):
+    """
+    Create the task queue backend selected by configuration
+
+    Args:
+        backend (str, optional): 'sqlite', 'redis' or 'memory'; defaults to
+            the TASK_QUEUE_BACKEND environment variable, or to the backend of
+            TASK_RESULT_BACKEND so that task results are shared with every
+            process that can run the tasks; both default to SQLite files
+            under instance/
+        max_pending (int): Maximum number of queued and in-flight tasks
+
+    Returns:
+        The task queue backend
+    """
+    result_backend = os.getenv('TASK_RESULT_BACKEND', 'sqlite').lower()
+    default = result_backend if result_backend in ('sqlite', 'redis') else 'memory'
+    backend = (backend or os.getenv('TASK_QUEUE_BACKEND', default)).lower()
+
+    if backend == 'redis':
+        from .cache import redis_cache
+        return RedisTaskQueue(redis_cache.get_client, max_pending=max_pending)
+
+    if backend == 'sqlite':
+        default_path = Path(__file__).resolve().parent.parent / 'instance' / 'task_queue.db'
+        path = Path(os.getenv('TASK_QUEUE_DB', default_path))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return SQLiteTaskQueue(path, max_pending=max_pending)
+        except Exception as e:
+            logger.error(f"Failed to open task queue at {path}, using memory: {str(e)}")
+            return MemoryTaskQueue(max_pending=max_pending)
+
+    if backend != 'memory':
+        logger.warning(f"Unknown task queue backend '{backend}', using memory")
+    return MemoryTaskQueue(max_pending=max_pending)
@@ -0,0 +1,448 @@
+"""
+Task Result Storage Module for AI Summary Feature
+
+This module provides a bounded store for the results of asynchronous tasks.
+Entries expire after a per-state TTL and the least recently used finished
+entries are evicted once the entry or byte limit is reached. Shared backends
+(Redis or SQLite) let every worker process answer status polls for any task.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# States whose tasks are finished and may be evicted
+FINISHED_STATES = ('completed', 'error', 'timeout')
+
+# Default time-to-live in seconds for each task state (None means no expiry)
+DEFAULT_TTLS = {
+    'pending': None,
+    'completed': 3600,
+    'error': 600,
+    'timeout': 600,
+}
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a task result
+
+    Args:
+        value (dict): Task result to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    try:
+        return len(json.dumps(value, default=str).encode('utf-8'))
+    except Exception:
+        return len(str(value).encode('utf-8'))
+
+class TaskResultStore:
+    """
+    Bounded, TTL-evicting store for asynchronous task results
+
+    The store behaves like a dictionary of task ID to status dict. Pending
+    tasks are never evicted, so a running task always has somewhere to put
+    its result.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=50 * 1024 * 1024, ttls=None, sweep_interval=60):
+        """
+        Initialize the result store
+
+        Args:
+            max_entries (int): Maximum number of stored results
+            max_bytes (int): Maximum approximate size of all stored results
+            ttls (dict, optional): Time-to-live in seconds per task state
+            sweep_interval (int): Minimum seconds between expiry sweeps
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.sweep_interval = sweep_interval
+
+        # task_id -> (value, size, timestamp, expires_at)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+        self._evictions = {'expired': 0, 'lru': 0}
+
+    def __setitem__(self, task_id, value):
+        now = time.time()
+        ttl = self.ttls.get(value.get('status'))
+        expires_at = now + ttl if ttl is not None else None
+        size = estimate_size(value)
+
+        with self._lock:
+            self._remove(task_id)
+            self._entries[task_id] = (value, size, now, expires_at)
+            self._bytes += size
+
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            self._enforce_limits()
+
+    def __getitem__(self, task_id):
+        value = self.get(task_id)
+        if value is None:
+            raise KeyError(task_id)
+        return value
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def __delitem__(self, task_id):
+        with self._lock:
+            if not self._remove(task_id):
+                raise KeyError(task_id)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, task_id, default=None):
+        """
+        Get a task result and mark it as recently used
+
+        Args:
+            task_id (str): Task ID to look up
+            default: Value returned if the task is unknown or expired
+
+        Returns:
+            dict: Task status information
+        """
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return default
+
+            expires_at = entry[3]
+            if expires_at is not None and time.time() >= expires_at:
+                self._remove(task_id)
+                self._evictions['expired'] += 1
+                return default
+
+            self._entries.move_to_end(task_id)
+            return entry[0]
+
+    def pop(self, task_id, default=None):
+        """Remove a task result and return it"""
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return default
+            self._remove(task_id)
+            return entry[0]
+
+    def items(self):
+        """Return a snapshot of (task_id, value) pairs"""
+        with self._lock:
+            return [(task_id, entry[0]) for task_id, entry in self._entries.items()]
+
+    def purge_finished(self, max_age):
+        """
+        Remove finished task results older than max_age
+
+        Args:
+            max_age (int): Maximum age of finished tasks in seconds
+
+        Returns:
+            int: Number of removed results
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            to_remove = [
+                task_id for task_id, (value, _, timestamp, _) in self._entries.items()
+                if value.get('status') in FINISHED_STATES and timestamp < cutoff
+            ]
+            for task_id in to_remove:
+                self._remove(task_id)
+            self._evictions['expired'] += len(to_remove)
+            self._sweep(time.time())
+        return len(to_remove)
+
+    def stats(self):
+        """
+        Report the memory use and eviction counts of the store
+
+        Returns:
+            dict: Store statistics
+        """
+        with self._lock:
+            by_state = {}
+            for value, _, _, _ in self._entries.values():
+                state = value.get('status', 'unknown')
+                by_state[state] = by_state.get(state, 0) + 1
+
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'by_state': by_state,
+                'evictions': dict(self._evictions),
+            }
+
+    def _remove(self, task_id):
+        """Remove an entry and update the byte count (lock must be held)"""
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+    def _sweep(self, now):
+        """Drop every expired entry (lock must be held)"""
+        expired = [
+            task_id for task_id, entry in self._entries.items()
+            if entry[3] is not None and now >= entry[3]
+        ]
+        for task_id in expired:
+            self._remove(task_id)
+        self._evictions['expired'] += len(expired)
+        self._last_sweep = now
+
+    def _enforce_limits(self):
+        """Evict least recently used finished entries until within limits (lock must be held)"""
+        if len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        for task_id in list(self._entries.keys()):
+            if len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            if self._entries[task_id][0].get('status') in FINISHED_STATES:
+                self._remove(task_id)
+                self._evictions['lru'] += 1
+
+        if len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            logger.warning("Task result store is over its limits with only pending tasks left")
+
+class SharedResultBackend:
+    """
+    Base class for result backends that every worker process can read
+
+    Results are mirrored into a local TaskResultStore so the owning process
+    keeps working when the shared backend is unavailable.
+    """
+
+    name = 'shared'
+
+    def __init__(self, ttls=None, local_store=None):
+        """
+        Initialize the shared backend
+
+        Args:
+            ttls (dict, optional): Time-to-live in seconds per task state
+            local_store (TaskResultStore, optional): Local fallback store
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        # Pending tasks still need an expiry in a shared store, otherwise
+        # tasks lost with their worker would stay pending forever
+        if self.ttls.get('pending') is None:
+            self.ttls['pending'] = 24 * 3600
+        self.local = local_store if local_store is not None else TaskResultStore(ttls=ttls)
+        self._errors = 0
+
+    def __setitem__(self, task_id, value):
+        self.local[task_id] = value
+        try:
+            self._write(task_id, value, self.ttls.get(value.get('status')) or self.ttls['pending'])
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"{self.name} result backend write error: {str(e)}")
+
+    def __getitem__(self, task_id):
+        value = self.get(task_id)
+        if value is None:
+            raise KeyError(task_id)
+        return value
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def __delitem__(self, task_id):
+        if self.pop(task_id) is None:
+            raise KeyError(task_id)
+
+    def get(self, task_id, default=None):
+        """
+        Get a task result from the shared backend, falling back to the local store
+
+        Args:
+            task_id (str): Task ID to look up
+            default: Value returned if the task is unknown
+
+        Returns:
+            dict: Task status information
+        """
+        try:
+            value = self._read(task_id)
+            if value is not None:
+                return value
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"{self.name} result backend read error: {str(e)}")
+        return self.local.get(task_id, default)
+
+    def pop(self, task_id, default=None):
+        """Remove a task result and return it"""
+        value = self.get(task_id)
+        self.local.pop(task_id)
+        try:
+            self._delete(task_id)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"{self.name} result backend delete error: {str(e)}")
+        return value if value is not None else default
+
+    def purge_finished(self, max_age):
+        """Remove finished results older than max_age from the local store"""
+        return self.local.purge_finished(max_age)
+
+    def stats(self):
+        """Report local store statistics along with backend errors"""
+        stats = self.local.stats()
+        stats['backend'] = self.name
+        stats['backend_errors'] = self._errors
+        return stats
+
+    def _read(self, task_id):
+        raise NotImplementedError
+
+    def _write(self, task_id, value, ttl):
+        raise NotImplementedError
+
+    def _delete(self, task_id):
+        raise NotImplementedError
+
+class RedisResultBackend(SharedResultBackend):
+    """Result backend that stores task results in Redis"""
+
+    name = 'redis'
+
+    def __init__(self, client_getter, key_prefix='task:', **kwargs):
+        """
+        Initialize the Redis backend
+
+        Args:
+            client_getter (callable): Returns the Redis client, or None if unavailable
+            key_prefix (str): Prefix for task result keys
+        """
+        super().__init__(**kwargs)
+        self.client_getter = client_getter
+        self.key_prefix = key_prefix
+
+    def _client(self):
+        client = self.client_getter()
+        if client is None:
+            raise ConnectionError("Redis is not connected")
+        return client
+
+    def _read(self, task_id):
+        data = self._client().get(f"{self.key_prefix}{task_id}")
+        return json.loads(data) if data else None
+
+    def _write(self, task_id, value, ttl):
+        self._client().setex(f"{self.key_prefix}{task_id}", int(ttl), json.dumps(value, default=str))
+
+    def _delete(self, task_id):
+        self._client().delete(f"{self.key_prefix}{task_id}")
+
+class SQLiteResultBackend(SharedResultBackend):
+    """Result backend that stores task results in a local SQLite file"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, **kwargs):
+        """
+        Initialize the SQLite backend
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        super().__init__(**kwargs)
+        self.path = str(path)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_results ("
+                "task_id TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        self._last_sweep = 0
+
+    def _read(self, task_id):
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value FROM task_results WHERE task_id = ? AND expires_at > ?",
+                (task_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, task_id, value, ttl):
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_results (task_id, value, expires_at) VALUES (?, ?, ?)",
+                (task_id, json.dumps(value, default=str), now + ttl)
+            )
+            # Periodically drop expired rows so the file does not grow forever
+            if now - self._last_sweep >= 60:
+                self._conn.execute("DELETE FROM task_results WHERE expires_at <= ?", (now,))
+                self._last_sweep = now
+            self._conn.commit()
+
+    def _delete(self, task_id):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM task_results WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+
+def create_result_backend(backend=None, **kwargs):
+    """
+    Create the task result backend selected by configuration
+
+    Args:
+        backend (str, optional): 'sqlite', 'redis' or 'memory'; defaults to
+            the TASK_RESULT_BACKEND environment variable, or 'sqlite'
+        **kwargs: Options passed to the backend
+
+    Returns:
+        TaskResultStore or SharedResultBackend: The result backend
+    """
+    backend = (backend or os.getenv('TASK_RESULT_BACKEND', 'sqlite')).lower()
+
+    if backend == 'redis':
+        from .cache import redis_cache
+        return RedisResultBackend(redis_cache.get_client, ttls=kwargs.get('ttls'),
+                                  local_store=TaskResultStore(**kwargs))
+
+    if backend == 'sqlite':
+        default_path = Path(__file__).resolve().parent.parent / 'instance' / 'task_results.db'
+        path = Path(os.getenv('TASK_RESULT_DB', default_path))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return SQLiteResultBackend(path, ttls=kwargs.get('ttls'),
+                                       local_store=TaskResultStore(**kwargs))
+        except Exception as e:
+            logger.error(f"Failed to open task results at {path}, using memory: {str(e)}")
+            return TaskResultStore(**kwargs)
+
+    if backend != 'memory':
+        logger.warning(f"Unknown task result backend '{backend}', using memory")
+    return TaskResultStore(**kwargs)
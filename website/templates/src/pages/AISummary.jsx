@@ -58,7 +58,10 @@ import {
 
 import IconButton from '@mui/material/IconButton';
 
-import { generateSummary, saveSummary } from '../services/api';
+import { generateSummary, saveSummary, streamSummary } from '../services/api';
+
+// Characters above which the server chunks content instead of streaming it
+const STREAM_CONTENT_LIMIT = 20000;
 
 // Tab panel component
 function TabPanel(props) {
@@ -760,8 +763,9 @@ const AISummary = () => {
         throw new Error('Please provide content or a URL to summarize.');
       }
       
-      // Call the API with progress callback
-      const result = await generateSummary(
+      // Stream the summary so it appears as it is written; content too large
+      // to stream is chunked by the regular endpoint, which reports progress
+      const summarizeWithProgress = () => generateSummary(
         content,
         length,
         tone,
@@ -770,6 +774,36 @@ const AISummary = () => {
         strictFiltering,
         handleProgressUpdate
       );
+      let result;
+      if (content.length > STREAM_CONTENT_LIMIT) {
+        result = await summarizeWithProgress();
+      } else {
+        try {
+          let streamed = '';
+          result = await streamSummary(
+            content,
+            length,
+            tone,
+            {
+              onMetadata: (data) => setMetadata(data.metadata),
+              onHeadline: setHeadline,
+              onSummary: (delta) => {
+                streamed += delta;
+                setSummary(streamed);
+                setProgressMessage('Writing summary...');
+              },
+            },
+            urlToUse,
+            isHtml,
+            strictFiltering
+          );
+        } catch (streamError) {
+          if (!String(streamError.error || '').includes('too large to stream')) {
+            throw streamError;
+          }
+          result = await summarizeWithProgress();
+        }
+      }
       
       // Update state with results
       setSummary(result.summary);
@@ -1038,7 +1072,7 @@ const AISummary = () => {
                   <ListItemIcon>
                     <WarningIcon color="warning" />
                   </ListItemIcon>
-                  <ListItemText primary={warning} />
+                  <ListItemText primary={warning.message || warning} />
                 </ListItem>
               ))}
             </List>
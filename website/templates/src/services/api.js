@@ -173,6 +173,85 @@ export const generateSummary = async (content, length = 50, tone = 'professional
   }
 };
 
+/**
+ * Stream an AI summary using Server-Sent Events
+ * @param {string} content - The content to summarize (can be null if url is provided)
+ * @param {number} length - The desired summary length (percentage of original)
+ * @param {string} tone - The tone of the summary (professional, casual, etc.)
+ * @param {Object} handlers - Callbacks: onHeadline, onCategories, onSummary (text delta), onMetadata
+ * @param {string} url - URL to extract content from (optional)
+ * @param {boolean} isHtml - Whether the content contains HTML
+ * @param {boolean} strictFiltering - Whether to use strict content filtering
+ * @returns {Promise<Object>} - The complete summary response from the 'done' event
+ */
+export const streamSummary = async (content, length = 50, tone = 'professional', handlers = {}, url = '', isHtml = false, strictFiltering = false) => {
+  const payload = { length, tone, strict_filtering: strictFiltering };
+  if (content) {
+    payload.content = content;
+    payload.is_html = isHtml;
+  } else if (url) {
+    payload.url = url;
+  }
+
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${API_URL}/api/summarize/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    credentials: 'include',
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw error.error ? error : { error: `Request failed with status ${response.status}` };
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+
+  // Each SSE message is "event: <name>\ndata: <json>" followed by a blank line
+  const handleMessage = (message) => {
+    let event = 'message';
+    let data = '';
+    message.split('\n').forEach((line) => {
+      if (line.startsWith('event: ')) event = line.slice(7);
+      else if (line.startsWith('data: ')) data += line.slice(6);
+    });
+    if (!data) return;
+
+    const parsed = JSON.parse(data);
+    if (event === 'metadata' && handlers.onMetadata) handlers.onMetadata(parsed);
+    else if (event === 'headline' && handlers.onHeadline) handlers.onHeadline(parsed.headline);
+    else if (event === 'categories' && handlers.onCategories) handlers.onCategories(parsed);
+    else if (event === 'summary' && handlers.onSummary) handlers.onSummary(parsed.delta);
+    else if (event === 'done') result = parsed;
+    else if (event === 'error') throw parsed;
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      handleMessage(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+
+  if (!result) {
+    throw { error: 'Summary stream ended unexpectedly' };
+  }
+  return result;
+};
+
 /**
  * Poll for asynchronous task results
  * @param {string} taskId - The task ID to poll for
@@ -290,8 +369,8 @@ export const generateBatchSummaries = async (items, length = 50, tone = 'profess
         totalItems: items.length
       });
       
-      // Start tracking progress for each task
-      trackBatchProgress(response.data.tasks, onProgress);
+      // Start tracking progress of the batch
+      trackBatchProgress(response.data.batch_id, items.length, onProgress);
     }
     
     return response.data;
@@ -302,63 +381,51 @@ export const generateBatchSummaries = async (items, length = 50, tone = 'profess
 };
 
 /**
- * Track progress of a batch of tasks
- * @param {Array} tasks - Array of task objects with task_id
+ * Track progress of a batch
+ * @param {string} batchId - The batch handle returned by the batch endpoint
+ * @param {number} totalItems - Number of items in the batch
  * @param {function} onProgress - Callback for progress updates
+ * @param {number} interval - Polling interval in milliseconds
+ * @param {number} timeout - Maximum polling time in milliseconds
  */
-const trackBatchProgress = async (tasks, onProgress) => {
-  // Filter out tasks with errors
-  const validTasks = tasks.filter(task => task.status !== 'error');
-  const totalTasks = validTasks.length;
-  let completedTasks = 0;
-  
-  // Create a map to track completion status
-  const taskStatus = new Map();
-  validTasks.forEach(task => {
-    taskStatus.set(task.task_id, false);
-  });
+const trackBatchProgress = async (batchId, totalItems, onProgress, interval = 2000, timeout = 900000) => {
+  const startTime = Date.now();
   
-  // Poll for each task
-  const pollPromises = validTasks.map(async (task) => {
-    try {
-      // Poll for this task's results
-      await pollForResults(
-        task.task_id,
-        (progress) => {
-          // If task completed
-          if (progress.status === 'completed' && !taskStatus.get(task.task_id)) {
-            taskStatus.set(task.task_id, true);
-            completedTasks++;
-            
-            // Update overall progress
-            onProgress({
-              status: 'processing',
-              progress: Math.floor((completedTasks / totalTasks) * 100),
-              message: `Completed ${completedTasks} of ${totalTasks} items`,
-              completedItems: completedTasks,
-              totalItems: totalTasks
-            });
-            
-            // Check if all tasks are complete
-            if (completedTasks === totalTasks) {
-              onProgress({
-                status: 'completed',
-                progress: 100,
-                message: `All ${totalTasks} items processed successfully`,
-                completedItems: totalTasks,
-                totalItems: totalTasks
-              });
-            }
-          }
-        }
-      );
-    } catch (error) {
-      console.error(`Error polling task ${task.task_id}:`, error);
+  try {
+    while (Date.now() - startTime < timeout) {
+      const response = await api.get(`/api/summarize/status/${batchId}`);
+      
+      // The batch is done once per-item results are available
+      if (response.data.items) {
+        const completedItems = response.data.items.filter(item => item.status === 'completed').length;
+        onProgress({
+          status: 'completed',
+          progress: 100,
+          message: `Processed ${completedItems} of ${totalItems} items successfully`,
+          completedItems,
+          totalItems,
+          items: response.data.items
+        });
+        return response.data;
+      }
+      
+      if (response.data.status !== 'processing') {
+        throw new Error(response.data.error || 'Unknown error');
+      }
+      
+      await new Promise(resolve => setTimeout(resolve, interval));
     }
-  });
-  
-  // Wait for all polling to complete
-  await Promise.all(pollPromises);
+    throw new Error('Batch timed out');
+  } catch (error) {
+    console.error(`Error polling batch ${batchId}:`, error);
+    onProgress({
+      status: 'error',
+      progress: 0,
+      message: error.response?.data?.error || error.message || 'Failed to process batch',
+      completedItems: 0,
+      totalItems
+    });
+  }
 };
 
 /**
@@ -6,4 +6,8 @@ import sys
 import os
 
 # Add the parent directory to sys.path to allow imports from the website package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Keep task results and queued tasks of the tests in memory, not in instance/
+os.environ.setdefault('TASK_RESULT_BACKEND', 'memory')
+os.environ.setdefault('TASK_QUEUE_BACKEND', 'memory')
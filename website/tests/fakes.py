@@ -0,0 +1,154 @@
+"""
+Fakes and test case base classes shared by the website tests
+"""
+
+import threading
+import unittest
+
+import requests
+
+class FakeResponse:
+    """Stand-in for a model response or a requests response"""
+
+    def __init__(self, text='', status_code=200, headers=None, json_data=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.json_data = json_data
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+class FakePipeline:
+    """Pipeline of a FakeRedis; the buffered commands count as one round trip"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return command
+
+    def execute(self):
+        calls = self.client.calls
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.client.calls = calls + 1
+        return results
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by the app, counting round trips"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def ping(self):
+        self.calls += 1
+        return True
+
+    def get(self, key):
+        self.calls += 1
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        self.calls += 1
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def setex(self, key, expiry, value):
+        self.calls += 1
+        self.data[key] = value
+
+    def delete(self, key):
+        self.calls += 1
+        self.data.pop(key, None)
+
+    def exists(self, key):
+        self.calls += 1
+        return int(key in self.data)
+
+    def incr(self, key):
+        self.calls += 1
+        with self.lock:
+            self.data[key] = str(int(self.data.get(key, 0)) + 1)
+            return int(self.data[key])
+
+    def sadd(self, key, member):
+        self.calls += 1
+        self.data.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.calls += 1
+        self.data.get(key, set()).discard(member)
+
+    def smembers(self, key):
+        self.calls += 1
+        return set(self.data.get(key, set()))
+
+    def expire(self, key, expiry):
+        self.calls += 1
+        return True
+
+    def register_script(self, script):
+        # The only script used is the compare-and-delete lock release
+        def release(keys, args):
+            with self.lock:
+                if self.data.get(keys[0]) == args[0]:
+                    del self.data[keys[0]]
+                    return 1
+                return 0
+        return release
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class AppTestCase(unittest.TestCase):
+    """Test case with an in-memory app database and a logged-in user"""
+
+    email = 'test@example.com'
+
+    def setUp(self):
+        from website import create_app, db
+        from website.models import User
+        from werkzeug.security import generate_password_hash
+
+        self.db = db
+        self.app = create_app(test_config={
+            "TESTING": True,
+            "SECRET_KEY": "test-secret",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False
+        })
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.user = User(email=self.email, password=generate_password_hash('test123'))
+        db.session.add(self.user)
+        db.session.commit()
+        self.login(self.user.id)
+
+    def login(self, user_id):
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)  # Flask-Login stores as string
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.db.drop_all()
+        self.ctx.pop()
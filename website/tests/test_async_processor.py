@@ -148,6 +148,109 @@ class TestAsyncProcessor(unittest.TestCase):
         for task_id in task_ids:
             self.assertNotIn(task_id, self.processor.results)
 
+class TestConcurrentDispatch(unittest.TestCase):
+    """Test cases for the real AsyncProcessor dispatcher"""
+    
+    def setUp(self):
+        """Set up a processor with several workers"""
+        from website.async_processor import AsyncProcessor
+        self.workers = 4
+        self.processor = AsyncProcessor(max_workers=self.workers, queue_size=20)
+        self.processor.start()
+    
+    def tearDown(self):
+        """Clean up test environment"""
+        self.processor.stop()
+    
+    def wait_for(self, task_ids, limit=10):
+        """Wait until none of the given tasks is pending"""
+        deadline = time.time() + limit
+        while time.time() < deadline:
+            statuses = [self.processor.get_task_status(t)['status'] for t in task_ids]
+            if 'pending' not in statuses:
+                return statuses
+            time.sleep(0.01)
+        self.fail("Tasks did not finish in time")
+    
+    def test_tasks_run_concurrently(self):
+        """Benchmark: N slow tasks on N workers take about as long as one"""
+        delay = 0.5
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_task(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(delay)
+            with lock:
+                active.remove(i)
+            return i
+        
+        start = time.time()
+        task_ids = [self.processor.submit_task(slow_task, i) for i in range(self.workers)]
+        statuses = self.wait_for(task_ids)
+        elapsed = time.time() - start
+        
+        self.assertEqual(statuses, ['completed'] * self.workers)
+        self.assertEqual(max(peak), self.workers)
+        self.assertLess(elapsed, delay * 2)
+    
+    def test_timeout_does_not_block_other_tasks(self):
+        """A timed out task is reported without holding up the queue"""
+        def slow_task():
+            time.sleep(1)
+            return "late"
+        
+        def fast_task():
+            return "fast"
+        
+        slow_id = self.processor.submit_task(slow_task, timeout=0.2)
+        fast_id = self.processor.submit_task(fast_task)
+        
+        self.assertEqual(self.wait_for([fast_id], limit=0.5), ['completed'])
+        self.assertEqual(self.wait_for([slow_id], limit=1), ['timeout'])
+        
+        # The late result must not overwrite the timeout
+        time.sleep(1)
+        self.assertEqual(self.processor.get_task_status(slow_id)['status'], 'timeout')
+    
+    def test_low_priority_tasks_leave_workers_free(self):
+        """Low-priority tasks hold at most low_priority_limit workers"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def background_task(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.2)
+            with lock:
+                active.remove(i)
+            return i
+        
+        def user_task():
+            return "fast"
+        
+        low_ids = [self.processor.submit_task(background_task, i, priority='low') for i in range(3)]
+        time.sleep(0.05)
+        user_id = self.processor.submit_task(user_task)
+        
+        self.assertEqual(self.wait_for([user_id], limit=0.15), ['completed'])
+        self.assertEqual(self.wait_for(low_ids), ['completed'] * 3)
+        self.assertEqual(max(peak), self.processor.low_priority_limit)
+    
+    def test_task_error(self):
+        """Errors raised by a task are recorded by the done-callback"""
+        def error_func():
+            raise ValueError("Test error")
+        
+        task_id = self.processor.submit_task(error_func)
+        self.assertEqual(self.wait_for([task_id]), ['error'])
+        self.assertIn('Test error', self.processor.get_task_status(task_id)['error'])
+
 class TestContentCompression(unittest.TestCase):
     """Test cases for content compression functions"""
     
@@ -213,5 +316,81 @@ class TestContentChunking(unittest.TestCase):
         # Verify mock was called
         mock_chunk.assert_called_once_with(content, max_chunk_size=10, overlap=2)
 
+class TestTokenBudgetChunking(unittest.TestCase):
+    """Test cases for the token-budget chunk planner"""
+    
+    def make_document(self, sentences=700):
+        return "".join(f"Sentence number {i} describes part {i * 7} of the report. " for i in range(sentences))
+    
+    def test_estimate_tokens(self):
+        """Test the token estimate on short texts"""
+        from website.async_processor import estimate_tokens
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("The cat sat."), 4)
+        self.assertEqual(estimate_tokens("internationalization"), 5)
+    
+    def test_sentence_index_covers_content(self):
+        """Test that the sentence spans cover the content in order"""
+        from website.async_processor import sentence_index
+        content = "First sentence. Second one!\n\nNew paragraph? Trailing text"
+        spans = sentence_index(content)
+        
+        self.assertEqual("".join(content[start:end] for start, end, _ in spans), content)
+        self.assertEqual([content[start:end] for start, end, _ in spans][1], "Second one!\n\n")
+        self.assertEqual([paragraph_end for _, _, paragraph_end in spans], [False, True, False, True])
+    
+    def test_plan_respects_budget(self):
+        """Test that chunks reassemble the content and fit the token budget"""
+        from website.async_processor import estimate_tokens, plan_chunks
+        content = self.make_document()
+        plan = plan_chunks(content, max_tokens=500)
+        
+        self.assertGreater(plan.chunk_count, 5)
+        self.assertEqual("".join(plan.chunks), content)
+        self.assertTrue(all(estimate_tokens(chunk) <= 500 for chunk in plan.chunks))
+        self.assertEqual(plan.chunk_tokens, [estimate_tokens(chunk) for chunk in plan.chunks])
+        self.assertEqual(plan.to_dict()['chunk_count'], plan.chunk_count)
+    
+    def test_fewer_chunks_than_character_windows(self):
+        """Test that a 40 KB document needs far fewer chunks than 5000-character windows"""
+        from website.async_processor import plan_chunks
+        content = self.make_document(sentences=760)
+        plan = plan_chunks(content, max_tokens=8000)
+        
+        self.assertGreater(len(content), 40000)
+        self.assertLessEqual(plan.chunk_count, 2)
+        self.assertGreater(plan.estimated_tokens, 8000)
+    
+    def test_overlap(self):
+        """Test that trailing sentences are repeated at the start of the next chunk"""
+        from website.async_processor import plan_chunks
+        plan = plan_chunks(self.make_document(100), max_tokens=200, overlap_tokens=30)
+        
+        for previous, chunk in zip(plan.chunks, plan.chunks[1:]):
+            first_sentence = chunk.split(". ")[0] + ". "
+            self.assertIn(first_sentence, previous[-150:])
+            self.assertFalse(previous.startswith(first_sentence))
+    
+    def test_long_sentence_is_split(self):
+        """Test that a sentence over the budget is split into pieces"""
+        from website.async_processor import estimate_tokens, plan_chunks
+        content = "word " * 1000
+        plan = plan_chunks(content, max_tokens=100)
+        
+        self.assertEqual("".join(plan.chunks), content)
+        self.assertTrue(all(estimate_tokens(chunk) <= 100 for chunk in plan.chunks))
+    
+    def test_edit_only_changes_nearby_chunks(self):
+        """Test that editing one sentence leaves most chunks unchanged"""
+        from website.async_processor import plan_chunks
+        content = self.make_document()
+        edited = content.replace("Sentence number 350 describes", "Sentence number 350, after an edit, describes")
+        
+        before = plan_chunks(content, max_tokens=500).chunks
+        after = plan_chunks(edited, max_tokens=500).chunks
+        
+        self.assertLessEqual(len(set(after) - set(before)), 2)
+        self.assertGreaterEqual(len(set(after) & set(before)), len(before) - 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
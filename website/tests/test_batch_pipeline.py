@@ -0,0 +1,120 @@
+"""
+Tests for the batch summarization pipeline
+"""
+
+import unittest
+import json
+import re
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeResponse
+from website import views
+from website.batch_pipeline import dedupe_items, pack_items, parse_packed_response
+
+class FakePackModel:
+    """Fake model that answers packed prompts with a JSON array"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, contents, generation_config=None):
+        self.prompts.append(contents)
+        texts = re.findall(r'^TEXT (\d+):', contents, re.MULTILINE)
+        if texts:
+            return FakeResponse(json.dumps([
+                {'id': int(n), 'headline': f'Headline {n}', 'categories': ['news', 'science'], 'summary': f'Summary {n}'}
+                for n in texts
+            ]))
+        return FakeResponse("HEADLINE: Single\n\nCATEGORIES: news, science\n\nSUMMARY:\nSingle summary")
+
+class TestBatchPipeline(unittest.TestCase):
+    """Test cases for the batch pipeline stages"""
+
+    def test_dedupe_items(self):
+        """Test that identical items collapse onto one unique item"""
+        items = [{'content': 'a'}, {'content': 'b'}, {'content': 'a '}, {'content': 'a', 'is_html': True}]
+        unique, mapping = dedupe_items(items)
+
+        self.assertEqual(len(unique), 3)
+        self.assertEqual(mapping, [0, 1, 0, 2])
+
+    def test_pack_items(self):
+        """Test that packs respect the size limits and long items run alone"""
+        sizes = [(0, 100), (1, 5000), (2, 100), (3, 100), (4, 100)]
+        packs, singles = pack_items(sizes, max_item_chars=4000, max_prompt_chars=250, max_items=8)
+
+        self.assertEqual(packs, [[0, 2], [3, 4]])
+        self.assertEqual(singles, [1])
+
+    def test_pack_items_max_items(self):
+        """Test that a pack never holds more than max_items items"""
+        packs, singles = pack_items([(i, 10) for i in range(7)], max_items=3)
+
+        self.assertEqual(packs, [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual(singles, [6])
+
+    def test_parse_packed_response(self):
+        """Test parsing a fenced JSON response with a missing entry"""
+        text = '```json\n[{"id": 2, "headline": "H2", "categories": ["science"], "summary": "S2"},' \
+               ' {"id": 1, "headline": "H1", "categories": "news, sports", "summary": "S1"}]\n```'
+        results = parse_packed_response(text, 3)
+
+        self.assertEqual(results[0][0], 'H1')
+        self.assertEqual(results[0][2]['secondary_category'], 'sports')
+        self.assertEqual(results[1][1], 'S2')
+        self.assertIsNone(results[2])
+
+    def test_parse_invalid_packed_response(self):
+        """Test that an unparseable response yields no results"""
+        self.assertEqual(parse_packed_response("not json", 2), [None, None])
+
+class TestBatchSummaryTask(unittest.TestCase):
+    """Test cases for run_batch_summary_task"""
+
+    def run_batch(self, items, model):
+        with patch.object(views, 'model', model), \
+             patch.object(views.redis_cache, 'get_cached_summaries', side_effect=lambda contents, *args: [None] * len(contents)), \
+             patch.object(views.redis_cache, 'cache_summaries', return_value=True):
+            return views.run_batch_summary_task(items, 50, 'professional')
+
+    def test_short_items_share_model_calls(self):
+        """Test that many short items are summarized with a few packed calls"""
+        items = [
+            {'id': i, 'content': f"Report number {i} describes the results of a new scientific study."}
+            for i in range(16)
+        ]
+        # Duplicates of the first two items
+        items += [dict(items[0], id=16), dict(items[1], id=17)]
+        model = FakePackModel()
+
+        with patch.object(views, 'BATCH_PACK_MAX_ITEMS', 8):
+            result = self.run_batch(items, model)
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(len(result['items']), 18)
+        self.assertTrue(all(item['status'] == 'completed' for item in result['items']))
+        self.assertEqual(len(model.prompts), 2)
+        self.assertEqual(result['stats']['unique_items'], 16)
+        self.assertEqual(result['items'][16]['result']['summary'], result['items'][0]['result']['summary'])
+        self.assertEqual([item['item_id'] for item in result['items']], list(range(18)))
+
+    def test_invalid_items_are_reported(self):
+        """Test that invalid items fail individually without failing the batch"""
+        items = [
+            {'id': 'short', 'content': 'Too short'},
+            {'id': 'ok', 'content': "This article describes the results of a new scientific study in detail."}
+        ]
+        model = FakePackModel()
+        result = self.run_batch(items, model)
+
+        statuses = {item['item_id']: item['status'] for item in result['items']}
+        self.assertEqual(statuses, {'short': 'error', 'ok': 'completed'})
+        self.assertEqual(result['items'][1]['result']['headline'], 'Single')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for the pluggable cache backends
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.cache import SummaryCache
+from website.cache_backends import (MemoryCacheBackend, RedisCacheBackend, SQLiteCacheBackend,
+                                    create_cache_backend)
+
+ARTICLE = " ".join(f"Sentence {i} of the wire story describes the storm damage on the coast." for i in range(40))
+
+class BackendContract:
+    """Behaviour every cache backend must provide"""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.backend = self.make_backend()
+
+    def test_get_and_set(self):
+        self.backend.set_many({'a': '1', 'b': '2'}, 60)
+        self.assertEqual(self.backend.get('a'), '1')
+        self.assertEqual(self.backend.mget(['b', 'missing', 'a']), ['2', None, '1'])
+
+    def test_expiry(self):
+        self.backend.set_many({'a': '1'}, 0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_delete(self):
+        self.backend.set_many({'a': '1'}, 60)
+        self.backend.delete('a')
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_summary_cache(self):
+        """Test exact and near-duplicate hits through SummaryCache"""
+        cache = SummaryCache(self.backend)
+        cache.cache_summary(ARTICLE, 50, 'professional', {'headline': 'Storm', 'summary': 'Storm damage'})
+
+        self.assertEqual(cache.get_cached_summary(ARTICLE, 50, 'professional')['summary'], 'Storm damage')
+        near = cache.get_cached_summary("By Staff. " + ARTICLE, 50, 'professional')
+        self.assertEqual(near['summary'], 'Storm damage')
+        self.assertIn('near_duplicate', near)
+        self.assertIsNone(cache.get_cached_summary(ARTICLE, 30, 'professional'))
+
+    def test_incr(self):
+        self.assertEqual(self.backend.incr('counter'), 1)
+        self.assertEqual(self.backend.incr('counter'), 2)
+        self.assertEqual(self.backend.get('counter'), '2')
+
+    def test_generation_bump(self):
+        """Test that bumping the generation or a version invalidates every summary"""
+        cache = SummaryCache(self.backend)
+        cache.similarity_max_distance = 0
+        cache.set_namespace(prompt='1', model='gemini-1.5-flash')
+        cache.cache_summary(ARTICLE, 50, 'professional', {'headline': 'Storm', 'summary': 'Storm damage'})
+        self.assertIsNotNone(cache.get_cached_summary(ARTICLE, 50, 'professional'))
+
+        self.assertEqual(cache.bump_generation(), 1)
+        self.assertIsNone(cache.get_cached_summary(ARTICLE, 50, 'professional'))
+
+        # Another process picks the bump up on its next check
+        other = SummaryCache(self.backend)
+        other.set_namespace(prompt='1', model='gemini-1.5-flash')
+        other.cache_summary(ARTICLE, 50, 'professional', {'headline': 'Storm', 'summary': 'New storm damage'})
+        self.assertEqual(cache.get_cached_summary(ARTICLE, 50, 'professional')['summary'], 'New storm damage')
+
+        cache.set_namespace(prompt='2', model='gemini-1.5-flash')
+        self.assertIsNone(cache.get_cached_summary(ARTICLE, 50, 'professional'))
+
+class TestMemoryCacheBackend(BackendContract, unittest.TestCase):
+    def make_backend(self):
+        return MemoryCacheBackend()
+
+    def test_bounded(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set_many({'a': '1', 'b': '2', 'c': '3'}, 60)
+        self.assertEqual(backend.mget(['a', 'b', 'c']), [None, '2', '3'])
+
+class TestSQLiteCacheBackend(BackendContract, unittest.TestCase):
+    def make_backend(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        return SQLiteCacheBackend(os.path.join(self.tmpdir.name, 'cache.db'))
+
+    def test_shared_between_instances(self):
+        """Test that a second process opening the same file sees the entries"""
+        self.backend.set_many({'a': '1'}, 60)
+        other = SQLiteCacheBackend(self.backend.path)
+        self.assertEqual(other.get('a'), '1')
+
+    def test_many_keys(self):
+        """Test lookups of more keys than fit in one query"""
+        self.backend.set_many({f"k{i}": str(i) for i in range(1200)}, 60)
+        values = self.backend.mget([f"k{i}" for i in range(1300)])
+        self.assertEqual(values[1199], '1199')
+        self.assertIsNone(values[1250])
+
+    def test_fingerprint_index_is_swept(self):
+        """Test that expired fingerprints are ignored and swept from the file"""
+        index = self.backend.fingerprint_index(None, 3, 60)
+        index.add(0x1234, 'summary:old')
+        self.assertEqual(len(index.query(0x1234)), 1)
+
+        with patch('website.fingerprint.time.time', return_value=time.time() + 61):
+            self.assertEqual(index.query(0x1234), [])
+            index.add(0xffff0000, 'summary:new')
+
+        rows = self.backend._conn.execute("SELECT DISTINCT member FROM simhash_buckets").fetchall()
+        self.assertEqual([row[0] for row in rows], ['ffff0000|summary:new'])
+
+    def test_fingerprint_table_upgrade(self):
+        """Test that a bucket table from before expiry tracking gains the column"""
+        path = os.path.join(self.tmpdir.name, 'old.db')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE simhash_buckets (bucket TEXT NOT NULL, member TEXT NOT NULL, PRIMARY KEY (bucket, member))")
+        conn.execute("INSERT INTO simhash_buckets VALUES (':0:1', '1|summary:stale')")
+        conn.commit()
+
+        index = SQLiteCacheBackend(path).fingerprint_index(None, 3, 60)
+        self.assertEqual(index.query(1), [])
+
+class TestBackendSelection(unittest.TestCase):
+    """Test cases for create_cache_backend"""
+
+    def test_memory_without_redis_url(self):
+        """Test that the app gets a working cache without REDIS_URL"""
+        with patch.dict(os.environ, {'REDIS_URL': '', 'CACHE_BACKEND': ''}):
+            backend = create_cache_backend()
+        self.assertEqual(backend.name, 'memory')
+
+    def test_configured_backend(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+             patch.dict(os.environ, {'CACHE_BACKEND': 'sqlite', 'CACHE_DB': os.path.join(tmpdir, 'c.db')}):
+            self.assertEqual(create_cache_backend().name, 'sqlite')
+
+    def test_original_class_name(self):
+        """Test that code importing the cache by its original name keeps working"""
+        from website.cache import RedisCache
+        self.assertIs(RedisCache, SummaryCache)
+
+    def test_redis_connects_lazily(self):
+        """Test that creating the Redis backend does not touch the network"""
+        with patch('redis.from_url') as from_url:
+            cache = SummaryCache(RedisCacheBackend('redis://localhost:6379/0'))
+            from_url.assert_not_called()
+            cache.get_client()
+        from_url.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
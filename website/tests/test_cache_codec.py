@@ -0,0 +1,125 @@
+"""
+Tests for the compact cache value encoding
+"""
+
+import unittest
+import json
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeRedis
+from website import cache_codec
+from website.cache_codec import compact_summary, decode_value, encode_value, expand_summary
+from website.cache import redis_cache
+from website.cache_backends import RedisCacheBackend
+from website.circuit_breaker import CircuitBreaker
+
+CONTENT = " ".join(f"Paragraph {i} of the article explains another detail of the story." for i in range(300))
+
+RESPONSE = {
+    'headline': 'Council approves transport plan',
+    'summary': "The council approved a plan that adds bus lines and extends the tram network. " * 8,
+    'original_content': CONTENT,
+    'settings': {'length': 50, 'tone': 'professional'},
+    'metadata': {
+        'categories': {'primary_category': 'news', 'secondary_category': 'politics', 'confidence': 90},
+        'source_type': 'text',
+        'word_count': 3300
+    },
+    'warnings': [],
+    'cached': False
+}
+
+class TestCacheCodec(unittest.TestCase):
+    """Test cases for encoding and decoding cached summaries"""
+
+    def test_round_trip(self):
+        """Test that a response survives encoding with the request fields rebuilt"""
+        value = encode_value(compact_summary(RESPONSE))
+        record, legacy = decode_value(value)
+        result = expand_summary(record, CONTENT, 50, 'professional')
+
+        self.assertFalse(legacy)
+        self.assertEqual(result['headline'], RESPONSE['headline'])
+        self.assertEqual(result['summary'], RESPONSE['summary'])
+        self.assertEqual(result['metadata'], {'categories': RESPONSE['metadata']['categories']})
+        self.assertEqual(result['original_content'], CONTENT)
+        self.assertEqual(result['settings'], RESPONSE['settings'])
+
+    def test_small_values_are_not_compressed(self):
+        """Test that short records are stored as readable JSON"""
+        value = encode_value({'headline': 'H', 'summary': 'S'})
+        self.assertTrue(value.startswith('~1jn:'))
+        self.assertEqual(decode_value(value), ({'headline': 'H', 'summary': 'S'}, False))
+
+    def test_large_values_are_compressed(self):
+        """Test that records above the threshold are compressed"""
+        value = encode_value(compact_summary(RESPONSE), compress_threshold=100, use_msgpack=False)
+        self.assertIn(value[3], ('z', 's'))
+        self.assertEqual(decode_value(value)[0]['summary'], RESPONSE['summary'])
+
+    @unittest.skipIf(cache_codec.msgpack is None, "msgpack is not installed")
+    def test_msgpack_round_trip(self):
+        """Test that msgpack-encoded records decode"""
+        value = encode_value(compact_summary(RESPONSE))
+        self.assertEqual(value[2], 'm')
+        self.assertEqual(decode_value(value)[0]['headline'], RESPONSE['headline'])
+
+    def test_legacy_json_entries(self):
+        """Test that entries written as plain JSON are still read"""
+        record, legacy = decode_value(json.dumps(RESPONSE))
+        self.assertTrue(legacy)
+        self.assertEqual(record, RESPONSE)
+
+    def test_unknown_version(self):
+        """Test that values from an unknown encoding version are treated as misses"""
+        self.assertEqual(decode_value('~9jn:{}'), (None, False))
+
+    def test_compact_size(self):
+        """Test that a compact entry is far smaller than the plain JSON response"""
+        legacy = json.dumps(RESPONSE)
+        compact = encode_value(compact_summary(RESPONSE))
+
+        self.assertLess(len(compact), len(legacy) / 10)
+
+class TestCacheEncodingIntegration(unittest.TestCase):
+    """Test cases for encoded values in RedisCache"""
+
+    def setUp(self):
+        redis_cache.local_cache.clear()
+        # Redis is unreachable in tests, so start from a closed circuit
+        breaker = patch.object(redis_cache, 'breaker', CircuitBreaker(lambda: None))
+        breaker.start()
+        self.addCleanup(breaker.stop)
+
+    def test_cached_summary_rebuilt_from_compact_entry(self):
+        """Test that a cached summary is rebuilt with the request's content"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch.object(redis_cache, 'similarity_max_distance', 0):
+            redis_cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+            stored = client.data[redis_cache.generate_cache_key(CONTENT, 50, 'professional')]
+            redis_cache.local_cache.clear()
+            result = redis_cache.get_cached_summary(CONTENT, 50, 'professional')
+
+        self.assertNotIn(CONTENT[:100], stored)
+        self.assertTrue(result['cached'])
+        self.assertEqual(result['original_content'], CONTENT)
+        self.assertEqual(result['metadata']['categories']['primary_category'], 'news')
+
+    def test_legacy_entry_is_read(self):
+        """Test that a JSON entry written before the new encoding is still a hit"""
+        client = FakeRedis()
+        client.data[redis_cache.generate_cache_key(CONTENT, 50, 'professional')] = json.dumps(RESPONSE)
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            result = redis_cache.get_cached_summary(CONTENT, 50, 'professional')
+
+        self.assertEqual(result['headline'], RESPONSE['headline'])
+        self.assertTrue(result['cached'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for parallel map-reduce summarization of chunked content
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeResponse
+from website import views
+
+class FakeModel:
+    """Slow fake model that records how many calls run at once"""
+    
+    def __init__(self, delay=0.2, summary_size=100):
+        self.delay = delay
+        self.summary_size = summary_size
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def generate_content(self, contents, generation_config=None):
+        with self.lock:
+            self.prompts.append(contents)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        
+        if "Format your response exactly like this" in contents:
+            return FakeResponse("HEADLINE: Final\n\nCATEGORIES: news, science\n\nSUMMARY:\nFinal summary")
+        return FakeResponse("s" * self.summary_size)
+
+class TestChunkedSummary(unittest.TestCase):
+    """Test cases for process_chunked_content"""
+    
+    def run_chunks(self, model, chunk_count):
+        chunks = [f"Chunk number {i} talks about research." for i in range(chunk_count)]
+        with patch.object(views, 'model', model):
+            return views.process_chunked_content(chunks, 50, 'professional', {}, 'user', False)
+    
+    def test_chunks_are_summarized_concurrently(self):
+        """Test that 8 chunks with concurrency 4 take two rounds, not eight"""
+        model = FakeModel(delay=0.2)
+        
+        with patch.object(views, 'CHUNK_SUMMARY_CONCURRENCY', 4):
+            start = time.time()
+            result = self.run_chunks(model, 8)
+            elapsed = time.time() - start
+        
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['headline'], 'Final')
+        self.assertEqual(model.peak, 4)
+        # Two map rounds plus the final combine call
+        self.assertLess(elapsed, 0.2 * 5)
+        self.assertEqual(result['metadata']['reduce_depth'], 0)
+    
+    def test_tree_reduce_for_large_summaries(self):
+        """Test that oversized combined summaries are reduced level by level"""
+        model = FakeModel(delay=0.05, summary_size=100)
+        
+        with patch.object(views, 'CHUNK_SUMMARY_CONCURRENCY', 8), \
+             patch.object(views, 'CHUNK_REDUCE_INPUT_LIMIT', 250):
+            result = self.run_chunks(model, 8)
+        
+        self.assertEqual(result['status'], 'completed')
+        # 8 summaries -> 4 -> 2 -> 1 within the 250 character limit
+        self.assertGreaterEqual(result['metadata']['reduce_depth'], 2)
+        final_prompts = [p for p in model.prompts if "Format your response exactly like this" in p]
+        self.assertEqual(len(final_prompts), 1)
+        self.assertLessEqual(len(final_prompts[0].split(views.SOURCE_MARKER)[1].strip()), 250)
+    
+    def test_group_summaries(self):
+        """Test that groups respect the limit and always hold at least two summaries"""
+        groups = views.group_summaries(["a" * 10] * 5, 25)
+        self.assertEqual([len(group) for group in groups], [2, 3])
+        
+        groups = views.group_summaries(["a" * 100] * 4, 50)
+        self.assertEqual([len(group) for group in groups], [2, 2])
+
+class TestChunkSummaryCache(unittest.TestCase):
+    """Test cases for incremental re-summarization"""
+    
+    def test_resubmission_only_summarizes_changed_chunks(self):
+        """Test that unchanged chunks are served from the chunk summary cache"""
+        from website.async_processor import plan_chunks
+        
+        store = {}
+        def get_chunk_summaries(chunks, tone):
+            return [store.get((chunk, tone)) for chunk in chunks]
+        def cache_chunk_summaries(summaries, tone):
+            for chunk, summary in summaries:
+                store[(chunk, tone)] = summary
+            return True
+        
+        content = "".join(f"Sentence {i} reports on research item {i * 3}. " for i in range(600))
+        edited = content.replace("Sentence 300 reports", "Sentence 300, now revised, reports")
+        
+        def run(text):
+            model = FakeModel(delay=0)
+            chunks = plan_chunks(text, max_tokens=1000).chunks
+            with patch.object(views, 'model', model), \
+                 patch.object(views.redis_cache, 'get_chunk_summaries', side_effect=get_chunk_summaries), \
+                 patch.object(views.redis_cache, 'cache_chunk_summaries', side_effect=cache_chunk_summaries):
+                result = views.process_chunked_content(chunks, 50, 'professional', {}, 'user', False)
+            return result, model, chunks
+        
+        first, first_model, chunks = run(content)
+        second, second_model, _ = run(edited)
+        
+        self.assertEqual(first['metadata']['chunks_cached'], 0)
+        self.assertGreater(len(chunks), 3)
+        # Only the edited chunk (or its neighbour) and the final combine call hit the model
+        self.assertLessEqual(len(second_model.prompts), 3)
+        self.assertGreaterEqual(second['metadata']['chunks_cached'], len(chunks) - 2)
+
+if __name__ == '__main__':
+    unittest.main()
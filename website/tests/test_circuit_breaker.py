@@ -0,0 +1,115 @@
+"""
+Tests for the Redis connection-health circuit breaker
+"""
+
+import unittest
+import time
+import sys
+import os
+from unittest.mock import patch
+
+import redis
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.circuit_breaker import CircuitBreaker, DEGRADED, HEALTHY, OPEN
+from website.cache import redis_cache
+from website.cache_backends import RedisCacheBackend
+
+class FlakyRedis:
+    """Fake Redis client that can be taken down and brought back"""
+
+    def __init__(self):
+        self.up = True
+        self.pings = 0
+        self.gets = 0
+
+    def ping(self):
+        self.pings += 1
+        if not self.up:
+            raise redis.ConnectionError("Connection refused")
+        return True
+
+    def mget(self, keys):
+        self.gets += 1
+        if not self.up:
+            raise redis.ConnectionError("Connection refused")
+        return [None] * len(keys)
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker"""
+
+    def test_state_transitions(self):
+        """Test healthy -> degraded -> open and recovery through the probe"""
+        available = {'up': False}
+        def probe():
+            if not available['up']:
+                raise ConnectionError("down")
+
+        breaker = CircuitBreaker(probe, failure_threshold=2, base_delay=0.05, max_delay=0.1)
+        self.addCleanup(breaker.stop)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, DEGRADED)
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+        # Probes keep failing with backoff while the service is down
+        time.sleep(0.2)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertGreaterEqual(breaker.stats()['probes'], 1)
+
+        available['up'] = True
+        time.sleep(0.25)
+        self.assertEqual(breaker.state, HEALTHY)
+        self.assertTrue(breaker.allow())
+
+    def test_success_resets_degraded(self):
+        """Test that a success after a failure returns to healthy"""
+        breaker = CircuitBreaker(lambda: None, failure_threshold=3)
+        breaker.record_failure()
+        breaker.record_success()
+        self.assertEqual(breaker.state, HEALTHY)
+        self.assertEqual(breaker.stats()['consecutive_failures'], 0)
+
+class TestRedisCacheBreaker(unittest.TestCase):
+    """Test cases for RedisCache behaviour under the breaker"""
+
+    def setUp(self):
+        redis_cache.local_cache.clear()
+
+    def test_no_ping_per_operation(self):
+        """Test that healthy cache reads do not ping Redis"""
+        client = FlakyRedis()
+        breaker = CircuitBreaker(client.ping)
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch.object(redis_cache, 'breaker', breaker):
+            for i in range(5):
+                redis_cache.get_chunk_summary(f"chunk {i}", 'professional')
+
+        self.assertEqual(client.gets, 5)
+        self.assertEqual(client.pings, 0)
+
+    def test_fails_fast_when_redis_is_down(self):
+        """Test that calls stop reaching Redis once the circuit opens"""
+        client = FlakyRedis()
+        client.up = False
+        breaker = CircuitBreaker(client.ping, failure_threshold=3, base_delay=60)
+        self.addCleanup(breaker.stop)
+
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch.object(redis_cache, 'breaker', breaker):
+            for i in range(10):
+                self.assertIsNone(redis_cache.get_chunk_summary(f"chunk {i}", 'professional'))
+            self.assertIsNone(redis_cache.get_client())
+
+        self.assertEqual(client.gets, 3)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.stats()['rejected'], 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the in-process content store
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website import views
+from website.content_store import ContentHandle, ContentStore, resolve_content
+
+ARTICLE = " ".join(f"Sentence {i} of a long article about the city budget." for i in range(300))
+
+class TestContentStore(unittest.TestCase):
+    """Test cases for ContentStore and ContentHandle"""
+
+    def test_handles_share_one_buffer(self):
+        """Test that a handle returns the stored string itself, not a copy"""
+        store = ContentStore()
+        handle = store.put(ARTICLE)
+
+        self.assertIs(handle.read(), ARTICLE)
+        self.assertIs(resolve_content(handle), ARTICLE)
+        self.assertEqual(len(handle), len(ARTICLE))
+        self.assertIs(store.put(ARTICLE), handle)
+
+    def test_resolve_plain_text(self):
+        """Test that text passes through resolve_content unchanged"""
+        self.assertEqual(resolve_content("plain"), "plain")
+
+    def test_wire_round_trip(self):
+        """Test that a handle survives encoding for another process"""
+        wire = ContentHandle(ARTICLE).to_wire()
+        handle = ContentStore().from_wire(wire)
+
+        self.assertEqual(handle.read(), ARTICLE)
+        self.assertEqual(handle.digest, wire['digest'])
+
+    def test_index_is_bounded(self):
+        """Test that the index forgets old handles while holders keep their content"""
+        store = ContentStore(max_bytes=100)
+        first = store.put("a" * 60)
+        store.put("b" * 60)
+
+        self.assertIsNone(store.get(first.digest))
+        self.assertEqual(first.read(), "a" * 60)
+
+class TestSummarizeWithoutCompression(unittest.TestCase):
+    """Test cases for content handles in the summary task"""
+
+    def test_task_reads_handle(self):
+        """Test that the async summary task summarizes the handle's content"""
+        with patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views, 'model', object()), \
+             patch.object(views, 'generate_summary_coalesced',
+                          return_value={'headline': 'H', 'summary': 'S'}) as generate:
+            result = views.generate_summary_task(ContentStore().put(ARTICLE), 50, 'professional', {}, [])
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertIs(generate.call_args[0][0], ARTICLE)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests for the local extractive summarization stage
+"""
+
+import unittest
+import json
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import AppTestCase
+from website import content_processor, views
+from website.content_processor import (
+    estimate_tokens,
+    extractive_summary,
+    preprocess_for_gemini,
+    rank_sentences,
+    reduce_content
+)
+
+ARTICLE = " ".join([
+    "The city council approved a new transport plan on Tuesday.",
+    "The transport plan adds three bus lines and extends the tram network to the airport.",
+    "Council members debated the transport plan for six hours before the vote.",
+    "The weather on Tuesday was sunny and warm.",
+    "Critics say the tram extension to the airport is too expensive for the city.",
+    "The mayor said the transport plan will cut commute times across the city.",
+    "A local bakery celebrated its fiftieth anniversary."
+])
+
+class TestExtractiveReduction(unittest.TestCase):
+    """Test cases for sentence ranking and reduction"""
+
+    def test_central_sentences_rank_higher(self):
+        """Test that on-topic sentences outrank unrelated ones"""
+        sentences = [
+            "The transport plan adds bus lines.",
+            "The council approved the transport plan.",
+            "A bakery celebrated its anniversary.",
+            "The transport plan extends the tram."
+        ]
+        scores = rank_sentences(sentences)
+        self.assertEqual(min(range(4), key=lambda i: scores[i]), 2)
+
+    def test_reduce_to_budget(self):
+        """Test that reduced content fits the budget and keeps the original order"""
+        reduced = reduce_content(ARTICLE, 45)
+
+        self.assertLessEqual(estimate_tokens(reduced), 45)
+        self.assertNotIn("bakery", reduced)
+        self.assertIn("transport plan", reduced)
+        kept = [sentence for sentence in ARTICLE.split(". ") if sentence.rstrip('.') in reduced]
+        self.assertEqual([reduced.find(s.rstrip('.')) for s in kept], sorted(reduced.find(s.rstrip('.')) for s in kept))
+
+    def test_short_content_unchanged(self):
+        """Test that content within the budget is returned as is"""
+        self.assertEqual(reduce_content(ARTICLE, 1000), ARTICLE)
+
+    def test_preprocess_with_budget(self):
+        """Test that preprocessing keeps central sentences from the whole text instead of its start"""
+        content = ("Our newsletter arrives every Monday morning. "
+                   "Subscribers can change their preferences online. ") + ARTICLE
+        reduced = preprocess_for_gemini(content, token_budget=60)
+
+        self.assertLessEqual(estimate_tokens(reduced), 60)
+        self.assertIn("transport plan", reduced)
+
+    def test_extractive_summary(self):
+        """Test the offline summary and headline"""
+        headline, summary = extractive_summary(ARTICLE, 40)
+
+        self.assertTrue(headline)
+        self.assertLessEqual(len(headline.split()), 13)
+        self.assertLess(len(summary), len(ARTICLE))
+        self.assertIn("transport plan", summary)
+
+    @unittest.skipIf(content_processor.np is None, "numpy is not installed")
+    def test_textrank_matches_fallback_ranking(self):
+        """Test that TextRank and the TF-IDF fallback agree on the least central sentence"""
+        sentences = [s + "." for s in ARTICLE.rstrip('.').split(". ")]
+        textrank = rank_sentences(sentences)
+        with patch.object(content_processor, 'np', None):
+            centroid = rank_sentences(sentences)
+        self.assertEqual(min(range(len(sentences)), key=lambda i: textrank[i]),
+                         min(range(len(sentences)), key=lambda i: centroid[i]))
+
+    def test_long_text_skips_textrank(self):
+        """Test that texts over the sentence cap are ranked without the pairwise matrix"""
+        sentences = [s + "." for s in ARTICLE.rstrip('.').split(". ")]
+        with patch.object(content_processor, 'np', None):
+            expected = rank_sentences(sentences)
+        # Any use of NumPy would fail on this placeholder
+        with patch.object(content_processor, 'np', object()), \
+             patch.object(content_processor, 'EXTRACTIVE_MAX_SENTENCES', 3):
+            self.assertEqual(rank_sentences(sentences), expected)
+
+class TestOfflineFallback(unittest.TestCase):
+    """Test cases for the extractive fallback in the views"""
+
+    def test_task_falls_back_without_model(self):
+        """Test that the summary task answers locally when Gemini is unavailable"""
+        with patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views, 'model', None), \
+             patch.object(views.redis_cache, 'cache_summary') as cache_summary:
+            result = views.generate_summary_task(ARTICLE, 40, 'professional', {}, [])
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['metadata']['summarizer'], 'extractive')
+        self.assertEqual(result['warnings'][-1]['type'], 'fallback')
+        self.assertIn("transport plan", result['summary'])
+        cache_summary.assert_not_called()
+
+    def test_task_falls_back_on_api_error(self):
+        """Test that a failing Gemini call is answered locally"""
+        with patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views, 'model', object()), \
+             patch.object(views, 'generate_summary_coalesced', side_effect=RuntimeError("API down")):
+            result = views.generate_summary_task(ARTICLE, 40, 'professional', {}, [])
+
+        self.assertEqual(result['metadata']['summarizer'], 'extractive')
+
+    def test_fallback_can_be_disabled(self):
+        """Test that the task reports the outage when the fallback is off"""
+        with patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views, 'model', None), \
+             patch.object(views, 'EXTRACTIVE_FALLBACK', False):
+            result = views.generate_summary_task(ARTICLE, 40, 'professional', {}, [])
+
+        self.assertEqual(result['status'], 'error')
+
+    def test_chunked_content_falls_back(self):
+        """Test that chunked content is summarized locally without Gemini"""
+        chunks = [ARTICLE, ARTICLE.replace("Tuesday", "Monday")]
+        with patch.object(views, 'model', None):
+            result = views.process_chunked_content(chunks, 40, 'professional', {'chunked': True}, 'user', False)
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['metadata']['summarizer'], 'extractive')
+        self.assertTrue(result['metadata']['chunked'])
+        self.assertNotIn('original_content', result)
+
+    def test_batch_items_fall_back(self):
+        """Test that batch items are summarized locally without Gemini"""
+        items = [
+            {'id': i, 'content': content, 'url': '', 'is_html': False, 'strict_filtering': False}
+            for i, content in enumerate([ARTICLE, ARTICLE, ARTICLE.replace("Tuesday", "Monday")])
+        ]
+        with patch.object(views, 'model', None), \
+             patch.object(views.redis_cache, 'get_cached_summaries', side_effect=lambda contents, *args: [None] * len(contents)), \
+             patch.object(views.redis_cache, 'cache_summaries', return_value=True) as cache_summaries:
+            result = views.run_batch_summary_task(items, 40, 'professional')
+
+        self.assertTrue(all(item['status'] == 'completed' for item in result['items']))
+        for item in result['items']:
+            self.assertEqual(item['result']['metadata']['summarizer'], 'extractive')
+            self.assertEqual(item['result']['warnings'][-1]['type'], 'fallback')
+        cache_summaries.assert_called_once_with([], 40, 'professional')
+
+    def test_batch_fallback_can_be_disabled(self):
+        """Test that batch items report the outage when the fallback is off"""
+        items = [{'id': 1, 'content': ARTICLE, 'url': '', 'is_html': False, 'strict_filtering': False}]
+        with patch.object(views, 'model', None), \
+             patch.object(views, 'EXTRACTIVE_FALLBACK', False), \
+             patch.object(views.redis_cache, 'get_cached_summaries', return_value=[None]):
+            result = views.run_batch_summary_task(items, 40, 'professional')
+
+        self.assertEqual(result['items'][0]['status'], 'error')
+
+class FailingStreamModel:
+    """Fake model whose stream fails after the first piece"""
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        yield type('Chunk', (), {'text': 'HEADLINE: Partial'})()
+        raise RuntimeError("API down")
+
+class TestStreamFallback(AppTestCase):
+    """Test cases for the extractive fallback of /api/summarize/stream"""
+
+    def stream(self, model):
+        with patch.object(views, 'model', model), \
+             patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views.redis_cache, 'cache_summary') as cache_summary:
+            res = self.client.post('/api/summarize/stream', json={'content': ARTICLE, 'length': 40})
+            body = res.get_data(as_text=True)
+        cache_summary.assert_not_called()
+
+        events = []
+        for message in body.strip().split("\n\n"):
+            name, data = message.split("\n", 1)
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+        return res, events
+
+    def test_stream_without_model(self):
+        """Test that the stream carries an extractive summary when Gemini is unavailable"""
+        res, events = self.stream(None)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([name for name, _ in events], ['metadata', 'headline', 'categories', 'summary', 'done'])
+        self.assertEqual(events[-1][1]['metadata']['summarizer'], 'extractive')
+
+    def test_stream_falls_back_on_api_error(self):
+        """Test that a stream failing midway ends with an extractive summary"""
+        res, events = self.stream(FailingStreamModel())
+
+        self.assertNotIn('error', [name for name, _ in events])
+        self.assertEqual(events[-1][0], 'done')
+        self.assertEqual(events[-1][1]['metadata']['summarizer'], 'extractive')
+        self.assertIn("transport plan", events[-1][1]['summary'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for near-duplicate detection with content fingerprints
+"""
+
+import unittest
+import random
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeRedis
+from website.fingerprint import SimHashIndex, hamming_distance, simhash
+from website.cache import redis_cache
+from website.cache_backends import RedisCacheBackend
+from website.circuit_breaker import CircuitBreaker
+
+ARTICLE = (
+    "The city council voted on Tuesday to approve a new public transport plan that will add "
+    "three bus lines, extend the tram network to the northern suburbs and introduce a flat fare "
+    "for all journeys within the city limits. Officials said the plan would cut commuting times "
+    "for tens of thousands of residents and reduce traffic in the city centre by a fifth within "
+    "five years. Opponents argued that the cost of the project had been underestimated and that "
+    "the council should have consulted residents before committing to the tram extension."
+)
+
+class TestSimHash(unittest.TestCase):
+    """Test cases for fingerprints and the index"""
+
+    def test_near_duplicates_are_close(self):
+        """Test that whitespace, case and byline changes barely move the fingerprint"""
+        syndicated = "By Jane Doe, Staff Reporter\n\n" + ARTICLE.upper().replace(". ", ".\n\n  ")
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(syndicated)), 3)
+        self.assertEqual(simhash(ARTICLE), simhash("  " + ARTICLE.replace(" ", "   ") + "  "))
+
+    def test_different_texts_are_far(self):
+        """Test that unrelated texts have distant fingerprints"""
+        other = ("Scientists have discovered a new species of frog in the rainforest. The frog is "
+                 "smaller than a fingernail and lives in leaf litter on the forest floor, where it "
+                 "feeds on tiny insects. Researchers believe many more species remain undescribed.")
+        self.assertGreater(hamming_distance(simhash(ARTICLE), simhash(other)), 10)
+
+    def test_short_text_has_no_fingerprint(self):
+        """Test that texts too short for a stable fingerprint are skipped"""
+        self.assertIsNone(simhash("Just a few words here."))
+
+    def test_index_query(self):
+        """Test that the index finds entries within the distance and ignores scope mismatches"""
+        index = SimHashIndex(max_distance=3)
+        fingerprint = simhash(ARTICLE)
+        index.add(fingerprint, 'summary:a', scope='50:professional')
+        index.add(fingerprint ^ 0b111111, 'summary:b', scope='50:professional')
+
+        self.assertEqual(index.query(fingerprint ^ 0b1, '50:professional'), [('summary:a', 1, fingerprint)])
+        self.assertEqual(index.query(fingerprint, '30:casual'), [])
+
+        index.discard(fingerprint, 'summary:a', scope='50:professional')
+        self.assertEqual(index.query(fingerprint, '50:professional'), [])
+
+    def test_index_is_bounded(self):
+        """Test that the oldest entries are dropped beyond max_entries and after expiry"""
+        rng = random.Random(7)
+        fingerprints = [rng.getrandbits(64) for _ in range(3)]
+        index = SimHashIndex(max_distance=3, max_entries=2, expiry=60)
+        for i, fingerprint in enumerate(fingerprints):
+            index.add(fingerprint, f"summary:{i}")
+
+        self.assertEqual(index.query(fingerprints[0]), [])
+        self.assertEqual(index.query(fingerprints[2]), [('summary:2', 0, fingerprints[2])])
+        self.assertEqual(len(index._members), 2)
+
+        with patch('website.fingerprint.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(index.query(fingerprints[2]), [])
+        self.assertEqual(index._buckets, {})
+
+    def test_index_scale(self):
+        """Test that lookups stay fast with a large number of entries"""
+        rng = random.Random(42)
+        index = SimHashIndex(max_distance=3, max_entries=200000)
+        fingerprints = [rng.getrandbits(64) for _ in range(200000)]
+        for i, fingerprint in enumerate(fingerprints):
+            index.add(fingerprint, f"summary:{i}")
+
+        start = time.time()
+        for i in range(1000):
+            matches = index.query(fingerprints[i] ^ 0b101)
+            self.assertIn((f"summary:{i}", 2, fingerprints[i]), matches)
+        elapsed = time.time() - start
+
+        self.assertLess(elapsed, 2)
+
+class TestNearDuplicateCache(unittest.TestCase):
+    """Test cases for near-duplicate reuse in RedisCache"""
+
+    def setUp(self):
+        redis_cache.local_cache.clear()
+        # Redis is unreachable in tests, so start from a closed circuit
+        breaker = patch.object(redis_cache, 'breaker', CircuitBreaker(lambda: None))
+        breaker.start()
+        self.addCleanup(breaker.stop)
+
+    def test_syndicated_copy_reuses_summary(self):
+        """Test that a syndicated copy gets the original's summary with its match score"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_summary(ARTICLE, 50, 'professional', {'summary': 'Council approves transport plan'})
+
+            copy = "Reporting by Jane Doe.\n" + ARTICLE.replace("  ", " ")
+            result = redis_cache.get_cached_summary(copy, 50, 'professional')
+
+            self.assertEqual(result['summary'], 'Council approves transport plan')
+            self.assertEqual(result['original_content'], copy)
+            self.assertGreater(result['near_duplicate']['similarity'], 0.95)
+            # Other settings never match
+            self.assertIsNone(redis_cache.get_cached_summary(copy, 30, 'professional'))
+
+    def test_exact_match_has_no_score(self):
+        """Test that exact hits are returned without a near-duplicate score"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_summary(ARTICLE, 50, 'professional', {'summary': 'Exact'})
+            result = redis_cache.get_cached_summary(ARTICLE, 50, 'professional')
+
+        self.assertEqual(result['summary'], 'Exact')
+        self.assertNotIn('near_duplicate', result)
+
+    def test_expired_summary_is_not_reused(self):
+        """Test that fingerprints of expired summaries are dropped"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_summary(ARTICLE, 50, 'professional', {'summary': 'Old'})
+            cache_key = redis_cache.generate_cache_key(ARTICLE, 50, 'professional')
+            client.delete(cache_key)
+            redis_cache.local_cache.delete(cache_key)
+
+            self.assertIsNone(redis_cache.get_cached_summary(ARTICLE + " Updated.", 50, 'professional'))
+            self.assertEqual(redis_cache.fingerprint_index.query(simhash(ARTICLE), '50:professional'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for the LLM backends and offline load testing with the fake backend
+"""
+
+import unittest
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website import views
+from website.batch_pipeline import build_packed_prompt, parse_packed_response
+from website.cache import SummaryCache
+from website.cache_backends import MemoryCacheBackend
+from website.llm_backends import FakeLLMBackend, FakeLLMError, create_llm_backend
+from website.summary_parser import StreamingSummaryParser, parse_summary_response, parse_variants_response
+
+CONTENT = " ".join(f"Sentence {i} describes another detail of the new transport plan." for i in range(40))
+
+class VirtualClock:
+    """Records simulated waits instead of sleeping"""
+
+    def __init__(self):
+        self.waits = []
+
+    def __call__(self, seconds):
+        self.waits.append(seconds)
+
+class TestFakeLLMBackend(unittest.TestCase):
+    """Test cases for the fake backend"""
+
+    def test_summary_prompt(self):
+        """Test that summary prompts get a parseable response of the requested length"""
+        backend = FakeLLMBackend()
+        response = backend.generate_content(views.build_summary_prompt(CONTENT, 30, 'professional'))
+        headline, summary, categories = parse_summary_response(response.text)
+
+        self.assertTrue(headline)
+        self.assertEqual(categories['primary_category'], 'general')
+        self.assertAlmostEqual(len(summary.split()), len(CONTENT.split()) * 0.3, delta=2)
+
+    def test_structured_prompts(self):
+        """Test that packed and multi-length prompts get valid JSON responses"""
+        backend = FakeLLMBackend()
+        packed = backend.generate_content(build_packed_prompt(["First text here.", "Second text here."], 50, 'casual'))
+        variants = backend.generate_content(views.build_variants_prompt(CONTENT, [30, 70], 'casual'))
+
+        self.assertTrue(all(parse_packed_response(packed.text, 2)))
+        self.assertEqual(sorted(parse_variants_response(variants.text, [30, 70])), [30, 70])
+
+    def test_deterministic(self):
+        """Test that the same seed gives the same latencies, failures and output"""
+        runs = []
+        for _ in range(2):
+            clock = VirtualClock()
+            backend = FakeLLMBackend(latency_ms=100, latency_distribution='lognormal', error_rate=0.3,
+                                     seed=7, sleep=clock)
+            outcomes = []
+            for _ in range(20):
+                try:
+                    outcomes.append(backend.generate_content("Summarize this.\n\n" + CONTENT).text)
+                except FakeLLMError:
+                    outcomes.append(None)
+            runs.append((clock.waits, outcomes))
+
+        self.assertEqual(runs[0], runs[1])
+        self.assertIn(None, runs[0][1])
+
+    def test_latency_distributions(self):
+        """Test that drawn latencies have the configured mean"""
+        for distribution in ('constant', 'uniform', 'exponential'):
+            clock = VirtualClock()
+            backend = FakeLLMBackend(latency_ms=50, latency_distribution=distribution, sleep=clock)
+            for _ in range(500):
+                backend.generate_content("Summarize this.\n\nShort text.")
+            self.assertAlmostEqual(sum(clock.waits) / len(clock.waits), 0.05, delta=0.01, msg=distribution)
+
+        with self.assertRaises(ValueError):
+            FakeLLMBackend(latency_distribution='normal')
+
+    def test_error_rate_and_stats(self):
+        """Test that the failure fraction and token counts are recorded"""
+        backend = FakeLLMBackend(error_rate=0.25, output_tokens=10, sleep=VirtualClock())
+        for _ in range(400):
+            try:
+                backend.generate_content("Summarize this.\n\n" + CONTENT)
+            except FakeLLMError:
+                pass
+
+        self.assertEqual(backend.stats['calls'], 400)
+        self.assertAlmostEqual(backend.stats['errors'] / 400, 0.25, delta=0.06)
+        self.assertGreater(backend.stats['output_tokens'], 0)
+
+    def test_streaming(self):
+        """Test that streamed output spreads the generation time over the chunks"""
+        clock = VirtualClock()
+        backend = FakeLLMBackend(latency_ms=200, tokens_per_second=100, sleep=clock)
+        parser = StreamingSummaryParser()
+        chunks = backend.generate_content(views.build_summary_prompt(CONTENT, 50, 'professional'), stream=True)
+        for chunk in chunks:
+            parser.feed(chunk.text)
+        parser.finish()
+
+        self.assertEqual(clock.waits[0], 0.2)
+        self.assertGreater(len(clock.waits), 2)
+        self.assertTrue(parser.summary)
+
+    def test_create_from_environment(self):
+        """Test that LLM_BACKEND=fake selects the fake backend with its settings"""
+        with patch.dict(os.environ, {'LLM_BACKEND': 'fake', 'FAKE_LLM_ERROR_RATE': '0.5',
+                                     'FAKE_LLM_LATENCY_DISTRIBUTION': 'exponential'}):
+            backend = create_llm_backend()
+
+        self.assertIsInstance(backend, FakeLLMBackend)
+        self.assertEqual(backend.error_rate, 0.5)
+        self.assertEqual(backend.latency_distribution, 'exponential')
+
+class TestSummarizeStackOffline(unittest.TestCase):
+    """Test cases running the views against the fake backend"""
+
+    def setUp(self):
+        cache = SummaryCache(MemoryCacheBackend())
+        cache.similarity_max_distance = 0
+        target = patch.object(views, 'redis_cache', cache)
+        target.start()
+        self.addCleanup(target.stop)
+
+    def test_summary_task(self):
+        """Test that a full summary task completes against the fake backend"""
+        with patch.object(views, 'model', FakeLLMBackend()):
+            result = views.generate_summary_task(CONTENT, 40, 'professional', {}, [])
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertTrue(result['headline'])
+        self.assertEqual(result['metadata']['categories']['primary_category'], 'general')
+
+    def test_failures_fall_back(self):
+        """Test that injected failures reach the extractive fallback"""
+        with patch.object(views, 'model', FakeLLMBackend(error_rate=1.0)):
+            result = views.generate_summary_task(CONTENT, 40, 'professional', {}, [])
+
+        self.assertEqual(result['metadata']['summarizer'], 'extractive')
+
+    def test_chunked_summary_uses_only_content(self):
+        """Test that chunk, reduce and final summaries are built from the content, not the instructions"""
+        chunks = [f"Chunk {i}. " + CONTENT for i in range(4)]
+        with patch.object(views, 'model', FakeLLMBackend(output_ratio=0.5)), \
+             patch.object(views, 'CHUNK_REDUCE_INPUT_LIMIT', 800):
+            result = views.process_chunked_content(chunks, 40, 'professional', {}, 'user', False)
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertGreaterEqual(result['metadata']['reduce_depth'], 1)
+        self.assertLessEqual(set(result['summary'].split()), set(" ".join(chunks).split()))
+
+    def test_chunk_throughput(self):
+        """Test that chunk summaries overlap their simulated model latency"""
+        chunks = [f"Chunk {i}. " + CONTENT for i in range(8)]
+        backend = FakeLLMBackend(latency_ms=30)
+        with patch.object(views, 'model', backend), patch.object(views, 'CHUNK_SUMMARY_CONCURRENCY', 4):
+            start = time.perf_counter()
+            summaries, _ = views.summarize_chunks(chunks, 'professional')
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(summaries))
+        self.assertLess(elapsed, backend.stats['latency'])
+
+if __name__ == '__main__':
+    unittest.main()
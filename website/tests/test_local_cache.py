@@ -0,0 +1,197 @@
+"""
+Tests for the in-process cache tier in front of Redis
+"""
+
+import unittest
+import json
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeRedis
+from website.local_cache import LocalCache
+from website.cache import redis_cache
+from website.cache_backends import RedisCacheBackend
+from website.circuit_breaker import CircuitBreaker
+
+class TestLocalCache(unittest.TestCase):
+    """Test cases for LocalCache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = LocalCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expiry(self):
+        """Test that entries expire after their TTL"""
+        cache = LocalCache(ttl=0.05)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual(stats['expirations'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_disabled(self):
+        """Test that a cache with no entries stores nothing"""
+        cache = LocalCache(max_entries=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+class TestTwoTierCache(unittest.TestCase):
+    """Test cases for RedisCache with the local tier"""
+
+    def setUp(self):
+        redis_cache.local_cache.clear()
+        # Redis is unreachable in tests, so start from a closed circuit
+        breaker = patch.object(redis_cache, 'breaker', CircuitBreaker(lambda: None))
+        breaker.start()
+        self.addCleanup(breaker.stop)
+
+    def test_hot_summary_served_locally(self):
+        """Test that repeated reads of a hot summary skip Redis"""
+        client = FakeRedis()
+        key = redis_cache.generate_cache_key("Hot article", 50, 'professional')
+        client.data[key] = json.dumps({'summary': 'Hot summary'})
+
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            first = redis_cache.get_cached_summary("Hot article", 50, 'professional')
+            calls_after_first = client.calls
+
+            for _ in range(1000):
+                result = redis_cache.get_cached_summary("Hot article", 50, 'professional')
+
+        self.assertEqual(first['summary'], 'Hot summary')
+        self.assertEqual(result['summary'], 'Hot summary')
+        self.assertEqual(client.calls, calls_after_first)
+        stats = redis_cache.get_stats()
+        self.assertGreaterEqual(stats['local']['hits'], 1000)
+        self.assertGreaterEqual(stats['backend']['hits'], 1)
+
+    def test_cached_results_are_independent(self):
+        """Test that callers mutating a result do not change the cached copy"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_summary("Some article", 50, 'professional', {'summary': 'S', 'metadata': {}})
+            first = redis_cache.get_cached_summary("Some article", 50, 'professional')
+            first['metadata'] = {'user': 'a'}
+            second = redis_cache.get_cached_summary("Some article", 50, 'professional')
+
+        self.assertEqual(second['metadata'], {})
+
+    def test_keyspace_invalidation(self):
+        """Test that a delete notification drops the local entry"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_chunk_summary("chunk", 'professional', "Chunk summary")
+            key = redis_cache.generate_chunk_key("chunk", 'professional')
+            del client.data[key]
+
+            self.assertEqual(redis_cache.get_chunk_summary("chunk", 'professional'), "Chunk summary")
+            redis_cache.handle_keyspace_event({
+                'type': 'pmessage',
+                'channel': f"__keyspace@0__:{key}",
+                'data': 'del'
+            })
+            self.assertIsNone(redis_cache.get_chunk_summary("chunk", 'professional'))
+
+    def test_listener_survives_quiet_periods(self):
+        """Test that the listener keeps polling through quiet periods and handles overwrites"""
+        class StopListening(BaseException):
+            pass
+
+        class FakePubSub:
+            def __init__(self, messages):
+                self.messages = messages
+
+            def psubscribe(self, *patterns):
+                pass
+
+            def get_message(self, timeout=None):
+                if not self.messages:
+                    raise StopListening()
+                return self.messages.pop(0)
+
+        key = redis_cache.generate_chunk_key("chunk", 'professional')
+        redis_cache.local_cache.set(key, "Old summary")
+        pubsub = FakePubSub([None, None, {'type': 'pmessage', 'channel': f"__keyspace@0__:{key}", 'data': 'set'}])
+        client = FakeRedis()
+        client.pubsub = lambda ignore_subscribe_messages=False: pubsub
+
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch('website.cache.time.sleep') as sleep:
+            with self.assertRaises(StopListening):
+                redis_cache._listen_for_invalidations()
+
+        sleep.assert_not_called()
+        self.assertIsNone(redis_cache.local_cache.get(key))
+
+class TestBatchedCache(unittest.TestCase):
+    """Test cases for get_many/set_many"""
+
+    def setUp(self):
+        redis_cache.local_cache.clear()
+        # Redis is unreachable in tests, so start from a closed circuit
+        breaker = patch.object(redis_cache, 'breaker', CircuitBreaker(lambda: None))
+        breaker.start()
+        self.addCleanup(breaker.stop)
+
+    def test_many_chunks_in_one_round_trip(self):
+        """Test that hundreds of chunk lookups and writes take one round trip each"""
+        client = FakeRedis()
+        chunks = [f"Chunk {i}" for i in range(300)]
+
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)):
+            redis_cache.cache_chunk_summaries([(chunk, f"Summary of {chunk}") for chunk in chunks[:200]], 'casual')
+            self.assertEqual(client.calls, 1)
+
+            redis_cache.local_cache.clear()
+            summaries = redis_cache.get_chunk_summaries(chunks, 'casual')
+            self.assertEqual(client.calls, 2)
+
+        self.assertEqual(summaries[0], "Summary of Chunk 0")
+        self.assertEqual(summaries[199], "Summary of Chunk 199")
+        self.assertIsNone(summaries[200])
+
+    def test_get_many_skips_local_hits(self):
+        """Test that keys held in the local tier are not fetched from Redis"""
+        client = FakeRedis()
+        client.data['b'] = 'redis'
+        redis_cache.local_cache.set('a', 'local')
+
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch.object(client, 'mget', wraps=client.mget) as mget:
+            self.assertEqual(redis_cache.get_many(['a', 'b', 'c']), ['local', 'redis', None])
+
+        mget.assert_called_once_with(['b', 'c'])
+
+    def test_cached_summaries(self):
+        """Test batched summary caching with hits and misses"""
+        client = FakeRedis()
+        with patch.object(redis_cache, 'backend', RedisCacheBackend(client=client)), \
+             patch.object(redis_cache, 'similarity_max_distance', 0):
+            redis_cache.cache_summaries([("First", {'summary': 'One'}), ("Second", {'summary': 'Two'})], 50, 'casual')
+            redis_cache.local_cache.clear()
+            results = redis_cache.get_cached_summaries(["First", "Third", "Second"], 50, 'casual')
+
+        self.assertEqual([r and r['summary'] for r in results], ['One', None, 'Two'])
+        self.assertEqual(results[0]['original_content'], "First")
+        self.assertEqual(client.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for the cached, pre-warmed news feed
+"""
+
+import unittest
+import time
+import sys
+import os
+from collections import Counter
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeResponse
+from website import views
+from website.cache import SummaryCache
+from website.cache_backends import MemoryCacheBackend
+
+ARTICLES = [{'uuid': '1', 'title': 'Story', 'is_favorite': False}]
+
+class TestNewsPrewarm(unittest.TestCase):
+    """Test cases for the news pre-warm job"""
+
+    def setUp(self):
+        self.cache = SummaryCache(MemoryCacheBackend())
+        for target in (patch.object(views, 'redis_cache', self.cache),
+                       patch.object(views, 'news_search_counts', Counter()),
+                       patch.object(views, 'NEWS_PREWARM_CATEGORIES', [['general']]),
+                       patch.object(views, 'NEWS_PREWARM_TOP', 2)):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_prewarm_configured_and_popular_sets(self):
+        """Test that configured and most searched category sets are fetched"""
+        views.news_search_counts.update({('science', 'tech'): 5, ('sports',): 3, ('travel',): 1})
+        with patch.object(views, 'fetch_from_news_api', return_value=ARTICLES) as fetch:
+            self.assertEqual(views.prewarm_news_cache(), 3)
+
+        fetched = [call[0][0] for call in fetch.call_args_list]
+        self.assertEqual(fetched, [['general'], ['science', 'tech'], ['sports']])
+        self.assertEqual(self.cache.get_value(views.news_cache_key(['tech', 'science'])), (ARTICLES, False))
+
+    def test_prewarm_skips_fresh_sets(self):
+        """Test that fresh entries are not fetched again"""
+        with patch.object(views, 'fetch_from_news_api', return_value=ARTICLES) as fetch:
+            views.prewarm_news_cache()
+            self.assertEqual(views.prewarm_news_cache(), 0)
+
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_prewarmed_search_is_served_from_cache(self):
+        """Test that a search for a pre-warmed set makes no request"""
+        with patch.object(views, 'fetch_from_news_api', return_value=ARTICLES):
+            views.prewarm_news_cache()
+        with patch.object(views, 'fetch_from_news_api') as fetch:
+            self.assertEqual(views.get_news_articles(['general']), ARTICLES)
+        fetch.assert_not_called()
+
+    def test_fetch_uses_session_with_timeout(self):
+        """Test that TheNewsAPI is called through the shared session with a timeout"""
+        with patch.object(views.news_session, 'get', return_value=FakeResponse(json_data={'data': [{'uuid': '1', 'title': 'Story'}]})) as get:
+            articles = views.fetch_from_news_api(['tech'])
+
+        self.assertEqual(articles, [{'uuid': '1', 'title': 'Story', 'is_favorite': False}])
+        self.assertEqual(get.call_args[1]['timeout'], views.NEWS_API_TIMEOUT)
+
+ARTICLE_TEXT = " ".join(f"Sentence {i} of the article reports on the storm damage along the coast." for i in range(20))
+
+class TestNewsPresummarization(unittest.TestCase):
+    """Test cases for background summaries of fetched articles"""
+
+    def setUp(self):
+        self.cache = SummaryCache(MemoryCacheBackend())
+        for target in (patch.object(views, 'redis_cache', self.cache),
+                       patch.object(views, 'model', object())):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_disabled_by_default(self):
+        """Test that nothing is queued unless NEWS_PRESUMMARIZE_TOP is set"""
+        with patch.object(views, 'NEWS_PRESUMMARIZE_TOP', 0), \
+             patch.object(views.async_processor, 'submit_task') as submit:
+            views.cache_news_articles(['tech'], ARTICLES)
+        submit.assert_not_called()
+
+    def test_top_articles_queued_at_low_priority(self):
+        """Test that the top N fetched articles are queued as low-priority tasks"""
+        articles = [{'uuid': str(i), 'url': f'https://example.com/{i}'} for i in range(5)]
+        with patch.object(views, 'NEWS_PRESUMMARIZE_TOP', 2), \
+             patch.object(views.async_processor, 'submit_task', return_value='task') as submit:
+            views.cache_news_articles(['tech'], articles)
+
+        self.assertEqual([call[0][1] for call in submit.call_args_list], ['https://example.com/0', 'https://example.com/1'])
+        for call in submit.call_args_list:
+            self.assertIs(call[0][0], views.presummarize_article_task)
+            self.assertEqual(call[1]['priority'], 'low')
+
+    def test_click_is_served_from_cache(self):
+        """Test that a pre-summarized article is a cache hit with the default settings"""
+        extraction = {'success': True, 'content': ARTICLE_TEXT, 'metadata': {'url': 'https://example.com/storm'}}
+        categories = {'primary_category': 'news', 'secondary_category': 'weather', 'confidence': 80}
+        with patch.object(views, 'process_content', return_value=extraction), \
+             patch.object(views, 'summarize_single', return_value=('Storm', 'Storm damage', categories)) as generate:
+            self.assertEqual(views.presummarize_article_task('https://example.com/storm')['status'], 'completed')
+            self.assertEqual(views.presummarize_article_task('https://example.com/storm')['status'], 'skipped')
+
+        self.assertEqual(generate.call_count, 1)
+        cached = self.cache.get_cached_summary(ARTICLE_TEXT, 50, 'professional')
+        self.assertEqual(cached['summary'], 'Storm damage')
+
+class TestPrewarmSchedule(unittest.TestCase):
+    """Test cases for scheduling the news pre-warm job"""
+
+    def jobs(self, testing, env):
+        from flask import Flask
+        from website.scheduler import init_scheduler
+
+        app = Flask(__name__)
+        app.config['TESTING'] = testing
+        with patch.dict(os.environ, env):
+            scheduler = init_scheduler(app)
+        self.addCleanup(scheduler.shutdown, wait=False)
+        return {job.id: job for job in scheduler.get_jobs()}
+
+    def test_prewarm_waits_an_interval(self):
+        """Test that starting the app does not call the news API right away"""
+        job = self.jobs(False, {'NEWS_PREWARM_ENABLED': 'true'})['refresh_news_cache']
+        self.assertGreater(job.next_run_time.timestamp(), time.time() + 60)
+
+    def test_prewarm_off_in_tests_and_by_config(self):
+        """Test that the pre-warm job is not scheduled when testing or disabled"""
+        self.assertNotIn('refresh_news_cache', self.jobs(True, {'NEWS_PREWARM_ENABLED': 'true'}))
+        self.assertNotIn('refresh_news_cache', self.jobs(False, {'NEWS_PREWARM_ENABLED': 'false'}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Tests for single-flight coalescing of identical concurrent requests
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeRedis
+from website.single_flight import SingleFlight
+
+def run_concurrently(func, count):
+    results = [None] * count
+    def worker(i):
+        results[i] = func()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that a burst of identical calls runs the function once"""
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'summary': 'shared'}
+
+        results = run_concurrently(lambda: flight.do('key', compute), 8)
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {'summary': 'shared'} for result in results))
+        self.assertEqual(flight.stats['followers'], 7)
+
+    def test_different_keys_run_separately(self):
+        """Test that calls with different keys are not coalesced"""
+        flight = SingleFlight()
+        self.assertEqual(flight.do('a', lambda: 1), 1)
+        self.assertEqual(flight.do('b', lambda: 2), 2)
+        self.assertEqual(flight.stats['leaders'], 2)
+
+    def test_errors_reach_followers(self):
+        """Test that followers see the leader's error and the key is released"""
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise RuntimeError("model failed")
+
+        errors = []
+        def call():
+            try:
+                flight.do('key', fail)
+            except RuntimeError as e:
+                errors.append(e)
+
+        run_concurrently(call, 4)
+
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(flight.do('key', lambda: 'retry'), 'retry')
+
+    def test_cross_process_followers_use_stored_result(self):
+        """Test that a process waits for the lock holder's cached result"""
+        client = FakeRedis()
+        store = {}
+        calls = []
+        # Two coalescers sharing Redis stand in for two processes
+        first = SingleFlight(lambda: client, poll_interval=0.01)
+        second = SingleFlight(lambda: client, poll_interval=0.01)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            store['key'] = 'shared'
+            return 'shared'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(first.do('key', compute, lookup=lambda: store.get('key'))))
+        leader.start()
+        time.sleep(0.05)
+        results.append(second.do('key', compute, lookup=lambda: store.get('key')))
+        leader.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['shared', 'shared'])
+        self.assertEqual(second.stats['remote_hits'], 1)
+        # The lock is released once the leader finishes
+        self.assertEqual(client.data, {})
+
+    def test_redis_unavailable(self):
+        """Test that coalescing still works within a process without Redis"""
+        flight = SingleFlight(lambda: None)
+        self.assertEqual(flight.do('key', lambda: 'value'), 'value')
+
+class TestCoalescedSummaries(unittest.TestCase):
+    """Test cases for coalesced summary generation in views"""
+
+    def test_identical_requests_cost_one_model_call(self):
+        """Test that N identical concurrent summaries make one model call"""
+        from website import views
+
+        class SlowModel:
+            def __init__(self):
+                self.calls = 0
+
+            def generate_content(self, contents, generation_config=None):
+                self.calls += 1
+                time.sleep(0.2)
+                return type('Response', (), {'text': "HEADLINE: Breaking\n\nCATEGORIES: news, politics\n\nSUMMARY:\nShared summary"})()
+
+        model = SlowModel()
+        content = "Breaking news article pasted by several users within seconds of each other."
+
+        with patch.object(views, 'model', model), \
+             patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views.redis_cache, 'cache_summary', return_value=True):
+            results = run_concurrently(
+                lambda: views.generate_summary_coalesced(content, 50, 'professional', {'source': 'paste'}, []),
+                6
+            )
+
+        self.assertEqual(model.calls, 1)
+        for result in results:
+            self.assertEqual(result['summary'], 'Shared summary')
+            self.assertEqual(result['metadata']['categories']['primary_category'], 'news')
+            self.assertEqual(result['metadata']['source'], 'paste')
+
+if __name__ == '__main__':
+    unittest.main()
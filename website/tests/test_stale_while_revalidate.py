@@ -0,0 +1,144 @@
+"""
+Tests for serving stale cached summaries and news while refreshing them
+"""
+
+import unittest
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website import views
+from website.cache import SummaryCache
+from website.cache_backends import MemoryCacheBackend
+
+CONTENT = "The city council approved the new transport plan after a long debate."
+
+RESPONSE = {
+    'headline': 'Council approves transport plan',
+    'summary': 'The council approved the plan.',
+    'metadata': {'categories': {'primary_category': 'news', 'secondary_category': 'politics', 'confidence': 90}},
+    'cached': False
+}
+
+def make_cache(soft=60, hard=600):
+    cache = SummaryCache(MemoryCacheBackend())
+    cache.cache_expiry = soft
+    cache.hard_expiry = hard
+    cache.similarity_max_distance = 0
+    return cache
+
+class TestStaleEntries(unittest.TestCase):
+    """Test cases for fresh and stale entries in the cache"""
+
+    def test_fresh_entry(self):
+        """Test that a summary within its fresh period is not stale"""
+        cache = make_cache()
+        cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+        result = cache.get_cached_summary(CONTENT, 50, 'professional')
+
+        self.assertEqual(result['headline'], RESPONSE['headline'])
+        self.assertNotIn('stale', result)
+        self.assertNotIn('fresh_until', result)
+
+    def test_stale_entry_is_served(self):
+        """Test that a summary past its fresh period is still returned, marked stale"""
+        cache = make_cache()
+        cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+        with patch('website.cache.time.time', return_value=time.time() + 120):
+            result = cache.get_cached_summary(CONTENT, 50, 'professional')
+
+        self.assertEqual(result['summary'], RESPONSE['summary'])
+        self.assertTrue(result['stale'])
+
+    def test_hard_expiry_is_a_miss(self):
+        """Test that entries are dropped after the hard expiry"""
+        cache = make_cache(soft=0, hard=0)
+        cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+        time.sleep(0.01)
+
+        self.assertIsNone(cache.get_cached_summary(CONTENT, 50, 'professional'))
+
+    def test_claim_refresh_once(self):
+        """Test that only the first caller claims the refresh of a key"""
+        cache = make_cache()
+        self.assertTrue(cache.claim_refresh('summary:abc'))
+        self.assertFalse(cache.claim_refresh('summary:abc'))
+        self.assertTrue(cache.claim_refresh('summary:def'))
+
+    def test_generic_values(self):
+        """Test the stale flag of values stored with set_value"""
+        cache = make_cache()
+        cache.set_value('news:science', [{'uuid': '1'}], 60, 600)
+
+        self.assertEqual(cache.get_value('news:science'), ([{'uuid': '1'}], False))
+        with patch('website.cache.time.time', return_value=time.time() + 120):
+            self.assertEqual(cache.get_value('news:science'), ([{'uuid': '1'}], True))
+        self.assertEqual(cache.get_value('news:missing'), (None, False))
+
+class TestBackgroundRefresh(unittest.TestCase):
+    """Test cases for the refreshes scheduled by the views"""
+
+    def setUp(self):
+        self.cache = make_cache()
+        for target in (patch.object(views, 'redis_cache', self.cache),
+                       patch.object(views, 'model', object())):
+            target.start()
+            self.addCleanup(target.stop)
+        submit = patch.object(views.async_processor, 'submit_task', return_value='task-1')
+        self.submit = submit.start()
+        self.addCleanup(submit.stop)
+
+    def test_stale_summary_schedules_one_refresh(self):
+        """Test that concurrent stale hits trigger a single background refresh"""
+        self.cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+        with patch('website.cache.time.time', return_value=time.time() + 120):
+            for _ in range(3):
+                result = views.generate_summary_task(CONTENT, 50, 'professional', {}, [])
+                self.assertEqual(result['headline'], RESPONSE['headline'])
+                self.assertNotIn('stale', result)
+
+        self.submit.assert_called_once()
+        self.assertIs(self.submit.call_args[0][0], views.refresh_summary_task)
+
+    def test_refresh_task_replaces_entry(self):
+        """Test that the refresh task stores a fresh summary"""
+        self.cache.cache_summary(CONTENT, 50, 'professional', RESPONSE)
+        categories = {'primary_category': 'news', 'secondary_category': 'science', 'confidence': 80}
+        with patch.object(views, 'summarize_single', return_value=('New headline', 'New summary', categories)):
+            self.assertEqual(views.refresh_summary_task(CONTENT, 50, 'professional')['status'], 'completed')
+
+        result = self.cache.get_cached_summary(CONTENT, 50, 'professional')
+        self.assertEqual(result['headline'], 'New headline')
+        self.assertEqual(result['metadata']['categories'], categories)
+
+    def test_news_served_stale_while_refreshing(self):
+        """Test that stale news results are returned and refreshed in the background"""
+        articles = [{'uuid': '1', 'title': 'Story', 'is_favorite': False}]
+        with patch.object(views, 'fetch_from_news_api', return_value=articles) as fetch:
+            self.assertEqual(views.get_news_articles(['tech', 'science']), articles)
+            self.assertEqual(views.get_news_articles(['science', 'tech']), articles)
+            self.assertEqual(fetch.call_count, 1)
+            self.submit.assert_not_called()
+
+            with patch('website.cache.time.time', return_value=time.time() + views.NEWS_CACHE_EXPIRY + 1):
+                self.assertEqual(views.get_news_articles(['tech', 'science']), articles)
+                self.assertEqual(views.get_news_articles(['tech', 'science']), articles)
+
+            self.assertEqual(fetch.call_count, 1)
+            self.submit.assert_called_once()
+            self.assertIs(self.submit.call_args[0][0], views.refresh_news_task)
+
+    def test_empty_news_results_are_not_cached(self):
+        """Test that a failed news search is retried on the next request"""
+        with patch.object(views, 'fetch_from_news_api', return_value=[]) as fetch:
+            views.get_news_articles(['tech'])
+            views.get_news_articles(['tech'])
+
+        self.assertEqual(fetch.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
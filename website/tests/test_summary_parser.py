@@ -0,0 +1,152 @@
+"""
+Tests for the Summary Response Parsing Module and the streaming endpoint
+"""
+
+import unittest
+import json
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import AppTestCase
+from website.summary_parser import (
+    StreamingSummaryParser,
+    DEFAULT_CATEGORIES,
+    format_sse,
+    parse_summary_response
+)
+
+RESPONSE = "HEADLINE: Big News\n\nCATEGORIES: science, health\n\nSUMMARY:\nFirst sentence. Second sentence."
+
+def stream(parser, text, size):
+    """Feed text to the parser in fragments of the given size"""
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    events.extend(parser.finish())
+    return events
+
+class TestParseSummaryResponse(unittest.TestCase):
+    """Test cases for parsing complete responses"""
+    
+    def test_sections(self):
+        """Test extracting headline, categories and summary"""
+        headline, summary, categories = parse_summary_response(RESPONSE)
+        self.assertEqual(headline, "Big News")
+        self.assertEqual(summary, "First sentence. Second sentence.")
+        self.assertEqual(categories['primary_category'], 'science')
+        self.assertEqual(categories['secondary_category'], 'health')
+    
+    def test_unformatted_response(self):
+        """Test that an unformatted response becomes the summary"""
+        headline, summary, categories = parse_summary_response("Just a summary.")
+        self.assertEqual(headline, "")
+        self.assertEqual(summary, "Just a summary.")
+        self.assertEqual(categories, DEFAULT_CATEGORIES)
+
+    def test_multi_paragraph_summary(self):
+        """Test that every summary paragraph is kept, as in the streaming parser"""
+        text = RESPONSE + "\n\nSecond paragraph.\n\n**Third** paragraph."
+        _, summary, _ = parse_summary_response(text)
+        events = stream(StreamingSummaryParser(), text, 7)
+        
+        self.assertEqual(summary, "First sentence. Second sentence.\n\nSecond paragraph.\n\n**Third** paragraph.")
+        self.assertEqual(summary, events[-1][1]['summary'])
+
+class TestStreamingSummaryParser(unittest.TestCase):
+    """Test cases for the incremental parser"""
+    
+    def test_matches_complete_parser_for_any_fragment_size(self):
+        """Test that streaming gives the same result however the text is split"""
+        headline, summary, categories = parse_summary_response(RESPONSE)
+        
+        for size in (1, 3, 7, len(RESPONSE)):
+            events = stream(StreamingSummaryParser(), RESPONSE, size)
+            done = events[-1]
+            
+            self.assertEqual(done[0], 'done')
+            self.assertEqual(done[1]['headline'], headline)
+            self.assertEqual(done[1]['summary'], summary)
+            self.assertEqual(done[1]['categories'], categories)
+    
+    def test_event_order(self):
+        """Test that sections are emitted once, in order, before summary text"""
+        events = stream(StreamingSummaryParser(), RESPONSE, 5)
+        names = [name for name, _ in events]
+        
+        self.assertEqual(names[0], 'headline')
+        self.assertEqual(names[1], 'categories')
+        self.assertEqual(names.count('headline'), 1)
+        self.assertTrue(all(name == 'summary' for name in names[2:-1]))
+        
+        deltas = "".join(data['delta'] for name, data in events if name == 'summary')
+        self.assertEqual(deltas.strip(), "First sentence. Second sentence.")
+    
+    def test_headline_emitted_before_stream_ends(self):
+        """Test that the headline is available as soon as its line is complete"""
+        parser = StreamingSummaryParser()
+        self.assertEqual(parser.feed("HEADLINE: Early"), [])
+        self.assertEqual(parser.feed("\n"), [('headline', {'headline': 'Early'})])
+    
+    def test_missing_summary_marker(self):
+        """Test that text without a SUMMARY: marker is still streamed as the summary"""
+        events = stream(StreamingSummaryParser(), "HEADLINE: Title\nThe summary text.", 4)
+        self.assertEqual(events[-1][1]['headline'], 'Title')
+        self.assertEqual(events[-1][1]['summary'], 'The summary text.')
+        self.assertEqual(events[-1][1]['categories'], DEFAULT_CATEGORIES)
+    
+    def test_markdown_markers(self):
+        """Test that markers wrapped in markdown emphasis are recognised"""
+        events = stream(StreamingSummaryParser(), "**HEADLINE:** Bold\n**SUMMARY:** Text here", 2)
+        self.assertEqual(events[-1][1]['headline'], 'Bold')
+        self.assertEqual(events[-1][1]['summary'], 'Text here')
+    
+    def test_format_sse(self):
+        """Test the SSE message format"""
+        self.assertEqual(format_sse('headline', {'headline': 'x'}),
+                         'event: headline\ndata: {"headline": "x"}\n\n')
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+class FakeStreamingModel:
+    """Fake model that streams a response in small pieces"""
+    
+    def generate_content(self, contents, generation_config=None, stream=False):
+        return [FakeChunk(RESPONSE[i:i + 6]) for i in range(0, len(RESPONSE), 6)]
+
+class TestSummarizeStreamEndpoint(AppTestCase):
+    """Test cases for /api/summarize/stream"""
+    
+    def test_stream_events(self):
+        """Test that the endpoint streams well-formed section events"""
+        from website import views
+        
+        content = "This article describes a new scientific study about health and research. " * 3
+        with patch.object(views, 'model', FakeStreamingModel()), \
+             patch.object(views.redis_cache, 'get_cached_summary', return_value=None), \
+             patch.object(views.redis_cache, 'cache_summary', return_value=True) as cache_summary:
+            res = self.client.post('/api/summarize/stream', json={'content': content})
+            body = res.get_data(as_text=True)
+        
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.mimetype.startswith('text/event-stream'))
+        
+        events = []
+        for message in body.strip().split("\n\n"):
+            name, data = message.split("\n", 1)
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+        
+        names = [name for name, _ in events]
+        self.assertEqual(names[:3], ['metadata', 'headline', 'categories'])
+        self.assertEqual(names[-1], 'done')
+        self.assertEqual(events[-1][1]['headline'], 'Big News')
+        self.assertEqual(events[-1][1]['summary'], 'First sentence. Second sentence.')
+        cache_summary.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Tests for generating several summary lengths at once
+"""
+
+import unittest
+import json
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import AppTestCase, FakeResponse
+from website import views
+from website.cache import SummaryCache
+from website.cache_backends import MemoryCacheBackend
+from website.summary_parser import DEFAULT_CATEGORIES, parse_variants_response
+
+CONTENT = "The city council approved a new transport plan that adds three bus lines and extends the tram network. " * 3
+
+class FakeVariantsModel:
+    """Fake model that answers a variants prompt with one summary per requested length"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, contents, generation_config=None):
+        self.prompts.append(contents)
+        example = contents.split('"summaries": {')[1].split('}')[0]
+        lengths = [int(part.split('"')[1]) for part in example.split(', ')]
+        return FakeResponse(json.dumps({
+            'headline': 'Council approves transport plan',
+            'categories': ['news', 'politics'],
+            'summaries': {str(length): f"Summary at {length} percent." for length in lengths}
+        }))
+
+def make_cache():
+    cache = SummaryCache(MemoryCacheBackend())
+    cache.similarity_max_distance = 0
+    return cache
+
+class TestParseVariantsResponse(unittest.TestCase):
+    """Test cases for parsing multi-length responses"""
+
+    def test_lengths(self):
+        """Test that each requested length is returned with the shared headline"""
+        text = '```json\n{"headline": "H", "categories": ["science"], "summaries": {"30": "Short.", "50%": "Longer.", "70": ""}}\n```'
+        results = parse_variants_response(text, [30, 50, 70])
+
+        self.assertEqual(sorted(results), [30, 50])
+        self.assertEqual(results[50][:2], ('H', 'Longer.'))
+        self.assertEqual(results[30][2]['primary_category'], 'science')
+
+    def test_unrequested_and_invalid(self):
+        """Test that unrequested lengths and malformed responses are ignored"""
+        results = parse_variants_response('{"summaries": {"90": "Extra.", "x": "Bad."}}', [30])
+        self.assertEqual(results, {})
+        self.assertEqual(parse_variants_response("not json", [30]), {})
+
+    def test_default_categories(self):
+        """Test that missing categories fall back to the defaults"""
+        results = parse_variants_response('{"headline": "H", "summaries": {"30": "S."}}', [30])
+        self.assertEqual(results[30][2], DEFAULT_CATEGORIES)
+
+class TestSummaryVariants(unittest.TestCase):
+    """Test cases for generating and speculating variants"""
+
+    def setUp(self):
+        self.cache = make_cache()
+        self.model = FakeVariantsModel()
+        for target in (patch.object(views, 'redis_cache', self.cache),
+                       patch.object(views, 'model', self.model)):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_neighbor_lengths(self):
+        """Test that neighbours stay within the slider range"""
+        self.assertEqual(views.neighbor_lengths(50), [30, 70])
+        self.assertEqual(views.neighbor_lengths(20), [40])
+        self.assertEqual(views.neighbor_lengths(90, step=10), [80])
+
+    def test_one_call_caches_every_length(self):
+        """Test that variants share one model call and become individual cache hits"""
+        results = views.generate_summary_variants(CONTENT, [50, 30, 70], 'professional')
+
+        self.assertEqual(len(self.model.prompts), 1)
+        self.assertEqual(sorted(results), [30, 50, 70])
+        for length in (30, 50, 70):
+            cached = self.cache.get_cached_summary(CONTENT, length, 'professional')
+            self.assertEqual(cached['summary'], f"Summary at {length} percent.")
+            self.assertEqual(cached['metadata']['categories']['primary_category'], 'news')
+
+    def test_only_missing_lengths_are_generated(self):
+        """Test that cached lengths are left out of the prompt"""
+        views.generate_summary_variants(CONTENT, [50], 'professional')
+        views.generate_summary_variants(CONTENT, [30, 50], 'professional')
+        views.generate_summary_variants(CONTENT, [30, 50], 'professional')
+
+        self.assertEqual(len(self.model.prompts), 2)
+        self.assertIn('"30": "..."', self.model.prompts[1])
+        self.assertNotIn('"50": "..."', self.model.prompts[1])
+
+    def test_stale_variants_are_served_and_refreshed(self):
+        """Test that stale variants are returned at once and refreshed in the background"""
+        views.generate_summary_variants(CONTENT, [30, 50], 'professional')
+        
+        with patch('website.cache.time.time', return_value=time.time() + self.cache.cache_expiry + 1), \
+             patch.object(views, 'schedule_summary_refresh') as refresh:
+            results = views.generate_summary_variants(CONTENT, [30, 50], 'professional')
+        
+        self.assertEqual(len(self.model.prompts), 1)
+        self.assertEqual(sorted(results), [30, 50])
+        self.assertNotIn('stale', results[30])
+        self.assertEqual(sorted(call.args[1] for call in refresh.call_args_list), [30, 50])
+    
+    def test_concurrent_requests_share_one_call(self):
+        """Test that identical concurrent variant requests make a single model call"""
+        generate_content = self.model.generate_content
+        def slow_generate(*args, **kwargs):
+            time.sleep(0.2)
+            return generate_content(*args, **kwargs)
+        
+        results = []
+        with patch.object(self.model, 'generate_content', side_effect=slow_generate):
+            threads = [
+                threading.Thread(target=lambda: results.append(
+                    views.generate_summary_variants(CONTENT, [30, 50], 'professional')))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(len(self.model.prompts), 1)
+        self.assertTrue(all(sorted(result) == [30, 50] for result in results))
+        self.assertEqual(len(results), 4)
+    
+    def test_speculation_is_low_priority_and_claimed_once(self):
+        """Test that background variants are scheduled once at low priority"""
+        with patch.object(views.async_processor, 'submit_task', return_value='task-1') as submit:
+            self.assertEqual(views.schedule_variant_speculation(CONTENT, [30, 70], 'professional'), 'task-1')
+            self.assertIsNone(views.schedule_variant_speculation(CONTENT, [70, 30], 'professional'))
+
+        submit.assert_called_once()
+        self.assertIs(submit.call_args[0][0], views.speculate_variants_task)
+        self.assertEqual(submit.call_args[1]['priority'], 'low')
+
+    def test_speculation_task(self):
+        """Test that the speculation task caches the variants"""
+        result = views.speculate_variants_task(CONTENT, [30, 70], 'professional')
+
+        self.assertEqual(result, {'status': 'completed', 'lengths': [30, 70]})
+        self.assertIsNotNone(self.cache.get_cached_summary(CONTENT, 70, 'professional'))
+
+class TestSummarizeVariantsEndpoint(AppTestCase):
+    """Test cases for variants requested from /api/summarize"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = make_cache()
+        self.model = FakeVariantsModel()
+        for target in (patch.object(views, 'redis_cache', self.cache),
+                       patch.object(views, 'model', self.model)):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_variants_returned_with_summary(self):
+        """Test that requested variants come back from one call and slider moves hit the cache"""
+        res = self.client.post('/api/summarize', json={'content': CONTENT, 'length': 50, 'variants': True})
+        data = res.get_json()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['summary'], "Summary at 50 percent.")
+        self.assertEqual(sorted(data['variants']), ['30', '70'])
+        self.assertEqual(len(self.model.prompts), 1)
+
+        res = self.client.post('/api/summarize', json={'content': CONTENT, 'length': 30})
+        self.assertTrue(res.get_json()['cached'])
+        self.assertEqual(len(self.model.prompts), 1)
+
+    def test_invalid_variants(self):
+        """Test that out-of-range variant lengths are rejected"""
+        res = self.client.post('/api/summarize', json={'content': CONTENT, 'variants': [5]})
+        self.assertEqual(res.status_code, 400)
+
+    def test_speculate_schedules_neighbours(self):
+        """Test that speculate schedules the neighbouring lengths in the background"""
+        with patch.object(views, 'schedule_variant_speculation') as schedule, \
+             patch.object(views, 'generate_summary_coalesced', return_value={'summary': 'S'}):
+            self.client.post('/api/summarize', json={'content': CONTENT, 'length': 50, 'speculate': True})
+
+        schedule.assert_called_once_with(CONTENT.strip(), [30, 70], 'professional')
+
+if __name__ == '__main__':
+    unittest.main()
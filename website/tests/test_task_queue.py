@@ -0,0 +1,241 @@
+"""
+Tests for the Task Queue Module
+"""
+
+import unittest
+import time
+import sys
+import os
+import queue
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.task_queue import (
+    MemoryTaskQueue,
+    SQLiteTaskQueue,
+    create_task_queue,
+    serialize_task,
+    deserialize_task
+)
+from website.task_results import TaskResultStore
+from website.content_store import ContentStore, content_store
+from website.async_processor import AsyncProcessor, chunk_content
+
+def local_task():
+    """A function outside the website package"""
+    return "local"
+
+class TestTaskSerialization(unittest.TestCase):
+    """Test cases for task serialization"""
+    
+    def test_package_function_round_trip(self):
+        """Test that package functions with JSON arguments are serialized"""
+        payload = serialize_task(chunk_content, ("some text",), {'max_chunk_size': 100}, 30)
+        self.assertIsNotNone(payload)
+        
+        task = deserialize_task('task1', payload, 1)
+        self.assertIs(task.func, chunk_content)
+        self.assertEqual(task.args, ("some text",))
+        self.assertEqual(task.kwargs, {'max_chunk_size': 100})
+        self.assertTrue(task.durable)
+    
+    def test_non_durable_tasks(self):
+        """Test that closures, outside functions and non-JSON arguments stay in memory"""
+        self.assertIsNone(serialize_task(lambda: 1, (), {}, 30))
+        self.assertIsNone(serialize_task(local_task, (), {}, 30))
+        self.assertIsNone(serialize_task(chunk_content, (object(),), {}, 30))
+    
+    def test_content_handles_round_trip(self):
+        """Test that content handles are compressed in the payload and rebuilt"""
+        text = "A long article. " * 1000
+        handle = content_store.put(text)
+        payload = serialize_task(chunk_content, (), {'content': handle}, 30)
+
+        self.assertNotIn("A long article.", payload)
+        self.assertLess(len(payload), len(text) / 10)
+        # The same process gets its own handle back without decompressing
+        self.assertIs(deserialize_task('task1', payload, 1).kwargs['content'], handle)
+
+        # Another process rebuilds the content from the payload
+        other = ContentStore()
+        with patch('website.task_queue.content_store', other):
+            rebuilt = deserialize_task('task1', payload, 1).kwargs['content']
+        self.assertEqual(rebuilt.read(), text)
+        self.assertEqual(other.stats['decoded'], 1)
+    
+    def test_refuses_outside_functions(self):
+        """Test that payloads naming functions outside the package are rejected"""
+        payload = '{"func": "os:getcwd", "args": [], "kwargs": {}, "timeout": 1}'
+        with self.assertRaises(ValueError):
+            deserialize_task('task1', payload, 1)
+
+class TestSQLiteTaskQueue(unittest.TestCase):
+    """Test cases for the SQLite task queue"""
+    
+    def setUp(self):
+        """Create a temporary queue database"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'queue.db')
+    
+    def tearDown(self):
+        """Remove the temporary queue database"""
+        self.tmpdir.cleanup()
+    
+    def test_fifo_claim_and_ack(self):
+        """Test that tasks are claimed in order and removed when acknowledged"""
+        task_queue = SQLiteTaskQueue(self.path)
+        task_queue.put('a', 'payload-a', 60)
+        task_queue.put('b', 'payload-b', 60)
+        
+        self.assertEqual(task_queue.claim(), ('a', 'payload-a', 1))
+        self.assertEqual(task_queue.claim(), ('b', 'payload-b', 1))
+        self.assertIsNone(task_queue.claim())
+        
+        task_queue.ack('a')
+        task_queue.ack('b')
+        self.assertEqual(task_queue.pending_count(), 0)
+    
+    def test_visibility_timeout_redelivers(self):
+        """Test that an unacknowledged task is delivered again after its lease"""
+        task_queue = SQLiteTaskQueue(self.path)
+        task_queue.put('a', 'payload-a', 0.1)
+        
+        self.assertEqual(task_queue.claim()[0], 'a')
+        self.assertIsNone(task_queue.claim())
+        
+        time.sleep(0.15)
+        self.assertEqual(task_queue.claim(), ('a', 'payload-a', 2))
+    
+    def test_queue_survives_restart(self):
+        """Test that a new queue instance sees tasks from a previous one"""
+        SQLiteTaskQueue(self.path).put('a', 'payload-a', 60)
+        self.assertEqual(SQLiteTaskQueue(self.path).claim()[0], 'a')
+    
+    def test_max_pending(self):
+        """Test that the queue refuses tasks when full"""
+        task_queue = SQLiteTaskQueue(self.path, max_pending=1)
+        task_queue.put('a', 'payload-a', 60)
+        with self.assertRaises(queue.Full):
+            task_queue.put('b', 'payload-b', 60)
+    
+    def test_recover_releases_dead_owner(self):
+        """Test that leases held by a dead local process are released on startup"""
+        task_queue = SQLiteTaskQueue(self.path)
+        task_queue.put('a', 'payload-a', 600)
+        task_queue.claim()
+        
+        # Pretend the lease belongs to a process that no longer exists
+        import socket
+        task_queue._conn.execute(
+            "UPDATE task_queue SET owner = ? WHERE task_id = 'a'",
+            (f"{socket.gethostname()}:999999999",)
+        )
+        
+        self.assertEqual(task_queue.recover(), 1)
+        self.assertEqual(task_queue.claim()[0], 'a')
+
+class TestDurableProcessing(unittest.TestCase):
+    """Test cases for the async processor with a durable queue"""
+    
+    def setUp(self):
+        """Create a temporary queue database"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'queue.db')
+    
+    def tearDown(self):
+        """Remove the temporary queue database"""
+        self.tmpdir.cleanup()
+    
+    def wait_for(self, processor, task_id, limit=5):
+        """Wait until a task has finished"""
+        deadline = time.time() + limit
+        while time.time() < deadline:
+            status = processor.get_task_status(task_id)
+            if status['status'] not in ('pending', 'unknown'):
+                return status
+            time.sleep(0.02)
+        self.fail("Task did not finish in time")
+    
+    def test_task_resumes_after_restart(self):
+        """Test that a task queued by a stopped worker is run by the next one"""
+        # The first worker accepts the task but is never started
+        first = AsyncProcessor(max_workers=1, result_store=TaskResultStore(),
+                               durable_queue=SQLiteTaskQueue(self.path))
+        task_id = first.submit_task(chunk_content, "short text")
+        first.stop()
+        
+        second = AsyncProcessor(max_workers=1, result_store=TaskResultStore(),
+                                durable_queue=SQLiteTaskQueue(self.path))
+        second.start()
+        try:
+            status = self.wait_for(second, task_id)
+        finally:
+            second.stop()
+        
+        self.assertEqual(status['status'], 'completed')
+        self.assertEqual(status['result'], ["short text"])
+        self.assertEqual(SQLiteTaskQueue(self.path).pending_count(), 0)
+    
+    def test_in_process_tasks_still_run(self):
+        """Test that tasks which cannot be persisted use the in-process queue"""
+        processor = AsyncProcessor(max_workers=1, result_store=TaskResultStore(),
+                                   durable_queue=MemoryTaskQueue())
+        processor.start()
+        try:
+            task_id = processor.submit_task(lambda: "done")
+            status = self.wait_for(processor, task_id)
+        finally:
+            processor.stop()
+        
+        self.assertEqual(status['result'], "done")
+
+    def test_memory_queue_keeps_task_objects(self):
+        """Test that the memory queue passes content handles on without encoding them"""
+        processor = AsyncProcessor(max_workers=1, result_store=TaskResultStore(),
+                                   durable_queue=MemoryTaskQueue())
+        handle = ContentStore().put("Some text. " * 50)
+        with patch.object(type(handle), 'to_wire', side_effect=AssertionError("encoded")):
+            task_id = processor.submit_task(chunk_content, handle)
+        
+        claimed = processor._next_task(timeout=0)
+        self.assertEqual(claimed.task_id, task_id)
+        self.assertIs(claimed.args[0], handle)
+        self.assertTrue(claimed.durable)
+    
+    def test_durable_queue_serializes_tasks(self):
+        """Test that the SQLite queue encodes content and refuses closures"""
+        processor = AsyncProcessor(max_workers=1, result_store=TaskResultStore(),
+                                   durable_queue=SQLiteTaskQueue(self.path))
+        handle = ContentStore().put("Some text. " * 50)
+        with patch.object(type(handle), 'to_wire', autospec=True, side_effect=type(handle).to_wire) as to_wire:
+            processor.submit_task(chunk_content, handle)
+            processor.submit_task(lambda: "done")
+        
+        to_wire.assert_called_once()
+        self.assertEqual(processor.durable_queue.pending_count(), 1)
+        self.assertEqual(processor.task_queue.qsize(), 1)
+    
+    def test_queue_follows_result_backend(self):
+        """Test that the default queue is only shared when task results are"""
+        with patch.dict(os.environ, {'TASK_QUEUE_DB': self.path}):
+            os.environ.pop('TASK_QUEUE_BACKEND', None)
+            with patch.dict(os.environ, {'TASK_RESULT_BACKEND': 'memory'}):
+                self.assertEqual(create_task_queue().name, 'memory')
+            with patch.dict(os.environ, {'TASK_RESULT_BACKEND': 'sqlite'}):
+                self.assertEqual(create_task_queue().name, 'sqlite')
+            with patch.dict(os.environ):
+                os.environ.pop('TASK_RESULT_BACKEND', None)
+                self.assertEqual(create_task_queue().name, 'sqlite')
+    
+    def test_shared_queue_requires_shared_results(self):
+        """Test that a shared queue configured with per-process results is refused"""
+        with patch.dict(os.environ, {'TASK_QUEUE_BACKEND': 'sqlite', 'TASK_QUEUE_DB': self.path}):
+            processor = AsyncProcessor(max_workers=1, result_store=TaskResultStore())
+        
+        self.assertIsInstance(processor.durable_queue, MemoryTaskQueue)
+
+if __name__ == '__main__':
+    unittest.main()
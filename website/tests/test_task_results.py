@@ -0,0 +1,179 @@
+"""
+Tests for the Task Result Storage Module
+"""
+
+import unittest
+import time
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.task_results import (
+    TaskResultStore,
+    RedisResultBackend,
+    SQLiteResultBackend,
+    create_result_backend,
+    estimate_size
+)
+
+class TestTaskResultStore(unittest.TestCase):
+    """Test cases for the TaskResultStore class"""
+    
+    def test_set_and_get(self):
+        """Test storing and reading a result"""
+        store = TaskResultStore()
+        store['task1'] = {'status': 'completed', 'result': 5}
+        
+        self.assertIn('task1', store)
+        self.assertEqual(store['task1']['result'], 5)
+        self.assertEqual(store.get('missing', {'status': 'unknown'}), {'status': 'unknown'})
+    
+    def test_ttl_per_state(self):
+        """Test that finished results expire while pending ones do not"""
+        store = TaskResultStore(ttls={'completed': 0.05, 'pending': None})
+        store['done'] = {'status': 'completed', 'result': 'x'}
+        store['running'] = {'status': 'pending'}
+        
+        time.sleep(0.1)
+        
+        self.assertNotIn('done', store)
+        self.assertIn('running', store)
+        self.assertEqual(store.stats()['evictions']['expired'], 1)
+    
+    def test_entry_limit_evicts_least_recently_used(self):
+        """Test LRU eviction when the entry limit is reached"""
+        store = TaskResultStore(max_entries=2)
+        store['a'] = {'status': 'completed', 'result': 'a'}
+        store['b'] = {'status': 'completed', 'result': 'b'}
+        
+        # Touch 'a' so 'b' becomes the least recently used
+        store.get('a')
+        store['c'] = {'status': 'completed', 'result': 'c'}
+        
+        self.assertIn('a', store)
+        self.assertNotIn('b', store)
+        self.assertIn('c', store)
+        self.assertEqual(store.stats()['evictions']['lru'], 1)
+    
+    def test_byte_limit(self):
+        """Test that the byte limit bounds the stored content"""
+        large = {'status': 'completed', 'result': {'original_content': 'x' * 20000}}
+        store = TaskResultStore(max_bytes=estimate_size(large) * 3)
+        
+        for i in range(10):
+            store[f'task{i}'] = dict(large)
+        
+        stats = store.stats()
+        self.assertLessEqual(stats['bytes'], store.max_bytes)
+        self.assertEqual(stats['entries'], 3)
+        self.assertEqual(stats['evictions']['lru'], 7)
+    
+    def test_pending_tasks_are_never_evicted(self):
+        """Test that pending tasks survive eviction"""
+        store = TaskResultStore(max_entries=1)
+        store['pending'] = {'status': 'pending'}
+        store['done'] = {'status': 'completed', 'result': 1}
+        
+        self.assertIn('pending', store)
+        self.assertNotIn('done', store)
+    
+    def test_purge_finished(self):
+        """Test clearing old finished results"""
+        store = TaskResultStore()
+        store['old'] = {'status': 'completed', 'result': 1}
+        store['pending'] = {'status': 'pending'}
+        
+        self.assertEqual(store.purge_finished(max_age=0), 1)
+        self.assertNotIn('old', store)
+        self.assertIn('pending', store)
+    
+    def test_stats_track_bytes(self):
+        """Test that the byte count follows updates and removals"""
+        store = TaskResultStore()
+        store['task'] = {'status': 'pending'}
+        store['task'] = {'status': 'completed', 'result': 'y' * 1000}
+        
+        self.assertEqual(store.stats()['bytes'], estimate_size(store['task']))
+        self.assertEqual(store.stats()['by_state'], {'completed': 1})
+        
+        del store['task']
+        self.assertEqual(store.stats()['bytes'], 0)
+
+class TestSQLiteResultBackend(unittest.TestCase):
+    """Test cases for the SQLite result backend"""
+    
+    def setUp(self):
+        """Create a temporary database file"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'results.db')
+    
+    def tearDown(self):
+        """Remove the temporary database file"""
+        self.tmpdir.cleanup()
+    
+    def test_results_are_shared_between_workers(self):
+        """Test that a second worker sees results written by the first"""
+        worker_a = SQLiteResultBackend(self.path)
+        worker_b = SQLiteResultBackend(self.path)
+        
+        worker_a['task1'] = {'status': 'pending'}
+        self.assertEqual(worker_b.get('task1'), {'status': 'pending'})
+        
+        worker_a['task1'] = {'status': 'completed', 'result': {'summary': 'done'}}
+        self.assertEqual(worker_b['task1']['result'], {'summary': 'done'})
+        self.assertNotIn('missing', worker_b)
+    
+    def test_expired_results_are_unknown(self):
+        """Test that results past their TTL are not returned"""
+        backend = SQLiteResultBackend(self.path, ttls={'completed': 0.05})
+        other = SQLiteResultBackend(self.path)
+        backend['task1'] = {'status': 'completed', 'result': 1}
+        
+        time.sleep(0.1)
+        self.assertIsNone(other.get('task1'))
+    
+    def test_factory_selects_sqlite(self):
+        """Test selecting the SQLite backend by configuration"""
+        os.environ['TASK_RESULT_DB'] = self.path
+        try:
+            backend = create_result_backend('sqlite')
+        finally:
+            del os.environ['TASK_RESULT_DB']
+        self.assertIsInstance(backend, SQLiteResultBackend)
+        self.assertIsInstance(create_result_backend('memory'), TaskResultStore)
+    
+    def test_factory_defaults_to_sqlite(self):
+        """Test that results are restart-safe without configuration"""
+        with patch.dict(os.environ, {'TASK_RESULT_DB': self.path}):
+            os.environ.pop('TASK_RESULT_BACKEND', None)
+            self.assertIsInstance(create_result_backend(), SQLiteResultBackend)
+
+class TestRedisResultBackend(unittest.TestCase):
+    """Test cases for the Redis result backend"""
+    
+    def test_write_and_read(self):
+        """Test that results are written with a TTL and read back"""
+        client = MagicMock()
+        backend = RedisResultBackend(lambda: client, ttls={'completed': 100})
+        
+        backend['task1'] = {'status': 'completed', 'result': 5}
+        client.setex.assert_called_once_with('task:task1', 100, json.dumps({'status': 'completed', 'result': 5}))
+        
+        client.get.return_value = json.dumps({'status': 'completed', 'result': 7})
+        self.assertEqual(backend['task1']['result'], 7)
+    
+    def test_falls_back_to_local_store(self):
+        """Test that the owning worker still answers when Redis is down"""
+        backend = RedisResultBackend(lambda: None)
+        backend['task1'] = {'status': 'pending'}
+        
+        self.assertEqual(backend.get('task1'), {'status': 'pending'})
+        self.assertGreater(backend.stats()['backend_errors'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
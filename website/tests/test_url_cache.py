@@ -0,0 +1,117 @@
+"""
+Tests for the URL extraction cache
+"""
+
+import unittest
+import time
+import sys
+import os
+from unittest.mock import patch
+
+
+# Add the parent directory to sys.path to allow imports from the website package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from website.tests.fakes import FakeResponse
+from website import content_processor
+from website.content_processor import canonicalize_url, extract_content_from_url
+from website.cache import SummaryCache
+from website.cache_backends import MemoryCacheBackend
+
+PAGE = """
+<html><head><title>Storm update</title></head>
+<body><nav>Menu</nav><article><p>The storm reached the coast overnight.</p></article></body></html>
+"""
+
+class TestCanonicalUrl(unittest.TestCase):
+    """Test cases for URL canonicalization"""
+
+    def test_equivalent_urls(self):
+        """Test that spelling differences map onto one URL"""
+        self.assertEqual(
+            canonicalize_url('HTTPS://Example.com:443/news?b=2&utm_source=x&a=1#top'),
+            'https://example.com/news?a=1&b=2'
+        )
+        self.assertEqual(canonicalize_url('http://example.com'), 'http://example.com/')
+
+    def test_different_pages(self):
+        """Test that meaningful differences are kept"""
+        self.assertNotEqual(canonicalize_url('https://example.com/a'), canonicalize_url('https://example.com/b'))
+        self.assertNotEqual(canonicalize_url('https://example.com/?id=1'), canonicalize_url('https://example.com/?id=2'))
+
+class TestExtractionCache(unittest.TestCase):
+    """Test cases for cached URL extraction"""
+
+    def setUp(self):
+        cache = patch.object(content_processor, 'redis_cache', SummaryCache(MemoryCacheBackend()))
+        cache.start()
+        self.addCleanup(cache.stop)
+
+    def test_repeat_extraction_skips_fetch_and_parse(self):
+        """Test that a fresh entry is served without a request or a parse"""
+        with patch.object(content_processor.requests, 'get', return_value=FakeResponse(PAGE)) as get, \
+             patch.object(content_processor, 'extract_page', wraps=content_processor.extract_page) as parse:
+            first = extract_content_from_url('https://example.com/storm')
+            second = extract_content_from_url('https://example.com/storm?utm_source=feed')
+
+        self.assertTrue(first['success'])
+        self.assertIn('The storm reached the coast overnight.', first['content'])
+        self.assertNotIn('Menu', first['content'])
+        self.assertEqual(second['content'], first['content'])
+        self.assertEqual(second['metadata']['url'], 'https://example.com/storm?utm_source=feed')
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_stale_entry_is_revalidated(self):
+        """Test that an unchanged page is revalidated with a conditional request"""
+        responses = [
+            FakeResponse(PAGE, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+            FakeResponse(status_code=304)
+        ]
+        with patch.object(content_processor.requests, 'get', side_effect=responses) as get, \
+             patch.object(content_processor, 'extract_page', wraps=content_processor.extract_page) as parse:
+            extract_content_from_url('https://example.com/storm')
+            with patch('website.cache.time.time', return_value=time.time() + content_processor.URL_CACHE_FRESH + 1):
+                result = extract_content_from_url('https://example.com/storm')
+
+        self.assertTrue(result['success'])
+        self.assertIn('storm reached the coast', result['content'])
+        headers = get.call_args_list[1][1]['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.assertEqual(parse.call_count, 1)
+
+    def test_failures_are_cached_briefly(self):
+        """Test negative caching of failed extractions"""
+        with patch.object(content_processor.requests, 'get', return_value=FakeResponse(status_code=404)) as get:
+            first = extract_content_from_url('https://example.com/missing')
+            second = extract_content_from_url('https://example.com/missing')
+            with patch('website.cache.time.time', return_value=time.time() + content_processor.URL_NEGATIVE_CACHE_TTL + 1):
+                extract_content_from_url('https://example.com/missing')
+
+        self.assertFalse(first['success'])
+        self.assertEqual(second['error'], first['error'])
+        self.assertEqual(get.call_count, 2)
+
+    def test_unreachable_page_serves_last_extraction(self):
+        """Test that a failed revalidation serves the old extraction and backs off"""
+        responses = [FakeResponse(PAGE), content_processor.requests.exceptions.Timeout("timed out")]
+        now = time.time()
+        with patch.object(content_processor.requests, 'get', side_effect=responses) as get:
+            extract_content_from_url('https://example.com/storm')
+            with patch('website.cache.time.time', return_value=now + content_processor.URL_CACHE_FRESH + 1):
+                first = extract_content_from_url('https://example.com/storm')
+                second = extract_content_from_url('https://example.com/storm')
+
+        self.assertTrue(first['success'])
+        self.assertEqual(second['content'], first['content'])
+        self.assertEqual(get.call_count, 2)
+
+    def test_invalid_url(self):
+        """Test that invalid URLs are rejected without a request"""
+        with patch.object(content_processor.requests, 'get') as get:
+            self.assertFalse(extract_content_from_url('not a url')['success'])
+        get.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
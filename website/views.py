@@ -4,15 +4,22 @@ from email.mime.text import MIMEText
 import random
 import smtplib
 import uuid
-from flask import Blueprint, current_app, render_template, request, flash, jsonify, redirect, session, url_for
+from flask import Blueprint, Response, current_app, render_template, request, flash, jsonify, redirect, session, stream_with_context, url_for
 from flask_login import login_required, current_user
 from .models import Note, User, ScheduledPost, SavedSummary, FavoriteSummary, Subscriber, Article, FavoriteArticle, SavedTemplate
 from . import db
 from .cache import redis_cache
-from .content_processor import process_content, preprocess_for_gemini
+from .content_processor import EXTRACTIVE_TOKEN_BUDGET, extractive_summary, process_content, preprocess_for_gemini, reduce_content
 from .content_filter import filter_content
-from .async_processor import async_processor, compress_content, decompress_content, chunk_content
+from .summary_parser import PARSER_VERSION, SOURCE_MARKER, StreamingSummaryParser, format_sse, parse_summary_response, parse_variants_response
+from .single_flight import SingleFlight
+from .batch_pipeline import build_packed_prompt, dedupe_items, pack_items, parse_packed_response, prepare_items
+from .async_processor import async_processor, decompress_content, map_concurrently, plan_chunks
+from .content_store import content_store, resolve_content
+from .llm_backends import create_llm_backend
 import json
+import threading
+from collections import Counter
 import requests
 import markdown
 from datetime import datetime
@@ -21,7 +28,6 @@ from cryptography.fernet import Fernet
 import base64
 import os
 from os import environ
-import google.generativeai as genai
 import time
 import hmac
 import hashlib
@@ -42,16 +48,74 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Gemini API initialization
-try:
-    # Initialize Gemini API client
-    genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-    # Set up the model
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    print("Gemini API initialized successfully")
-except Exception as e:
-    print(f"Error initializing Gemini API: {str(e)}")
-    model = None
+# Gemini model used for summaries
+GEMINI_MODEL = 'gemini-1.5-flash'
+# Bump when the summary prompts change, to move the summary cache to a new namespace
+SUMMARY_PROMPT_VERSION = '1'
+
+# Summarization backend: Gemini by default, or LLM_BACKEND=fake to run the
+# whole summarize stack offline against a model with simulated latency
+model = create_llm_backend(model_name=GEMINI_MODEL)
+
+# Maximum number of chunk summaries generated at the same time
+CHUNK_SUMMARY_CONCURRENCY = int(os.getenv('CHUNK_SUMMARY_CONCURRENCY', 4))
+# Summarize locally from the most central sentences when Gemini is unavailable
+EXTRACTIVE_FALLBACK = os.getenv('EXTRACTIVE_FALLBACK', 'true').lower() == 'true'
+# Estimated tokens of content sent to the model in one chunk
+CHUNK_TOKEN_BUDGET = int(os.getenv('CHUNK_TOKEN_BUDGET', 8000))
+# Combined chunk summaries longer than this (in characters) are reduced in a tree
+CHUNK_REDUCE_INPUT_LIMIT = int(os.getenv('CHUNK_REDUCE_INPUT_LIMIT', 12000))
+# Maximum number of intermediate reduce levels before the final summary
+CHUNK_REDUCE_MAX_DEPTH = 4
+# Maximum number of items accepted by /api/summarize/batch
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 500))
+# Maximum number of model calls running at once for a batch
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 4))
+# Items up to this many characters are packed together into shared prompts
+BATCH_PACK_ITEM_LIMIT = int(os.getenv('BATCH_PACK_ITEM_LIMIT', 4000))
+# Maximum combined content characters and items in one packed prompt
+BATCH_PACK_PROMPT_LIMIT = int(os.getenv('BATCH_PACK_PROMPT_LIMIT', 12000))
+BATCH_PACK_MAX_ITEMS = int(os.getenv('BATCH_PACK_MAX_ITEMS', 8))
+# Distance between a summary length and its neighbouring slider variants
+SUMMARY_VARIANT_STEP = int(os.getenv('SUMMARY_VARIANT_STEP', 20))
+# Maximum number of extra length variants requested with one summary
+SUMMARY_VARIANT_MAX = 4
+# Generate the neighbouring length variants of every summary in the background
+SPECULATIVE_VARIANTS = os.getenv('SPECULATIVE_VARIANTS', 'false').lower() == 'true'
+# News results are fresh for NEWS_CACHE_EXPIRY seconds and served stale while
+# refreshing in the background until NEWS_CACHE_HARD_EXPIRY
+NEWS_CACHE_EXPIRY = int(os.getenv('NEWS_CACHE_EXPIRY', 600))
+NEWS_CACHE_HARD_EXPIRY = int(os.getenv('NEWS_CACHE_HARD_EXPIRY', 6 * 3600))
+# Seconds before a TheNewsAPI request times out
+NEWS_API_TIMEOUT = float(os.getenv('NEWS_API_TIMEOUT', 5))
+# Category sets always kept warm, e.g. "general;business,tech", plus the most
+# searched NEWS_PREWARM_TOP sets of this process
+NEWS_PREWARM_CATEGORIES = [
+    sorted(group.split(',')) for group in os.getenv('NEWS_PREWARM_CATEGORIES', 'general').split(';') if group
+]
+NEWS_PREWARM_TOP = int(os.getenv('NEWS_PREWARM_TOP', 5))
+# Summaries of the top N articles of fetched news results are generated in the
+# background with the default settings (opt-in, 0 disables)
+NEWS_PRESUMMARIZE_TOP = int(os.getenv('NEWS_PRESUMMARIZE_TOP', 0))
+NEWS_PRESUMMARIZE_LENGTH = 50
+NEWS_PRESUMMARIZE_TONE = 'professional'
+
+# Keep-alive connections to TheNewsAPI, shared by requests and the pre-warm job
+news_session = requests.Session()
+# Number of searches per category set, used to pick the sets to pre-warm
+news_search_counts = Counter()
+news_search_lock = threading.Lock()
+
+# Cached summaries are only reused while the prompt, model and parser match
+redis_cache.set_namespace(prompt=SUMMARY_PROMPT_VERSION, model=getattr(model, 'model_name', GEMINI_MODEL), parser=PARSER_VERSION)
+
+# Identical concurrent summary requests share one model call, within this
+# process and across processes through a short Redis lock
+summary_flight = SingleFlight(
+    redis_cache.get_client,
+    lock_ttl=int(os.getenv('SUMMARY_LOCK_TTL', 30)),
+    wait_timeout=int(os.getenv('SUMMARY_LOCK_WAIT', 30))
+)
 
 # For API key encryption (in production, use a proper key management system)
 # This is a simple implementation for demonstration purposes
@@ -950,6 +1014,145 @@ def save_media_files(request_files):
     
     return media_paths
 
+# Tones accepted by the summarize endpoints
+VALID_TONES = ['professional', 'casual', 'academic', 'friendly', 'promotional', 'informative']
+
+def validate_summary_params(data):
+    """
+    Validate the length and tone of a summary request
+    
+    Args:
+        data (dict): Request data
+        
+    Returns:
+        tuple: (length, tone, error response or None)
+    """
+    try:
+        length = int(data.get('length', 50))
+        if length < 10 or length > 90:
+            return None, None, (jsonify({'error': 'Length must be between 10 and 90 percent.'}), 400)
+    except (ValueError, TypeError):
+        return None, None, (jsonify({'error': 'Length must be a valid number.'}), 400)
+    
+    tone = data.get('tone', 'professional').lower()
+    if tone not in VALID_TONES:
+        return None, None, (jsonify({'error': f'Invalid tone. Must be one of: {", ".join(VALID_TONES)}'}), 400)
+    
+    return length, tone, None
+
+def build_summary_prompt(content, length, tone):
+    """
+    Build the prompt asking for a headline, categories and summary
+    
+    Args:
+        content (str): Content to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        str: Prompt for the model
+    """
+    return f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
+Create a summary that is approximately {length}% of the original length.
+Maintain the key points while adjusting the length and tone as specified.
+
+Also create a compelling headline in the {tone} tone that captures the essence of the content.
+
+Additionally, identify the primary and secondary categories that best describe this content.
+Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
+
+Format your response exactly like this:
+HEADLINE: [Your headline here]
+
+CATEGORIES: [Primary Category], [Secondary Category]
+
+SUMMARY:
+[Your summary here]
+
+{SOURCE_MARKER}
+
+{content}"""
+
+def build_variants_prompt(content, lengths, tone):
+    """
+    Build a prompt asking for one headline and a summary at each of several lengths
+    
+    Args:
+        content (str): Content to summarize
+        lengths (list): Summary length percentages
+        tone (str): Summary tone
+        
+    Returns:
+        str: Prompt for the model
+    """
+    percentages = ", ".join(f"{length}%" for length in lengths)
+    example = ", ".join(f'"{length}": "..."' for length in lengths)
+    
+    return f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
+Create {len(lengths)} summaries of the text below, one for each of these lengths relative to the original: {percentages}.
+Each summary must stand on its own, maintaining the key points while adjusting the length and tone as specified.
+
+Also create one compelling headline in the {tone} tone that captures the essence of the content.
+
+Additionally, identify the primary and secondary categories that best describe this content.
+Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
+
+Respond with only a JSON object like this, with one summary per length:
+{{"headline": "...", "categories": ["Primary Category", "Secondary Category"], "summaries": {{{example}}}}}
+
+{SOURCE_MARKER}
+
+{content}"""
+
+def neighbor_lengths(length, step=None):
+    """
+    Return the slider lengths next to a summary length
+    
+    Args:
+        length (int): Summary length percentage
+        step (int, optional): Distance to the neighbours, SUMMARY_VARIANT_STEP by default
+        
+    Returns:
+        list: Neighbouring length percentages between 10 and 90
+    """
+    step = step or SUMMARY_VARIANT_STEP
+    return [neighbor for neighbor in (length - step, length + step) if 10 <= neighbor <= 90]
+
+def validate_variant_lengths(data, length):
+    """
+    Validate the extra summary lengths requested with a summary
+    
+    Args:
+        data (dict): Request data; 'variants' is a list of length percentages,
+            or true for the neighbours of the requested length
+        length (int): Requested summary length percentage
+        
+    Returns:
+        tuple: (list of extra lengths, error response or None)
+    """
+    variants = data.get('variants')
+    if not variants:
+        return [], None
+    if variants is True:
+        return neighbor_lengths(length), None
+    if not isinstance(variants, list):
+        return None, (jsonify({'error': 'Variants must be a list of lengths.'}), 400)
+    
+    lengths = []
+    for variant in variants:
+        try:
+            variant = int(variant)
+        except (ValueError, TypeError):
+            return None, (jsonify({'error': 'Variant lengths must be valid numbers.'}), 400)
+        if variant < 10 or variant > 90:
+            return None, (jsonify({'error': 'Variant lengths must be between 10 and 90 percent.'}), 400)
+        if variant != length and variant not in lengths:
+            lengths.append(variant)
+    
+    if len(lengths) > SUMMARY_VARIANT_MAX:
+        return None, (jsonify({'error': f'At most {SUMMARY_VARIANT_MAX} variants can be requested.'}), 400)
+    return lengths, None
+
 @views.route('/api/summarize', methods=['POST'])
 @login_required
 def summarize():
@@ -968,18 +1171,9 @@ def summarize():
             return jsonify({'error': 'No content or URL provided.'}), 400
             
         # Validate and sanitize parameters
-        try:
-            length = int(data.get('length', 50))
-            if length < 10 or length > 90:
-                return jsonify({'error': 'Length must be between 10 and 90 percent.'}), 400
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Length must be a valid number.'}), 400
-            
-        # Validate tone parameter
-        valid_tones = ['professional', 'casual', 'academic', 'friendly', 'promotional', 'informative']
-        tone = data.get('tone', 'professional').lower()
-        if tone not in valid_tones:
-            return jsonify({'error': f'Invalid tone. Must be one of: {", ".join(valid_tones)}'}), 400
+        length, tone, error_response = validate_summary_params(data)
+        if error_response:
+            return error_response
         
         # Check if this is a batch request
         is_batch = data.get('is_batch', False)
@@ -1000,18 +1194,9 @@ def summarize():
         metadata = processing_result['metadata']
         
         # Check content length after processing
-        if len(content) > 10000:
-            # For very large content, use chunking
-            if len(content) > 20000:
-                # Use chunking for extremely large content
-                return handle_chunked_content(content, length, tone, metadata, data)
-            else:
-                # For moderately large content, use compression
-                compressed = compress_content(content)
-                if compressed:
-                    metadata['compressed'] = True
-                    metadata['original_size'] = len(content)
-                    content = compressed
+        if len(content) > 20000:
+            # Use chunking for extremely large content
+            return handle_chunked_content(content, length, tone, metadata, data)
         elif len(content) < 50:
             return jsonify({'error': 'Content must be at least 50 characters.'}), 400
         
@@ -1038,12 +1223,24 @@ def summarize():
         # Log the request (without the full content for privacy)
         print(f"Summary request: length={length}, tone={tone}, content_length={len(content)}")
         
+        # Other lengths the client is likely to ask for next
+        variant_lengths, error_response = validate_variant_lengths(data, length)
+        if error_response:
+            return error_response
+        if not variant_lengths and data.get('speculate', SPECULATIVE_VARIANTS):
+            schedule_variant_speculation(content, neighbor_lengths(length), tone)
+        
         # For batch requests or long content, use async processing
         if is_batch or len(content) > 5000:
-            # Submit task to async processor
+            if variant_lengths:
+                # Variants of long content are only generated in the background
+                schedule_variant_speculation(content, variant_lengths, tone)
+            
+            # Submit task to async processor; the task gets a handle to the
+            # content, which is only compressed if the task leaves this process
             task_id = async_processor.submit_task(
                 generate_summary_task,
-                content=content,
+                content=content_store.put(content),
                 length=length,
                 tone=tone,
                 metadata=metadata,
@@ -1058,133 +1255,61 @@ def summarize():
             })
         
         # For regular requests, process synchronously
+        if variant_lengths and model is not None:
+            # All lengths come from the cache or from one shared model call
+            try:
+                variants = generate_summary_variants(content, [length] + variant_lengths, tone)
+            except Exception as variant_error:
+                print(f"Error generating summary variants: {str(variant_error)}")
+                variants = {}
+            
+            if length in variants:
+                response_data = dict(variants.pop(length))
+                metadata['categories'] = response_data['metadata'].get('categories', metadata.get('categories'))
+                response_data['metadata'] = metadata
+                response_data['warnings'] = warnings
+                response_data['variants'] = {
+                    str(variant): {
+                        'headline': result['headline'],
+                        'summary': result['summary'],
+                        'cached': result.get('cached', False)
+                    }
+                    for variant, result in sorted(variants.items())
+                }
+                return jsonify(response_data)
+        
         # Try to get cached summary
-        if metadata.get('compressed'):
-            # Decompress content for cache lookup
-            decompressed = decompress_content(content)
-            cached_result = redis_cache.get_cached_summary(decompressed, length, tone)
-        else:
-            cached_result = redis_cache.get_cached_summary(content, length, tone)
+        cached_result = redis_cache.get_cached_summary(content, length, tone)
             
         if cached_result:
             print("Returning cached summary")
+            if cached_result.pop('stale', False):
+                schedule_summary_refresh(content, length, tone)
             # Add metadata and filtering results to cached result
             cached_result['metadata'] = metadata
             cached_result['warnings'] = warnings
+            if 'near_duplicate' in cached_result:
+                # Report how closely the reused summary's content matched
+                metadata['near_duplicate'] = cached_result.pop('near_duplicate')
             return jsonify(cached_result)
         
         # Check if Gemini model is available
         if model is None:
+            if EXTRACTIVE_FALLBACK:
+                return jsonify(extractive_fallback(content, length, tone, metadata, warnings))
             return jsonify({'error': 'AI service is currently unavailable. Please try again later.'}), 503
         
-        # If content is compressed, decompress it
-        if metadata.get('compressed'):
-            content = decompress_content(content)
-            if not content:
-                return jsonify({'error': 'Failed to decompress content.'}), 500
-        
-        # Create prompt for Gemini that includes headline generation
-        prompt = f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
-Create a summary that is approximately {length}% of the original length.
-Maintain the key points while adjusting the length and tone as specified.
-
-Also create a compelling headline in the {tone} tone that captures the essence of the content.
-
-Additionally, identify the primary and secondary categories that best describe this content.
-Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
-
-Format your response exactly like this:
-HEADLINE: [Your headline here]
-
-CATEGORIES: [Primary Category], [Secondary Category]
-
-SUMMARY:
-[Your summary here]
-
-Please summarize the following text:
-
-{content}"""
-        
         # Make API call to Gemini with error handling
         try:
-            # Gemini API call
-            response = model.generate_content(
-                contents=prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 1500,
-                }
-            )
-            
-            # Extract the headline and summary from the response
-            response_text = response.text
-            
-            # Parse the response to extract headline and summary
-            headline = ""
-            summary = response_text
-            categories = {}
-            
-            if "HEADLINE:" in response_text:
-                # Split by sections
-                sections = response_text.split("\n\n")
-                
-                # Extract headline
-                for section in sections:
-                    if section.startswith("HEADLINE:"):
-                        headline = section.replace("HEADLINE:", "").strip()
-                    elif section.startswith("CATEGORIES:"):
-                        # Extract categories
-                        categories_text = section.replace("CATEGORIES:", "").strip()
-                        category_list = [cat.strip() for cat in categories_text.split(",")]
-                        
-                        if len(category_list) >= 2:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': category_list[1],
-                                'confidence': 90  # High confidence since it's AI-generated
-                            }
-                        elif len(category_list) == 1:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': 'general',
-                                'confidence': 90
-                            }
-                    elif section.startswith("SUMMARY:"):
-                        summary = section.replace("SUMMARY:", "").strip()
-            
-            # If no categories were extracted, use default
-            if not categories:
-                categories = {
-                    'primary_category': 'general',
-                    'secondary_category': 'informational',
-                    'confidence': 50
-                }
-            
-            # Update metadata with AI-generated categories
-            metadata['categories'] = categories
-            
-            # Prepare response data
-            response_data = {
-                'headline': headline,
-                'summary': summary,
-                'original_content': content,
-                'settings': {
-                    'length': length,
-                    'tone': tone
-                },
-                'metadata': metadata,
-                'warnings': warnings,
-                'cached': False
-            }
-            
-            # Cache the result
-            if not metadata.get('compressed'):
-                redis_cache.cache_summary(content, length, tone, response_data)
+            # Identical concurrent requests share a single Gemini call
+            response_data = generate_summary_coalesced(content, length, tone, metadata, warnings)
             
             return jsonify(response_data)
             
         except Exception as api_error:
             print(f"Gemini API error: {str(api_error)}")
+            if EXTRACTIVE_FALLBACK:
+                return jsonify(extractive_fallback(content, length, tone, metadata, warnings))
             return jsonify({'error': 'Failed to generate summary. API service unavailable.'}), 503
         
     except Exception as e:
@@ -1248,14 +1373,163 @@ def summarize_status(task_id):
             'error': 'Failed to check task status'
         }), 500
 
+@views.route('/api/summarize/stream', methods=['POST'])
+@login_required
+def summarize_stream():
+    """
+    Stream a summary to the browser as Server-Sent Events
+    
+    Events are sent in this order: 'metadata', 'headline', 'categories',
+    one 'summary' event per piece of summary text, then 'done' with the
+    complete response. When the model is unavailable or fails, the events
+    carry an extractive summary instead, or an 'error' event is sent if the
+    extractive fallback is disabled.
+    
+    Returns:
+        Streaming text/event-stream response
+    """
+    try:
+        data = request.get_json()
+        
+        # Validate request data
+        if not data:
+            return jsonify({'error': 'Invalid request format. JSON body required.'}), 400
+        
+        has_content = 'content' in data and data['content'].strip()
+        has_url = 'url' in data and data['url'].strip()
+        if not has_content and not has_url:
+            return jsonify({'error': 'No content or URL provided.'}), 400
+        
+        length, tone, error_response = validate_summary_params(data)
+        if error_response:
+            return error_response
+        
+        processing_result = process_content({
+            'content': data.get('content', ''),
+            'url': data.get('url', ''),
+            'is_html': data.get('is_html', False)
+        })
+        if not processing_result['success']:
+            return jsonify({'error': processing_result['error']}), 400
+        
+        content = processing_result['content']
+        metadata = processing_result['metadata']
+        
+        # Very large content is chunked and cannot be streamed
+        if len(content) > 20000:
+            return jsonify({'error': 'Content is too large to stream. Use /api/summarize instead.'}), 400
+        if len(content) < 50:
+            return jsonify({'error': 'Content must be at least 50 characters.'}), 400
+        
+        # Apply content filtering
+        filtering_result = filter_content(content, user_role='user', strict_mode=data.get('strict_filtering', False))
+        metadata['categories'] = filtering_result['categories']
+        if not filtering_result['allowed']:
+            return jsonify({
+                'error': 'Content contains inappropriate material and cannot be processed.',
+                'filtering_result': filtering_result
+            }), 400
+        warnings = filtering_result.get('warnings', [])
+        
+        cached_result = redis_cache.get_cached_summary(content, length, tone)
+        if not cached_result and model is None and not EXTRACTIVE_FALLBACK:
+            return jsonify({'error': 'AI service is currently unavailable. Please try again later.'}), 503
+        if cached_result and cached_result.pop('stale', False):
+            schedule_summary_refresh(content, length, tone)
+        
+    except Exception as e:
+        print(f"Streaming summarization error: {str(e)}")
+        return jsonify({'error': 'An unexpected error occurred while processing your request.'}), 500
+    
+    def replay(result):
+        # Send a complete summary as the events of a streamed one
+        yield format_sse('headline', {'headline': result.get('headline', '')})
+        yield format_sse('categories', result['metadata']['categories'])
+        yield format_sse('summary', {'delta': result.get('summary', '')})
+        yield format_sse('done', result)
+    
+    def generate():
+        yield format_sse('metadata', {'metadata': metadata, 'warnings': warnings})
+        
+        if cached_result:
+            # Replay the cached summary as events, keeping its AI-generated categories
+            categories = (cached_result.get('metadata') or {}).get('categories') or metadata['categories']
+            metadata['categories'] = categories
+            cached_result['metadata'] = metadata
+            cached_result['warnings'] = warnings
+            if 'near_duplicate' in cached_result:
+                # Report how closely the reused summary's content matched
+                metadata['near_duplicate'] = cached_result.pop('near_duplicate')
+            yield from replay(cached_result)
+            return
+        
+        if model is None:
+            yield from replay(extractive_fallback(content, length, tone, metadata, warnings))
+            return
+        
+        parser = StreamingSummaryParser()
+        try:
+            # Gemini API call with streaming enabled
+            response = model.generate_content(
+                contents=build_summary_prompt(content, length, tone),
+                generation_config={
+                    "temperature": 0.7,
+                    "max_output_tokens": 1500,
+                },
+                stream=True
+            )
+            
+            for chunk in response:
+                for event, payload in parser.feed(chunk.text):
+                    yield format_sse(event, payload)
+            
+            for event, payload in parser.finish():
+                if event != 'done':
+                    yield format_sse(event, payload)
+                    continue
+                
+                metadata['categories'] = payload['categories']
+                response_data = {
+                    'headline': payload['headline'],
+                    'summary': payload['summary'],
+                    'original_content': content,
+                    'settings': {
+                        'length': length,
+                        'tone': tone
+                    },
+                    'metadata': metadata,
+                    'warnings': warnings,
+                    'cached': False
+                }
+                redis_cache.cache_summary(content, length, tone, response_data)
+                yield format_sse('done', response_data)
+                
+        except Exception as api_error:
+            print(f"Gemini API streaming error: {str(api_error)}")
+            if EXTRACTIVE_FALLBACK:
+                # The 'done' event replaces anything streamed before the failure
+                yield from replay(extractive_fallback(content, length, tone, metadata, warnings))
+            else:
+                yield format_sse('error', {'error': 'Failed to generate summary. API service unavailable.'})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @views.route('/api/summarize/batch', methods=['POST'])
 @login_required
 def summarize_batch():
     """
     Process a batch of content for summarization
     
+    The whole batch runs as a single task: identical items are deduplicated,
+    every item is processed and filtered in one pass, and short items are
+    packed together into shared model prompts.
+    
     Returns:
-        JSON response with task IDs for each content item
+        JSON response with the batch handle to poll
     """
     try:
         data = request.get_json()
@@ -1264,55 +1538,269 @@ def summarize_batch():
         if not data or 'items' not in data or not isinstance(data['items'], list):
             return jsonify({'error': 'Invalid request format. JSON body with items array required.'}), 400
         
+        if not data['items']:
+            return jsonify({'error': 'No items provided.'}), 400
+        
+        if len(data['items']) > BATCH_MAX_ITEMS:
+            return jsonify({'error': f'A batch can contain at most {BATCH_MAX_ITEMS} items.'}), 400
+        
         # Get common parameters
-        length = data.get('length', 50)
-        tone = data.get('tone', 'professional')
+        length, tone, error_response = validate_summary_params(data)
+        if error_response:
+            return error_response
         
-        # Process each item
-        task_ids = []
+        items = []
         for item in data['items']:
-            # Set batch flag
-            item['is_batch'] = True
-            
-            # Submit to regular summarize endpoint
-            try:
-                # Create a mock request object
-                class MockRequest:
-                    def get_json(self):
-                        return item
-                
-                # Call the summarize function directly
-                request._mock = MockRequest()
-                response = summarize()
-                request._mock = None
-                
-                # Extract task ID from response
-                if isinstance(response, tuple):
-                    response_data = json.loads(response[0].data)
-                else:
-                    response_data = json.loads(response.data)
-                
-                task_ids.append({
-                    'item_id': item.get('id'),
-                    'task_id': response_data.get('task_id'),
-                    'status': response_data.get('status')
-                })
-            except Exception as item_error:
-                task_ids.append({
-                    'item_id': item.get('id'),
-                    'error': str(item_error),
-                    'status': 'error'
-                })
+            if not isinstance(item, dict):
+                return jsonify({'error': 'Each item must be an object.'}), 400
+            items.append({
+                'id': item.get('id'),
+                'content': item.get('content') or '',
+                'url': item.get('url') or '',
+                'is_html': bool(item.get('is_html', False)),
+                'strict_filtering': bool(item.get('strict_filtering', False))
+            })
+        
+        # Submit the whole batch as one task
+        task_id = async_processor.submit_task(
+            run_batch_summary_task,
+            items=items,
+            length=length,
+            tone=tone,
+            timeout=60 + 2 * len(items)
+        )
         
         return jsonify({
-            'tasks': task_ids,
-            'message': f'Batch processing started for {len(task_ids)} items'
+            'batch_id': task_id,
+            'task_id': task_id,
+            'status': 'processing',
+            'total_items': len(items),
+            'message': f'Batch processing started for {len(items)} items'
         })
         
     except Exception as e:
         print(f"Batch summarization error: {str(e)}")
         return jsonify({'error': 'An unexpected error occurred while processing your batch request.'}), 500
 
+def summarize_single(content, length, tone):
+    """
+    Generate a headline, summary and categories for one piece of content
+    
+    Args:
+        content (str): Content to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        tuple: (headline, summary, categories)
+    """
+    if EXTRACTIVE_TOKEN_BUDGET:
+        # Send only the most central sentences of long content
+        content = reduce_content(content, EXTRACTIVE_TOKEN_BUDGET)
+    response = model.generate_content(
+        contents=build_summary_prompt(content, length, tone),
+        generation_config={
+            "temperature": 0.7,
+            "max_output_tokens": 1500,
+        }
+    )
+    return parse_summary_response(response.text)
+
+def summarize_pack(contents, length, tone):
+    """
+    Summarize several short texts with a single model call
+    
+    Args:
+        contents (list): Texts to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        list: (headline, summary, categories) per text, or None for texts
+            missing from the response
+    """
+    try:
+        response = model.generate_content(
+            contents=build_packed_prompt(contents, length, tone),
+            generation_config={
+                "temperature": 0.7,
+                "max_output_tokens": min(8192, 1000 * len(contents)),
+                "response_mime_type": "application/json",
+            }
+        )
+        return parse_packed_response(response.text, len(contents))
+    except Exception as pack_error:
+        print(f"Error summarizing packed batch: {str(pack_error)}")
+        return [None] * len(contents)
+
+def run_batch_summary_task(items, length, tone):
+    """
+    Task function that summarizes a batch of items
+    
+    Args:
+        items (list): Batch items with id, content, url, is_html and strict_filtering
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        dict: Batch result with one entry per item
+    """
+    print(f"Starting batch summary of {len(items)} items")
+    stats = {'total_items': len(items), 'model_calls': 0, 'cached': 0, 'packed': 0}
+    
+    # Stage 1: collapse identical items
+    unique, item_positions = dedupe_items(items)
+    stats['unique_items'] = len(unique)
+    
+    # Stage 2: process (fetching URLs concurrently) and filter every item in one pass
+    entries = prepare_items(
+        unique,
+        map_func=lambda func, inputs: map_concurrently(func, inputs, max_concurrency=BATCH_CONCURRENCY)
+    )
+    
+    # Items whose processed content is identical share one summary
+    content_owner = {}
+    for i, entry in enumerate(entries):
+        if entry['error'] is None:
+            entry['duplicate_of'] = content_owner.setdefault(entry['content'], i)
+    
+    # Stage 3: reuse cached summaries, looked up with a single round trip
+    owners = [i for i, entry in enumerate(entries) if entry['error'] is None and entry['duplicate_of'] == i]
+    cached_results = redis_cache.get_cached_summaries([entries[i]['content'] for i in owners], length, tone)
+    results = {}
+    to_generate = []
+    for i, cached_result in zip(owners, cached_results):
+        if cached_result:
+            if cached_result.pop('stale', False):
+                schedule_summary_refresh(entries[i]['content'], length, tone)
+            results[i] = cached_result
+            stats['cached'] += 1
+        else:
+            to_generate.append(i)
+    
+    def fall_back(i, error):
+        # Extract the summary locally, or report the failure when that is disabled
+        if EXTRACTIVE_FALLBACK:
+            entry = entries[i]
+            results[i] = extractive_fallback(entry['content'], length, tone, entry['metadata'], entry['warnings'])
+        else:
+            entries[i]['error'] = error
+    
+    if to_generate and model is None:
+        for i in to_generate:
+            fall_back(i, 'AI service is currently unavailable. Please try again later.')
+        to_generate = []
+    
+    # Stage 4: pack short items into shared prompts and summarize concurrently
+    chunked = [i for i in to_generate if len(entries[i]['content']) > 20000]
+    packs, singles = pack_items(
+        [(i, len(entries[i]['content'])) for i in to_generate if i not in chunked],
+        max_item_chars=BATCH_PACK_ITEM_LIMIT,
+        max_prompt_chars=BATCH_PACK_PROMPT_LIMIT,
+        max_items=BATCH_PACK_MAX_ITEMS
+    )
+    stats['packed'] = sum(len(pack) for pack in packs)
+    
+    generated = {}
+    
+    def run_pack(pack):
+        return pack, summarize_pack([entries[i]['content'] for i in pack], length, tone)
+    
+    for pack, pack_results in map_concurrently(run_pack, packs, max_concurrency=BATCH_CONCURRENCY):
+        stats['model_calls'] += 1
+        for i, parsed in zip(pack, pack_results):
+            if parsed:
+                generated[i] = parsed
+            else:
+                # Fall back to a prompt of its own for items missing from the response
+                singles.append(i)
+    
+    def run_single(i):
+        try:
+            return i, summarize_single(entries[i]['content'], length, tone)
+        except Exception as single_error:
+            print(f"Error summarizing batch item: {str(single_error)}")
+            return i, None
+    
+    for i, parsed in map_concurrently(run_single, singles, max_concurrency=BATCH_CONCURRENCY):
+        stats['model_calls'] += 1
+        if parsed:
+            generated[i] = parsed
+        else:
+            fall_back(i, 'Failed to generate summary. API service unavailable.')
+    
+    for i in chunked:
+        entry = entries[i]
+        entry['metadata']['chunked'] = True
+        chunk_result = process_chunked_content(
+            plan_chunks(entry['content'], CHUNK_TOKEN_BUDGET).chunks, length, tone, entry['metadata'], 'user',
+            bool(unique[i].get('strict_filtering', False))
+        )
+        if chunk_result.get('status') == 'completed':
+            results[i] = chunk_result
+        else:
+            entry['error'] = chunk_result.get('error', 'Failed to process large content.')
+    
+    for i, (headline, summary, categories) in generated.items():
+        entry = entries[i]
+        entry['metadata']['categories'] = categories
+        response_data = {
+            'headline': headline,
+            'summary': summary,
+            'original_content': entry['content'],
+            'settings': {
+                'length': length,
+                'tone': tone
+            },
+            'metadata': entry['metadata'],
+            'warnings': entry['warnings'],
+            'cached': False
+        }
+        results[i] = response_data
+    
+    redis_cache.cache_summaries([(entries[i]['content'], results[i]) for i in generated], length, tone)
+    
+    # Stage 5: one result per submitted item, in submission order
+    item_results = []
+    for item, position in zip(items, item_positions):
+        entry = entries[position]
+        owner = entry.get('duplicate_of', position)
+        error = entry['error'] or entries[owner]['error']
+        
+        if error or owner not in results:
+            item_results.append({
+                'item_id': item.get('id'),
+                'status': 'error',
+                'error': error or 'Failed to generate summary.'
+            })
+            continue
+        
+        result = dict(results[owner])
+        result.pop('original_content', None)
+        result['metadata'] = entry['metadata']
+        result['warnings'] = entry['warnings']
+        if (results[owner].get('metadata') or {}).get('summarizer') == 'extractive':
+            # Keep the notice that the summary was extracted locally
+            result['metadata']['summarizer'] = 'extractive'
+            result['warnings'] = entry['warnings'] + results[owner]['warnings'][-1:]
+        result['status'] = 'completed'
+        if 'near_duplicate' in result:
+            result['metadata']['near_duplicate'] = result.pop('near_duplicate')
+        item_results.append({
+            'item_id': item.get('id'),
+            'status': 'completed',
+            'result': result
+        })
+    
+    stats['failed'] = sum(1 for result in item_results if result['status'] == 'error')
+    print(f"Batch summary finished: {stats}")
+    
+    return {
+        'status': 'completed',
+        'items': item_results,
+        'stats': stats
+    }
+
 def handle_chunked_content(content, length, tone, metadata, data):
     """
     Handle very large content by chunking it into smaller pieces
@@ -1335,13 +1823,16 @@ def handle_chunked_content(content, length, tone, metadata, data):
         user_role = 'user'  # All users have 'user' role for now
         strict_mode = data.get('strict_filtering', False)
         
-        # Create chunks
-        chunks = chunk_content(content)
+        # Pack sentences into chunks that fit the token budget, with
+        # content-defined boundaries so edits stay local
+        plan = plan_chunks(content, CHUNK_TOKEN_BUDGET)
+        chunks = plan.chunks
         if not chunks:
             return jsonify({'error': 'Failed to chunk content.'}), 500
             
-        # Add chunk count to metadata
-        metadata['chunk_count'] = len(chunks)
+        # Add chunk count and estimated tokens to metadata
+        metadata['chunk_count'] = plan.chunk_count
+        metadata['estimated_tokens'] = plan.estimated_tokens
         
         # Submit task to async processor
         task_id = async_processor.submit_task(
@@ -1358,6 +1849,7 @@ def handle_chunked_content(content, length, tone, metadata, data):
         return jsonify({
             'task_id': task_id,
             'status': 'processing',
+            'plan': plan.to_dict(),
             'message': f'Processing large content in {len(chunks)} chunks. Please poll for results.'
         })
         
@@ -1367,182 +1859,544 @@ def handle_chunked_content(content, length, tone, metadata, data):
 
 def process_chunked_content(chunks, length, tone, metadata, user_role, strict_mode):
     """
-    Process chunked content asynchronously
+    Process chunked content asynchronously
+    
+    Args:
+        chunks (list): List of content chunks
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        metadata (dict): Content metadata
+        user_role (str): User role for filtering
+        strict_mode (bool): Whether to use strict filtering
+        
+    Returns:
+        dict: Summary result
+    """
+    try:
+        print(f"Processing {len(chunks)} chunks for summary")
+        
+        # Apply content filtering to each chunk and skip chunks that don't pass
+        allowed_chunks = []
+        for i, chunk in enumerate(chunks):
+            filtering_result = filter_content(chunk, user_role=user_role, strict_mode=strict_mode)
+            if not filtering_result['allowed']:
+                print(f"Chunk {i+1} filtered out due to inappropriate content")
+                continue
+            allowed_chunks.append(chunk)
+        
+        def fallback(error):
+            # Extract the summary from the allowed chunks, or report the failure
+            if not EXTRACTIVE_FALLBACK or not allowed_chunks:
+                return {'status': 'error', 'error': error}
+            result = extractive_fallback("\n\n".join(allowed_chunks), length, tone, metadata, [])
+            result.pop('original_content')
+            return dict(result, status='completed')
+        
+        if model is None:
+            return fallback('AI service is currently unavailable. Please try again later.')
+        
+        # Summarize the chunks concurrently (map step), reusing cached chunk summaries
+        results, cached_count = summarize_chunks(allowed_chunks, tone)
+        metadata['chunks_cached'] = cached_count
+        # Continue with other chunks even if one fails
+        chunk_summaries = [summary for summary in results if summary]
+        
+        # If we have no summaries, fall back or return error
+        if not chunk_summaries:
+            return fallback('Failed to generate summaries for any content chunks.')
+        
+        # Reduce the chunk summaries in a tree until they fit in the final prompt
+        chunk_summaries, depth = reduce_chunk_summaries(chunk_summaries, tone)
+        metadata['reduce_depth'] = depth
+            
+        # Combine chunk summaries
+        combined_summary = "\n\n".join(chunk_summaries)
+        
+        # Generate final summary with headline from the combined chunk summaries
+        final_prompt = f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
+The following text contains summaries of different sections of a larger document.
+Create a cohesive final summary in a {tone} tone that is approximately {length}% of the original length.
+
+Also create a compelling headline in the {tone} tone that captures the essence of the content.
+
+Additionally, identify the primary and secondary categories that best describe this content.
+Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
+
+Format your response exactly like this:
+HEADLINE: [Your headline here]
+
+CATEGORIES: [Primary Category], [Secondary Category]
+
+SUMMARY:
+[Your summary here]
+
+{SOURCE_MARKER}
+
+{combined_summary}"""
+        
+        try:
+            # Gemini API call for final summary
+            final_response = model.generate_content(
+                contents=final_prompt,
+                generation_config={
+                    "temperature": 0.7,
+                    "max_output_tokens": 1500,
+                }
+            )
+            
+            # Extract the headline and summary from the response
+            response_text = final_response.text
+            
+            # Parse the response to extract headline, summary and categories
+            headline, summary, categories = parse_summary_response(response_text)
+            
+            # Update metadata with AI-generated categories
+            metadata['categories'] = categories
+            
+            # Prepare response data
+            return {
+                'headline': headline,
+                'summary': summary,
+                'settings': {
+                    'length': length,
+                    'tone': tone
+                },
+                'metadata': metadata,
+                'warnings': [],  # We've already filtered each chunk
+                'cached': False,
+                'status': 'completed'
+            }
+            
+        except Exception as final_error:
+            print(f"Error generating final summary: {str(final_error)}")
+            return fallback('Failed to generate final summary from chunks.')
+        
+    except Exception as e:
+        print(f"Error processing chunked content: {str(e)}")
+        return {
+            'status': 'error',
+            'error': 'An unexpected error occurred while processing chunked content.'
+        }
+
+def summarize_chunk(chunk, tone, context=None):
+    """
+    Summarize a single chunk of a larger document
+    
+    Args:
+        chunk (str): Chunk content
+        tone (str): Summary tone
+        context (str, optional): Sentence describing what the chunk is
+        
+    Returns:
+        str: Chunk summary, or None if the API call failed
+    """
+    # Create prompt for this chunk
+    context = f"\n{context}" if context else ""
+    prompt = f"""You are an AI assistant that creates concise summaries.
+Summarize the text in a {tone} tone, capturing the key points.{context}
+
+{SOURCE_MARKER}
+
+{chunk}"""
+    
+    try:
+        # Gemini API call for this chunk
+        response = model.generate_content(
+            contents=prompt,
+            generation_config={
+                "temperature": 0.5,
+                "max_output_tokens": 800,
+            }
+        )
+        return response.text
+    except Exception as chunk_error:
+        print(f"Error processing chunk: {str(chunk_error)}")
+        return None
+
+def summarize_chunks(chunks, tone, context=None):
+    """
+    Summarize chunks concurrently, calling the model only for chunks whose
+    summary is not already cached under their content hash
+    
+    Args:
+        chunks (list): Chunk contents
+        tone (str): Summary tone
+        context (str, optional): Sentence describing what the chunks are
+        
+    Returns:
+        tuple: (summaries in chunk order with None for failures, number of cache hits)
+    """
+    summaries = redis_cache.get_chunk_summaries(chunks, tone)
+    missing = [i for i, summary in enumerate(summaries) if not summary]
+    cached_count = len(chunks) - len(missing)
+    
+    if missing:
+        print(f"Summarizing {len(missing)} of {len(chunks)} chunks ({cached_count} cached)")
+    
+    generated = map_concurrently(
+        lambda i: summarize_chunk(chunks[i], tone, context),
+        missing,
+        max_concurrency=CHUNK_SUMMARY_CONCURRENCY
+    )
+    
+    for i, summary in zip(missing, generated):
+        if summary:
+            summaries[i] = summary
+    
+    redis_cache.cache_chunk_summaries([(chunks[i], summaries[i]) for i in missing if summaries[i]], tone)
+    
+    return summaries, cached_count
+
+def group_summaries(summaries, limit):
+    """
+    Group consecutive summaries so each group fits within the character limit
+    
+    Every group holds at least two summaries (when available) so that each
+    reduce level makes progress even when single summaries are large.
+    
+    Args:
+        summaries (list): Summaries to group
+        limit (int): Maximum combined characters per group
+        
+    Returns:
+        list: List of summary groups
+    """
+    groups = []
+    current = []
+    current_size = 0
+    
+    for summary in summaries:
+        size = len(summary) + 2
+        if len(current) >= 2 and current_size + size > limit:
+            groups.append(current)
+            current = []
+            current_size = 0
+        current.append(summary)
+        current_size += size
+    
+    if current:
+        # Avoid a trailing group of one that would not be reduced
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    
+    return groups
+
+def reduce_chunk_summaries(summaries, tone):
+    """
+    Reduce chunk summaries in a tree until they fit in the final prompt
+    
+    Each level combines groups of summaries concurrently, so the time taken
+    grows with the depth of the tree rather than the number of chunks.
+    
+    Args:
+        summaries (list): Chunk summaries in document order
+        tone (str): Summary tone
+        
+    Returns:
+        tuple: (reduced summaries, number of reduce levels)
+    """
+    depth = 0
+    
+    while (len(summaries) > 1 and depth < CHUNK_REDUCE_MAX_DEPTH
+           and len("\n\n".join(summaries)) > CHUNK_REDUCE_INPUT_LIMIT):
+        groups = group_summaries(summaries, CHUNK_REDUCE_INPUT_LIMIT)
+        if len(groups) >= len(summaries):
+            break
+        
+        print(f"Reducing {len(summaries)} summaries in {len(groups)} groups (level {depth + 1})")
+        
+        reduced, _ = summarize_chunks(
+            ["\n\n".join(group) for group in groups],
+            tone,
+            context="The text consists of summaries of consecutive sections of a document."
+        )
+        
+        # Keep the original text of any group that failed to reduce
+        summaries = [
+            summary if summary else "\n\n".join(group)
+            for summary, group in zip(reduced, groups)
+        ]
+        depth += 1
+    
+    return summaries, depth
+
+def generate_summary_coalesced(content, length, tone, metadata, warnings, cache_result=True):
+    """
+    Generate a summary, sharing one model call between identical concurrent requests
+    
+    The leader's result is stored in the summary cache so that waiting requests
+    in other processes can pick it up.
+    
+    Args:
+        content (str): Content to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        metadata (dict): Content metadata of this request
+        warnings (list): Content warnings of this request
+        cache_result (bool): Whether to cache the generated summary
+        
+    Returns:
+        dict: Response data for this request
+    """
+    def generate():
+        headline, summary, categories = summarize_single(content, length, tone)
+        response_data = {
+            'headline': headline,
+            'summary': summary,
+            'original_content': content,
+            'settings': {
+                'length': length,
+                'tone': tone
+            },
+            'metadata': dict(metadata, categories=categories),
+            'warnings': warnings,
+            'cached': False
+        }
+        if cache_result:
+            redis_cache.cache_summary(content, length, tone, response_data)
+        return response_data
+    
+    result = summary_flight.do(
+        redis_cache.generate_cache_key(content, length, tone),
+        generate,
+        lookup=lambda: redis_cache.get_cached_summary(content, length, tone)
+    )
+    
+    # Every request keeps its own metadata, with the AI-generated categories
+    response_data = dict(result)
+    if response_data.pop('stale', False):
+        schedule_summary_refresh(content, length, tone)
+    metadata['categories'] = result.get('metadata', {}).get('categories', metadata.get('categories'))
+    response_data['metadata'] = metadata
+    response_data['warnings'] = warnings
+    if 'near_duplicate' in response_data:
+        metadata['near_duplicate'] = response_data.pop('near_duplicate')
+    return response_data
+
+def extractive_fallback(content, length, tone, metadata, warnings):
+    """
+    Build a summary response locally while the AI service is unavailable
+    
+    The result is not cached, so the next request once the service is back
+    gets a model summary.
     
     Args:
-        chunks (list): List of content chunks
+        content (str): Content to summarize
         length (int): Summary length percentage
         tone (str): Summary tone
         metadata (dict): Content metadata
-        user_role (str): User role for filtering
-        strict_mode (bool): Whether to use strict filtering
+        warnings (list): Content warnings
         
     Returns:
-        dict: Summary result
+        dict: Response data
     """
-    try:
-        print(f"Processing {len(chunks)} chunks for summary")
-        
-        # Process each chunk to get individual summaries
-        chunk_summaries = []
-        
-        for i, chunk in enumerate(chunks):
-            print(f"Processing chunk {i+1}/{len(chunks)}")
-            
-            # Apply content filtering to each chunk
-            filtering_result = filter_content(chunk, user_role=user_role, strict_mode=strict_mode)
-            
-            # Skip chunks that don't pass filtering
-            if not filtering_result['allowed']:
-                print(f"Chunk {i+1} filtered out due to inappropriate content")
-                continue
-                
-            # Create prompt for this chunk
-            prompt = f"""You are an AI assistant that creates concise summaries.
-Summarize the following text in a {tone} tone, capturing the key points:
+    headline, summary = extractive_summary(content, length)
+    metadata['summarizer'] = 'extractive'
+    return {
+        'headline': headline,
+        'summary': summary,
+        'original_content': content,
+        'settings': {
+            'length': length,
+            'tone': tone
+        },
+        'metadata': metadata,
+        'warnings': warnings + [{
+            'type': 'fallback',
+            'message': 'The AI service is unavailable; this summary was extracted from the original text.',
+            'keywords': []
+        }],
+        'cached': False
+    }
 
-{chunk}"""
-            
-            try:
-                # Gemini API call for this chunk
-                response = model.generate_content(
-                    contents=prompt,
-                    generation_config={
-                        "temperature": 0.5,
-                        "max_output_tokens": 800,
-                    }
-                )
-                
-                # Add chunk summary to list
-                chunk_summaries.append(response.text)
-                
-            except Exception as chunk_error:
-                print(f"Error processing chunk {i+1}: {str(chunk_error)}")
-                # Continue with other chunks even if one fails
+def generate_summary_variants(content, lengths, tone):
+    """
+    Summarize content at several lengths with at most one model call
+    
+    Lengths with a cached summary are not generated again; stale ones are
+    served while a background refresh replaces them. Identical concurrent
+    requests for the missing lengths share one model call. Every generated
+    variant is cached under its own (content, length, tone) key, so moving the
+    length slider to it is a cache hit.
+    
+    Args:
+        content (str): Content to summarize
+        lengths (list): Summary length percentages
+        tone (str): Summary tone
         
-        # If we have no summaries, return error
-        if not chunk_summaries:
-            return {
-                'status': 'error',
-                'error': 'Failed to generate summaries for any content chunks.'
+    Returns:
+        dict: Response data per length, for the lengths that are cached or
+            were returned by the model
+    """
+    results = {}
+    missing = []
+    for length in lengths:
+        cached_result = redis_cache.get_cached_summary(content, length, tone)
+        if cached_result:
+            if cached_result.pop('stale', False):
+                schedule_summary_refresh(content, length, tone)
+            cached_result.pop('near_duplicate', None)
+            results[length] = cached_result
+        else:
+            missing.append(length)
+    
+    if not missing:
+        return results
+    
+    def generate():
+        prompt_content = content
+        if EXTRACTIVE_TOKEN_BUDGET:
+            # Send only the most central sentences of long content
+            prompt_content = reduce_content(content, EXTRACTIVE_TOKEN_BUDGET)
+        response = model.generate_content(
+            contents=build_variants_prompt(prompt_content, missing, tone),
+            generation_config={
+                "temperature": 0.7,
+                "max_output_tokens": min(8192, 1500 * len(missing)),
+                "response_mime_type": "application/json",
             }
-            
-        # Combine chunk summaries
-        combined_summary = "\n\n".join(chunk_summaries)
-        
-        # Generate final summary with headline from the combined chunk summaries
-        final_prompt = f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
-The following text contains summaries of different sections of a larger document.
-Create a cohesive final summary in a {tone} tone that is approximately {length}% of the original length.
-
-Also create a compelling headline in the {tone} tone that captures the essence of the content.
-
-Additionally, identify the primary and secondary categories that best describe this content.
-Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
-
-Format your response exactly like this:
-HEADLINE: [Your headline here]
-
-CATEGORIES: [Primary Category], [Secondary Category]
-
-SUMMARY:
-[Your summary here]
-
-Here are the section summaries to combine:
-
-{combined_summary}"""
+        )
         
-        try:
-            # Gemini API call for final summary
-            final_response = model.generate_content(
-                contents=final_prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 1500,
-                }
-            )
-            
-            # Extract the headline and summary from the response
-            response_text = final_response.text
-            
-            # Parse the response to extract headline and summary
-            headline = ""
-            summary = response_text
-            categories = {}
-            
-            if "HEADLINE:" in response_text:
-                # Split by sections
-                sections = response_text.split("\n\n")
-                
-                # Extract headline
-                for section in sections:
-                    if section.startswith("HEADLINE:"):
-                        headline = section.replace("HEADLINE:", "").strip()
-                    elif section.startswith("CATEGORIES:"):
-                        # Extract categories
-                        categories_text = section.replace("CATEGORIES:", "").strip()
-                        category_list = [cat.strip() for cat in categories_text.split(",")]
-                        
-                        if len(category_list) >= 2:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': category_list[1],
-                                'confidence': 90  # High confidence since it's AI-generated
-                            }
-                        elif len(category_list) == 1:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': 'general',
-                                'confidence': 90
-                            }
-                    elif section.startswith("SUMMARY:"):
-                        summary = section.replace("SUMMARY:", "").strip()
-            
-            # If no categories were extracted, use default
-            if not categories:
-                categories = {
-                    'primary_category': 'general',
-                    'secondary_category': 'informational',
-                    'confidence': 50
-                }
-            
-            # Update metadata with AI-generated categories
-            metadata['categories'] = categories
-            
-            # Prepare response data
-            return {
+        generated = {}
+        for length, (headline, summary, categories) in parse_variants_response(response.text, missing).items():
+            response_data = {
                 'headline': headline,
                 'summary': summary,
+                'original_content': content,
                 'settings': {
                     'length': length,
                     'tone': tone
                 },
-                'metadata': metadata,
-                'warnings': [],  # We've already filtered each chunk
-                'cached': False,
-                'status': 'completed'
-            }
-            
-        except Exception as final_error:
-            print(f"Error generating final summary: {str(final_error)}")
-            return {
-                'status': 'error',
-                'error': 'Failed to generate final summary from chunks.'
+                'metadata': {'categories': categories},
+                'warnings': [],
+                'cached': False
             }
+            redis_cache.cache_summary(content, length, tone, response_data)
+            generated[length] = response_data
+        return generated
+    
+    def lookup():
+        # Variants cached by a leader in another process
+        found = {length: redis_cache.get_cached_summary(content, length, tone) for length in missing}
+        return found if all(found.values()) else None
+    
+    key = f"variants:{redis_cache.generate_cache_key(content, 0, tone)}:{','.join(map(str, sorted(missing)))}"
+    for length, result in summary_flight.do(key, generate, lookup=lookup).items():
+        # Followers share the leader's results, so each gets its own copy
+        result = dict(result)
+        result.pop('stale', None)
+        result.pop('near_duplicate', None)
+        results[length] = result
+    return results
+
+def schedule_variant_speculation(content, lengths, tone):
+    """
+    Generate other length variants of a summary in the background
+    
+    The task runs at low priority, so it never delays summaries that users are
+    waiting for. Only the first caller for the same content and tone within
+    the refresh claim period schedules it.
+    
+    Args:
+        content (str): Content of the summary
+        lengths (list): Summary length percentages to generate
+        tone (str): Summary tone
+        
+    Returns:
+        str: Task ID of the speculation, or None if it was not scheduled
+    """
+    if model is None or not lengths:
+        return None
+    key = f"variants:{redis_cache.generate_cache_key(content, 0, tone)}:{','.join(map(str, sorted(lengths)))}"
+    if not redis_cache.claim_refresh(key):
+        return None
+    return async_processor.submit_task(
+        speculate_variants_task,
+        content=content_store.put(content),
+        lengths=lengths,
+        tone=tone,
+        timeout=120,
+        priority='low'
+    )
+
+def speculate_variants_task(content, lengths, tone):
+    """
+    Task function for caching summary variants ahead of slider moves
+    
+    Args:
+        content (str or ContentHandle): Content to summarize
+        lengths (list): Summary length percentages
+        tone (str): Summary tone
         
+    Returns:
+        dict: Speculation result
+    """
+    try:
+        results = generate_summary_variants(resolve_content(content), lengths, tone)
+        return {'status': 'completed', 'lengths': sorted(results)}
     except Exception as e:
-        print(f"Error processing chunked content: {str(e)}")
-        return {
-            'status': 'error',
-            'error': 'An unexpected error occurred while processing chunked content.'
-        }
+        print(f"Summary variant speculation error: {str(e)}")
+        return {'status': 'error', 'error': str(e)}
+
+def schedule_summary_refresh(content, length, tone):
+    """
+    Regenerate a stale cached summary in the background
+    
+    The stale summary keeps being served meanwhile; only the first caller to
+    claim the key schedules the refresh.
+    
+    Args:
+        content (str): Content of the summary
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        str: Task ID of the refresh, or None if one is already pending
+    """
+    if model is None or not redis_cache.claim_refresh(redis_cache.generate_cache_key(content, length, tone)):
+        return None
+    return async_processor.submit_task(
+        refresh_summary_task,
+        content=content_store.put(content),
+        length=length,
+        tone=tone,
+        timeout=120
+    )
+
+def refresh_summary_task(content, length, tone):
+    """
+    Task function for replacing a stale cached summary
+    
+    Args:
+        content (str or ContentHandle): Content to summarize
+        length (int): Summary length percentage
+        tone (str): Summary tone
+        
+    Returns:
+        dict: Refresh result
+    """
+    try:
+        content = resolve_content(content)
+        headline, summary, categories = summarize_single(content, length, tone)
+        redis_cache.cache_summary(content, length, tone, {
+            'headline': headline,
+            'summary': summary,
+            'metadata': {'categories': categories},
+            'cached': False
+        })
+        return {'status': 'completed'}
+    except Exception as e:
+        print(f"Summary refresh error: {str(e)}")
+        return {'status': 'error', 'error': str(e)}
 
 def generate_summary_task(content, length, tone, metadata, warnings):
     """
     Task function for generating summaries asynchronously
     
     Args:
-        content (str): Content to summarize
+        content (str or ContentHandle): Content to summarize
         length (int): Summary length percentage
         tone (str): Summary tone
         metadata (dict): Content metadata
@@ -1553,8 +2407,9 @@ def generate_summary_task(content, length, tone, metadata, warnings):
     """
     try:
         print(f"Starting async summary generation: length={length}, tone={tone}")
+        content = resolve_content(content)
         
-        # Check if content is compressed
+        # Tasks queued before content handles carry compressed content
         if metadata.get('compressed'):
             content = decompress_content(content)
             if not content:
@@ -1567,122 +2422,38 @@ def generate_summary_task(content, length, tone, metadata, warnings):
         cached_result = redis_cache.get_cached_summary(content, length, tone)
         if cached_result:
             print("Returning cached summary for async task")
+            if cached_result.pop('stale', False):
+                schedule_summary_refresh(content, length, tone)
             # Add metadata and warnings to cached result
             cached_result['metadata'] = metadata
             cached_result['warnings'] = warnings
+            if 'near_duplicate' in cached_result:
+                # Report how closely the reused summary's content matched
+                metadata['near_duplicate'] = cached_result.pop('near_duplicate')
             cached_result['status'] = 'completed'
             return cached_result
         
         # Check if Gemini model is available
         if model is None:
+            if EXTRACTIVE_FALLBACK:
+                return dict(extractive_fallback(content, length, tone, metadata, warnings), status='completed')
             return {
                 'status': 'error',
                 'error': 'AI service is currently unavailable. Please try again later.'
             }
         
-        # Create prompt for Gemini that includes headline generation
-        prompt = f"""You are an AI assistant that creates {tone} summaries with headlines and categories.
-Create a summary that is approximately {length}% of the original length.
-Maintain the key points while adjusting the length and tone as specified.
-
-Also create a compelling headline in the {tone} tone that captures the essence of the content.
-
-Additionally, identify the primary and secondary categories that best describe this content.
-Choose from these categories: technology, business, news, health, science, politics, entertainment, sports, general.
-
-Format your response exactly like this:
-HEADLINE: [Your headline here]
-
-CATEGORIES: [Primary Category], [Secondary Category]
-
-SUMMARY:
-[Your summary here]
-
-Please summarize the following text:
-
-{content}"""
-        
         # Make API call to Gemini with error handling
         try:
-            # Gemini API call
-            response = model.generate_content(
-                contents=prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 1500,
-                }
-            )
-            
-            # Extract the headline and summary from the response
-            response_text = response.text
-            
-            # Parse the response to extract headline and summary
-            headline = ""
-            summary = response_text
-            categories = {}
-            
-            if "HEADLINE:" in response_text:
-                # Split by sections
-                sections = response_text.split("\n\n")
-                
-                # Extract headline
-                for section in sections:
-                    if section.startswith("HEADLINE:"):
-                        headline = section.replace("HEADLINE:", "").strip()
-                    elif section.startswith("CATEGORIES:"):
-                        # Extract categories
-                        categories_text = section.replace("CATEGORIES:", "").strip()
-                        category_list = [cat.strip() for cat in categories_text.split(",")]
-                        
-                        if len(category_list) >= 2:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': category_list[1],
-                                'confidence': 90  # High confidence since it's AI-generated
-                            }
-                        elif len(category_list) == 1:
-                            categories = {
-                                'primary_category': category_list[0],
-                                'secondary_category': 'general',
-                                'confidence': 90
-                            }
-                    elif section.startswith("SUMMARY:"):
-                        summary = section.replace("SUMMARY:", "").strip()
-            
-            # If no categories were extracted, use default
-            if not categories:
-                categories = {
-                    'primary_category': 'general',
-                    'secondary_category': 'informational',
-                    'confidence': 50
-                }
-            
-            # Update metadata with AI-generated categories
-            metadata['categories'] = categories
-            
-            # Prepare response data
-            response_data = {
-                'headline': headline,
-                'summary': summary,
-                'original_content': content,
-                'settings': {
-                    'length': length,
-                    'tone': tone
-                },
-                'metadata': metadata,
-                'warnings': warnings,
-                'cached': False,
-                'status': 'completed'
-            }
-            
-            # Cache the result
-            if not metadata.get('compressed'):
-                redis_cache.cache_summary(content, length, tone, response_data)
+            # Identical concurrent requests share a single Gemini call
+            response_data = generate_summary_coalesced(content, length, tone, metadata, warnings)
+            response_data['status'] = 'completed'
             
             return response_data
             
         except Exception as api_error:
             print(f"Gemini API error in async task: {str(api_error)}")
+            if EXTRACTIVE_FALLBACK:
+                return dict(extractive_fallback(content, length, tone, metadata, warnings), status='completed')
             return {
                 'status': 'error',
                 'error': 'Failed to generate summary. API service unavailable.'
@@ -2016,13 +2787,26 @@ def get_admin_stats():
             },
             'ai_summary_count': ai_summary_count,
             'scheduled_post_count': scheduled_post_count,
-            'email_usage_count': email_usage_count
+            'email_usage_count': email_usage_count,
+            'cache_stats': redis_cache.get_stats()
         }), 200
 
     except Exception as e:
         print(f"Error fetching admin stats: {e}")
         return jsonify({'error': 'Failed to load admin stats'}), 500
 
+@views.route('/api/admin/cache/invalidate', methods=['POST'])
+@login_required
+@admin_required
+def invalidate_summary_cache():
+    """
+    Invalidate every cached summary by moving the cache to a new generation
+    """
+    generation = redis_cache.bump_generation()
+    if generation is None:
+        return jsonify({'error': 'Cache backend is unavailable'}), 503
+    return jsonify({'success': True, 'generation': generation, 'namespace': redis_cache.namespace()}), 200
+
 @views.route('/api/subscribers', methods=['GET'])
 @login_required
 def get_subscribers():
@@ -2088,8 +2872,12 @@ def search_news():
     if not categories or len(categories) > 2:
         return jsonify({'error': 'Please provide 1-2 categories'}), 400
         
-    # Call TheNewsAPI
-    articles = fetch_from_news_api(categories)
+    with news_search_lock:
+        key = tuple(sorted(categories))
+        # Bounded so arbitrary category strings cannot grow it forever
+        if key in news_search_counts or len(news_search_counts) < 1000:
+            news_search_counts[key] += 1
+    articles = get_news_articles(categories)
     
     return jsonify({'articles': articles})
 
@@ -2164,6 +2952,149 @@ def get_favorite_articles():
     
     return jsonify({'favorites': articles})
 
+def news_cache_key(categories):
+    """Generate the cache key of a news search"""
+    return f"news:{','.join(sorted(categories))}"
+
+def get_news_articles(categories):
+    """
+    Get top articles for the categories, served from the cache when possible
+    
+    Results stay fresh for NEWS_CACHE_EXPIRY seconds. Older results are still
+    returned while a background task fetches new ones, until NEWS_CACHE_HARD_EXPIRY
+    when the search blocks on TheNewsAPI again.
+    
+    Args:
+        categories (list): News categories
+        
+    Returns:
+        list: Articles
+    """
+    key = news_cache_key(categories)
+    articles, stale = redis_cache.get_value(key)
+    if articles is not None:
+        if stale and redis_cache.claim_refresh(key):
+            async_processor.submit_task(refresh_news_task, categories, timeout=30)
+        return articles
+    
+    articles = fetch_from_news_api(categories)
+    cache_news_articles(categories, articles)
+    return articles
+
+def cache_news_articles(categories, articles):
+    """Cache the articles of a news search; failed searches are not cached"""
+    if articles:
+        redis_cache.set_value(news_cache_key(categories), articles, NEWS_CACHE_EXPIRY, NEWS_CACHE_HARD_EXPIRY)
+        presummarize_articles(articles)
+
+def presummarize_articles(articles):
+    """
+    Queue default-setting summaries of the top fetched articles at low priority
+    
+    Users mostly summarize articles they were just shown, so generating these
+    while workers are idle turns their click into a cache hit.
+    
+    Args:
+        articles (list): Articles in display order
+        
+    Returns:
+        list: Task IDs of the queued summaries
+    """
+    if NEWS_PRESUMMARIZE_TOP <= 0 or model is None:
+        return []
+    
+    task_ids = []
+    for article in articles[:NEWS_PRESUMMARIZE_TOP]:
+        if not article.get('url'):
+            continue
+        try:
+            task_ids.append(async_processor.submit_task(
+                presummarize_article_task,
+                article['url'],
+                timeout=120,
+                priority='low'
+            ))
+        except RuntimeError:
+            # Background work is dropped rather than queued behind user requests
+            print("Task queue is full, skipping news pre-summarization")
+            break
+    return task_ids
+
+def presummarize_article_task(url):
+    """
+    Task function for summarizing a news article ahead of the user's click
+    
+    Follows the same steps as /api/summarize for the URL, so the summary is
+    stored under the key the click will look up.
+    
+    Args:
+        url (str): Article URL
+        
+    Returns:
+        dict: Pre-summarization result
+    """
+    length, tone = NEWS_PRESUMMARIZE_LENGTH, NEWS_PRESUMMARIZE_TONE
+    processing_result = process_content({'url': url})
+    if not processing_result['success']:
+        return {'status': 'skipped', 'reason': processing_result['error']}
+    
+    content = processing_result['content']
+    metadata = processing_result['metadata']
+    # Content the endpoint would reject or chunk is not worth summarizing ahead
+    if len(content) < 50 or len(content) > 20000:
+        return {'status': 'skipped', 'reason': 'content length'}
+    
+    filtering_result = filter_content(content, user_role='user')
+    if not filtering_result['allowed']:
+        return {'status': 'skipped', 'reason': 'filtered'}
+    
+    if redis_cache.get_cached_summary(content, length, tone):
+        return {'status': 'skipped', 'reason': 'cached'}
+    
+    metadata['categories'] = filtering_result['categories']
+    generate_summary_coalesced(content, length, tone, metadata, filtering_result.get('warnings', []))
+    return {'status': 'completed'}
+
+def refresh_news_task(categories):
+    """
+    Task function for replacing stale cached news results
+    
+    Args:
+        categories (list): News categories
+        
+    Returns:
+        dict: Refresh result
+    """
+    articles = fetch_from_news_api(categories)
+    cache_news_articles(categories, articles)
+    return {'status': 'completed', 'articles': len(articles)}
+
+def prewarm_news_cache():
+    """
+    Refresh the cached news of the configured and most searched category sets
+    
+    Called periodically by the scheduler so that searches for popular
+    categories are answered from the cache. Fresh entries are skipped, and each
+    set is refreshed by a single process at a time.
+    
+    Returns:
+        int: Number of category sets refreshed
+    """
+    with news_search_lock:
+        popular = [list(categories) for categories, _ in news_search_counts.most_common(NEWS_PREWARM_TOP)]
+    
+    refreshed = 0
+    for categories in NEWS_PREWARM_CATEGORIES + [c for c in popular if c not in NEWS_PREWARM_CATEGORIES]:
+        key = news_cache_key(categories)
+        articles, stale = redis_cache.get_value(key)
+        if articles is not None and not stale:
+            continue
+        if not redis_cache.claim_refresh(key):
+            continue
+        cache_news_articles(categories, fetch_from_news_api(categories))
+        refreshed += 1
+    return refreshed
+
 def fetch_from_news_api(categories):
     api_key = os.environ.get('THE_NEWS_API_KEY')
     articles = []
@@ -2175,7 +3106,7 @@ def fetch_from_news_api(categories):
     url = f"https://api.thenewsapi.com/v1/news/top?api_token={api_key}&categories={category_str}&language=en&limit=10"
     
     try:
-        response = requests.get(url)
+        response = news_session.get(url, timeout=NEWS_API_TIMEOUT)
         
         if response.status_code == 200:
             data = response.json()